@@ -2,6 +2,7 @@ import os
 import logging
 from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -17,11 +18,14 @@ app = Flask(__name__)
 # Configure CORS for development
 CORS(app)
 
+# Reject oversized request bodies; uploads are size-checked as they stream in
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_BYTES', str(50 * 1024 * 1024)))
+
 # Validate required environment variables on startup
 def validate_environment():
     """Validate that required environment variables are present."""
     google_api_key = os.getenv('GOOGLE_API_KEY')
-    if not google_api_key:
+    if not google_api_key and os.getenv('MODEL_PROVIDER', 'gemini').lower() == 'gemini':
         logger.error("GOOGLE_API_KEY environment variable is not set")
         return False
     logger.info("Environment validation successful")
@@ -41,29 +45,211 @@ def analyze():
     """
     Analyze earnings call transcript from provided URL.
     
-    Expected JSON payload:
+    Expected JSON payload (or multipart form data with a PDF/DOCX/text
+    "file" or "text" field and the optional fields below):
     {
-        "url": "https://example.com/transcript"
+        "url": "https://example.com/transcript",  // may be a PDF or DOCX link
+        "text": "Transcript text...",  // alternative to "url", skips scraping
+        "prompt": "earnings_call",  // optional, e.g. "investor_day"
+        "prompt_version": 1,        // optional, defaults to the latest
+        "input_mode": "full",       // optional, "compact" sends only the key sentences
+        "response_mode": "brief",   // optional, "brief" or "detailed" (fewer, shorter
+                                    // items and a shorter verdict for "brief")
+        "incremental": true,        // optional, set false to force a full re-analysis
+        "timeout": 30               // optional budget in seconds (or an
+                                    // X-Request-Timeout header), capped by
+                                    // ANALYZE_TIMEOUT_SECONDS
     }
     
+    Work stops between stages, and the model call is abandoned, once the
+    budget runs out (504) or the client disconnects.
+    
     Returns:
     {
         "sentiment": "string",
         "good_news": ["string"],
         "bad_news": ["string"],
         "key_promises": ["string"],
-        "verdict": "string"
+        "verdict": "string",
+        "prompt_version": "earnings_call@2",
+        "degraded": true  // only present when the AI service was unavailable
+                          // and a local extractive summary was served instead
+    }
+    """
+    try:
+        # A transcript file or raw text can be posted directly as form data
+        upload = request.files.get('file')
+        if upload is not None or 'text' in request.form:
+            data = request.form
+        else:
+            # Validate request content type
+            if not request.is_json:
+                return jsonify({'error': 'Request must be JSON'}), 400
+            
+            # Get request data
+            data = request.get_json()
+            
+            # Validate required fields
+            if not data or ('url' not in data and 'text' not in data):
+                return jsonify({'error': 'Please provide a URL to analyze'}), 400
+        
+        url = None
+        if upload is None and 'text' not in data:
+            url = data['url'].strip()
+            if not url:
+                return jsonify({'error': 'Please enter a valid URL'}), 400
+        elif upload is None and not isinstance(data['text'], str):
+            return jsonify({'error': 'text must be a string'}), 400
+        
+        # Pick the prompt template for this kind of transcript
+        try:
+            template = prompt_registry.get(data.get('prompt'), data.get('prompt_version'))
+        except KeyError as e:
+            return jsonify({'error': e.args[0]}), 400
+        
+        input_mode = data.get('input_mode', DEFAULT_INPUT_MODE)
+        if input_mode not in ('full', 'compact'):
+            return jsonify({'error': 'input_mode must be "full" or "compact"'}), 400
+        compact = input_mode == 'compact'
+        
+        mode = RESPONSE_MODES.get(str(data.get('response_mode', DEFAULT_RESPONSE_MODE)))
+        if mode is None:
+            return jsonify({'error': 'response_mode must be "brief" or "detailed"'}), 400
+        
+        try:
+            deadline = _request_deadline(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # In a cluster, the node owning this URL analyzes it (warm caches)
+        if url is not None:
+            routed = _route_to_owner(url, '/analyze', data, deadline.remaining())
+            if routed is not None:
+                return routed
+        
+        if upload is not None:
+            logger.info(f"Starting analysis for upload: {upload.filename} with prompt {template.id} ({input_mode} input)")
+            
+            # Step 1: Extract text from the uploaded document
+            try:
+                text_content = Transcript.from_text(extract_uploaded_document(upload))
+            except ValueError as e:
+                logger.error(f"Document extraction failed: {str(e)}")
+                return jsonify({'error': f'Unable to read the uploaded file: {str(e)}'}), 400
+            if len(text_content) < 100:
+                return jsonify({'error': 'Unable to read the uploaded file: Insufficient text content found in the document'}), 400
+        elif url is None:
+            logger.info(f"Starting analysis for supplied text with prompt {template.id} ({input_mode} input)")
+            
+            # Step 1: Supplied text skips scraping; only normalize whitespace
+            # to match scraped text
+            text_content = Transcript.from_text(' '.join(data['text'].split()))
+            if len(text_content) < 100:
+                return jsonify({'error': 'Please provide at least 100 characters of transcript text'}), 400
+        else:
+            logger.info(f"Starting analysis for URL: {url} with prompt {template.id} ({input_mode} input)")
+            
+            # Step 1: Scrape text from URL, sharing the fetch with a concurrent preview
+            try:
+                text_content = _scrape_shared(url, deadline=deadline, take=True)
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                logger.error(f"Scraping failed: {str(e)}")
+                return jsonify({'error': f'Unable to access the webpage: {str(e)}'}), 400
+        
+        deadline.check('extract')
+        
+        # Step 2: Analyze text with AI, reusing the previous analysis when
+        # the transcript has only been partially updated. Supplied text and
+        # files are keyed by content, so resubmitting them hits the store.
+        # URLs are keyed like routing keys them, so variants of one URL share an entry
+        source = normalize_url(url) if url else f"sha256:{hashlib.sha256(text_content.encode('utf-8')).hexdigest()}"
+        store_key = f"{template.id} {input_mode} {mode.name} {source}"
+        incremental = data.get('incremental', True)
+        if isinstance(incremental, str):
+            incremental = incremental.strip().lower() not in ('0', 'false', 'no')
+        try:
+            # Only one worker analyzes a given transcript at a time; the
+            # others wait, then reuse the stored result
+            lock = transcript_store.lock(store_key, timeout=deadline.remaining()) if incremental else nullcontext()
+            with lock:
+                analysis_result = _analyze_against_store(
+                    text_content, template, compact, mode, store_key, incremental, deadline
+                )
+        except RequestCancelled:
+            raise
+        except ModelUnavailableError as e:
+            if not DEGRADED_FALLBACK:
+                logger.error(f"AI analysis unavailable: {str(e)}")
+                return jsonify({'error': f'Unable to analyze the content: {str(e)}'}), 503
+            # Degraded summaries are not stored so the next request retries the model
+            logger.warning(f"AI analysis unavailable, serving local summary: {str(e)}")
+            analysis_result = summarize_transcript(text_content)
+        except Exception as e:
+            logger.error(f"AI analysis failed: {str(e)}")
+            return jsonify({'error': f'Unable to analyze the content: {str(e)}'}), 500
+        
+        logger.info("Analysis completed successfully")
+        # Clients holding this exact result (If-None-Match) get a bodyless 304
+        return etag_json(analysis_result)
+        
+    except RequestCancelled as e:
+        logger.warning(f"Analysis cancelled: {str(e)}")
+        if e.reason == 'deadline':
+            return jsonify({'error': 'Analysis did not finish within the time limit'}), 504
+        # Nobody is listening; 499 marks it in the access log
+        return jsonify({'error': 'Client disconnected'}), 499
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in analyze endpoint: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def _analyze_against_store(text_content, template, compact, mode, store_key, incremental, deadline):
+    """
+    Analyze a transcript, reusing or updating the stored previous analysis.
+    
+    Returns:
+        dict: The analysis, also stored under store_key
+    """
+    previous = transcript_store.get(store_key) if incremental else None
+    if previous is None:
+        analysis_result = analyze_text_with_ai(text_content, template=template, compact=compact,
+                                               deadline=deadline, mode=mode)
+    else:
+        diff = diff_sections(previous['text'], text_content)
+        if not diff['added'] and not diff['removed']:
+            logger.info("Transcript unchanged since last analysis")
+            analysis_result = previous['result']
+        elif diff['changed_ratio'] <= MAX_INCREMENTAL_CHANGE_RATIO:
+            logger.info(f"Re-analyzing {len(diff['added'])} changed sections incrementally")
+            analysis_result = update_analysis_with_ai(previous['result'], diff, deadline=deadline, mode=mode)
+        else:
+            analysis_result = analyze_text_with_ai(text_content, template=template, compact=compact,
+                                                   deadline=deadline, mode=mode)
+    transcript_store.put(store_key, text_content, analysis_result)
+    return analysis_result
+
+@app.route('/preview', methods=['POST'])
+def preview():
+    """
+    Return an instant local summary of a transcript while the full AI
+    analysis runs.
+    
+    Expected JSON payload:
+    {
+        "url": "https://example.com/transcript"
     }
+    
+    Returns the same schema as /analyze with "degraded": true. The page fetch
+    is shared with a concurrent /analyze request for the same URL.
     """
     try:
-        # Validate request content type
         if not request.is_json:
             return jsonify({'error': 'Request must be JSON'}), 400
         
-        # Get request data
         data = request.get_json()
-        
-        # Validate required fields
         if not data or 'url' not in data:
             return jsonify({'error': 'Please provide a URL to analyze'}), 400
         
@@ -71,98 +257,428 @@ def analyze():
         if not url:
             return jsonify({'error': 'Please enter a valid URL'}), 400
         
-        logger.info(f"Starting analysis for URL: {url}")
+        routed = _route_to_owner(url, '/preview', data)
+        if routed is not None:
+            return routed
         
-        # Step 1: Scrape text from URL
         try:
-            text_content = scrape_text_from_url(url)
+            text_content = _scrape_shared(url)
         except Exception as e:
             logger.error(f"Scraping failed: {str(e)}")
             return jsonify({'error': f'Unable to access the webpage: {str(e)}'}), 400
         
-        # Step 2: Analyze text with AI
+        return jsonify(summarize_transcript(text_content)), 200
+        
+    except Exception as e:
+        logger.error(f"Unexpected error in preview endpoint: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/prefetch', methods=['POST'])
+def prefetch():
+    """
+    Start scraping a URL before it is submitted for analysis.
+    
+    Expected JSON payload:
+    {
+        "url": "https://example.com/transcript"
+    }
+    
+    Returns 202 right away while the page is fetched and extracted in the
+    background. An /analyze or /preview request for the same URL joins the
+    running scrape; otherwise the result is held up to PREFETCH_KEEP_SECONDS
+    for the next /analyze of the URL, which uses it up. No model call is
+    made. Returns 429 when too many prefetches are running.
+    """
+    global _prefetch_pending
+    try:
+        if not request.is_json:
+            return jsonify({'error': 'Request must be JSON'}), 400
+        
+        data = request.get_json()
+        if not data or not isinstance(data.get('url'), str):
+            return jsonify({'error': 'Please provide a URL to prefetch'}), 400
+        
+        url = data['url'].strip()
         try:
-            analysis_result = analyze_text_with_ai(text_content)
-        except Exception as e:
-            logger.error(f"AI analysis failed: {str(e)}")
-            return jsonify({'error': f'Unable to analyze the content: {str(e)}'}), 500
+            _validate_url(url)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        logger.info("Analysis completed successfully")
-        return jsonify(analysis_result), 200
+        if PREFETCH_KEEP_SECONDS <= 0:
+            return jsonify({'status': 'disabled'}), 200
+        
+        # The owner node does the scrape, so its /analyze finds the result
+        routed = _route_to_owner(url, '/prefetch', data, timeout=5)
+        if routed is not None:
+            return routed
+        
+        with _prefetch_lock:
+            if _prefetch_pending >= PREFETCH_MAX_PENDING:
+                metrics.incr('prefetch.rejected')
+                return jsonify({'error': 'Too many prefetches in progress'}), 429
+            _prefetch_pending += 1
+        prefetch_executor.submit(_prefetch, url)
+        metrics.incr('prefetch.started')
+        return jsonify({'status': 'prefetching'}), 202
         
     except Exception as e:
-        logger.error(f"Unexpected error in analyze endpoint: {str(e)}")
+        logger.error(f"Unexpected error in prefetch endpoint: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def _route_to_owner(url, path, payload, timeout=None):
+    """
+    Forward a request to the cluster node that owns the URL.
+    
+    Returns:
+        tuple: The owner's (response, status), or None to handle the request
+            here (no cluster, this node owns the URL, the request was already
+            forwarded once, or the owner is unreachable)
+    """
+    if router is None or FORWARDED_HEADER in request.headers:
+        return None
+    owner = router.owner(url)
+    if router.is_local(owner):
+        return None
+    logger.info(f"Forwarding {path} for {url} to {owner}")
+    forwarded = router.forward(owner, path, payload, timeout=timeout)
+    if forwarded is None:
+        return None
+    status, body = forwarded
+    response = etag_json(body, status)
+    response.headers[NODE_HEADER] = owner
+    return response, response.status_code
+
+@app.after_request
+def tag_serving_node(response):
+    """Name the node that served the request (cluster mode only)."""
+    if router is not None:
+        response.headers.setdefault(NODE_HEADER, router.self_url)
+    return response
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    """Serve a static file under its fingerprinted name (see asset_url in templates)."""
+    return static_assets.response(filename)
+
+@app.route('/metrics')
+def metrics_snapshot():
+    """Return stage timings (fetch, decode, parse, ...) and event counters."""
+    return jsonify(metrics.snapshot()), 200
+
+@app.route('/healthz')
+def healthz():
+    """Liveness probe: the worker is up and serving requests."""
+    return jsonify({'status': 'ok'}), 200
+
+@app.route('/readyz')
+def readyz():
+    """
+    Readiness probe for the load balancer.
+    
+    Returns 503 while the worker should not get new analyses: the
+    environment is misconfigured, the circuit breaker is open, or every
+    model call slot is taken (plus READY_MAX_QUEUE_DEPTH waiting calls), so
+    a new request would queue behind a slow model call.
+    """
+    stats = model_provider.stats() if hasattr(model_provider, 'stats') else {}
+    in_flight = stats.get('in_flight', 0)
+    max_in_flight = stats.get('max_in_flight')
+    queue_depth = stats.get('waiting', 0)
+    circuit = stats.get('circuit', 'closed')
+    
+    reasons = []
+    if not _environment_ready():
+        reasons.append('environment')
+    if circuit == 'open':
+        reasons.append('circuit_open')
+    if max_in_flight is not None and in_flight + queue_depth >= max_in_flight + READY_MAX_QUEUE_DEPTH:
+        reasons.append('at_capacity')
+    
+    body = {
+        'status': 'not_ready' if reasons else 'ready',
+        'reasons': reasons,
+        'in_flight': in_flight,
+        'max_in_flight': max_in_flight,
+        'queue_depth': queue_depth,
+        'circuit': circuit
+    }
+    return jsonify(body), 503 if reasons else 200
+
+def _environment_ready():
+    """validate_environment(), checked once per process (it only reads env vars)."""
+    global _environment_ok
+    if _environment_ok is None:
+        _environment_ok = validate_environment()
+    return _environment_ok
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
     return jsonify({'error': 'Endpoint not found'}), 404
 
+@app.errorhandler(413)
+def request_too_large(error):
+    """Handle oversized uploads."""
+    limit = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({'error': f'Upload is larger than the {limit} MB limit'}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
     logger.error(f"Internal server error: {str(error)}")
     return jsonify({'error': 'Internal server error'}), 500
 
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-import google.generativeai as genai
 import json
+import threading
+import hashlib
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from prompts import registry as prompt_registry, pack_documents, estimate_tokens, RESPONSE_MODES
+from providers import create_provider, ModelUnavailableError
+from fallback import summarize_transcript
+from preextract import condense_transcript
+from singleflight import SingleFlight
+from cache import Cache, create_backend
+from routing import create_router, normalize_url, FORWARDED_HEADER, NODE_HEADER
+from archive import create_archive, archived_chunks, ARCHIVE_ERRORS
+from httpcache import Compressor, StaticAssets, etag_json
+from incremental import TranscriptStore, diff_sections, MAX_INCREMENTAL_CHANGE_RATIO
+from metrics import metrics
+from parsing import ParsePool
+from transcript import Transcript
+from deadline import Deadline, RequestCancelled, client_disconnect_check
+from lazy import lazy_import
+from documents import (
+    CHUNK_SIZE, detect_document_type, extract_document_stream, extract_uploaded_document
+)
+
+# Heavy dependencies are imported on first use (see preload())
+requests = lazy_import('requests')
+bs4 = lazy_import('bs4')
+
+# CPU-bound parsing of large pages runs on worker processes (PARSE_WORKERS)
+parse_pool = ParsePool()
+
+# Previous cleaned text and analysis per URL for incremental re-analysis, in
+# the configured cache backend (CACHE_BACKEND) so workers share them
+INCREMENTAL_MAX_URLS = int(os.getenv('INCREMENTAL_MAX_URLS', '256'))
+transcript_store = TranscriptStore(
+    max_entries=INCREMENTAL_MAX_URLS,
+    backend=create_backend('transcripts', max_entries=INCREMENTAL_MAX_URLS)
+)
+
+# Concurrent scrapes of the same URL share one fetch. With SCRAPE_CACHE_SECONDS
+# set, scraped transcripts are also cached in the backend and fetched by one
+# worker at a time; off by default so live transcripts are always re-fetched.
+scrape_flight = SingleFlight()
+SCRAPE_CACHE_SECONDS = float(os.getenv('SCRAPE_CACHE_SECONDS', '0'))
+scrape_cache = Cache(create_backend('scrapes', max_entries=INCREMENTAL_MAX_URLS), ttl=SCRAPE_CACHE_SECONDS)
+
+# Requests with a deadline wait for the shared scrape from here, so each can
+# stop waiting on its own deadline while the scrape carries on for the others
+scrape_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('SCRAPE_WORKERS', '16')),
+    thread_name_prefix='scrape'
+)
+
+def _scrape_shared(url, keep=0, deadline=None, take=False):
+    """
+    Scrape a URL, sharing the work with concurrent requests for it.
+    
+    Requests are matched on the normalized URL (as routed), so variants
+    such as a trailing slash or tracking parameters share one scrape. The
+    shared scrape runs under the server budget (ANALYZE_TIMEOUT_SECONDS)
+    rather than any one request's deadline, so a request that times out or
+    disconnects does not fail the others waiting on it.
+    
+    Args:
+        url (str): The URL to scrape
+        keep (float): Seconds to hold the result for the next taker, if this
+            call does the scrape (prefetches)
+        deadline (Deadline): Request deadline; the caller stops waiting
+            once it passes or the client disconnects
+        take (bool): Use up a prefetched result; it is served to one
+            analysis only, so later re-analyses see a fresh scrape
+    
+    Raises:
+        RequestCancelled: If the caller's deadline passed or its client
+            disconnected first
+    """
+    key = normalize_url(url)
+    
+    def fetch():
+        return scrape_flight.do(
+            key, lambda: scrape_text_from_url(url, deadline=Deadline(ANALYZE_TIMEOUT_SECONDS)),
+            keep=keep, take=take
+        )
+    
+    def scrape():
+        if SCRAPE_CACHE_SECONDS <= 0:
+            return fetch()
+        return scrape_cache.get_or_compute(key, fetch)
+    
+    if deadline is None:
+        return scrape()
+    return deadline.wait(scrape_executor.submit(scrape), 'fetch')
+
+# Speculative prefetch: /prefetch scrapes run here, at most
+# PREFETCH_MAX_PENDING at a time, and their result is held up to
+# PREFETCH_KEEP_SECONDS for the one /analyze request that follows
+PREFETCH_KEEP_SECONDS = float(os.getenv('PREFETCH_KEEP_SECONDS', '60'))
+PREFETCH_MAX_PENDING = int(os.getenv('PREFETCH_MAX_PENDING', '16'))
+prefetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('PREFETCH_WORKERS', '4')),
+    thread_name_prefix='prefetch'
+)
+_prefetch_pending = 0
+_prefetch_lock = threading.Lock()
+
+def _prefetch(url):
+    """Background task: scrape a URL and keep the result for /analyze."""
+    global _prefetch_pending
+    try:
+        _scrape_shared(url, keep=PREFETCH_KEEP_SECONDS)
+        metrics.incr('prefetch.completed')
+    except Exception as e:
+        # The /analyze request will retry and report the error
+        logger.info(f"Prefetch of {url} failed: {str(e)}")
+        metrics.incr('prefetch.failed')
+    finally:
+        with _prefetch_lock:
+            _prefetch_pending -= 1
+
+# Raw fetched bodies, kept for replaying extraction (PAGE_ARCHIVE_DIR)
+page_archive = create_archive()
+
+# Multi-node deployments (CLUSTER_NODES): route each URL to one owner node
+router = create_router()
+
+# gzip/brotli responses (COMPRESS_MIN_BYTES) and fingerprinted static assets
+app.after_request(Compressor())
+static_assets = StaticAssets(app.static_folder)
+app.jinja_env.globals['asset_url'] = static_assets.url
+
+# Longest single page fetch; a request deadline shortens it
+FETCH_TIMEOUT_SECONDS = 15
+
+# Paginated transcripts: page and byte caps, and concurrent page fetches
+MAX_TRANSCRIPT_PAGES = int(os.getenv('MAX_TRANSCRIPT_PAGES', '10'))
+MAX_TRANSCRIPT_BYTES = int(os.getenv('MAX_TRANSCRIPT_BYTES', str(20 * 1024 * 1024)))
+PAGE_FETCH_WORKERS = int(os.getenv('PAGE_FETCH_WORKERS', '4'))
+
+def _validate_url(url):
+    """
+    Check that a URL can be scraped.
+    
+    Returns:
+        ParseResult: The parsed URL
+        
+    Raises:
+        ValueError: If the URL is malformed or not HTTP(S)
+    """
+    parsed_url = urlparse(url)
+    if not parsed_url.scheme or not parsed_url.netloc:
+        raise ValueError("Invalid URL format")
+    if parsed_url.scheme not in ['http', 'https']:
+        raise ValueError("URL must use HTTP or HTTPS protocol")
+    return parsed_url
+
+def _fetch_timeout(deadline, stage):
+    """
+    Timeout for one fetch: FETCH_TIMEOUT_SECONDS, or less when the request
+    deadline is closer.
+    
+    Raises:
+        RequestCancelled: If the request was already cancelled
+    """
+    if deadline is None:
+        return FETCH_TIMEOUT_SECONDS
+    deadline.check(stage)
+    return min(FETCH_TIMEOUT_SECONDS, deadline.remaining())
 
-def scrape_text_from_url(url):
+def scrape_text_from_url(url, replay=False, deadline=None):
     """
     Extract text content from a given URL.
     
+    Fetched bodies are added to the page archive when PAGE_ARCHIVE_DIR is
+    set; with replay=True the archived bodies are processed instead of
+    fetching the page again.
+    
     Args:
         url (str): The URL to scrape
+        replay (bool): Re-run extraction on the archived bodies
+        deadline (Deadline): Request deadline; fetch timeouts are cut to the
+            time left and no further page is fetched once it has passed
         
     Returns:
-        str: Extracted text content
+        Transcript: Extracted text content (a str) with its speaker segments
         
     Raises:
+        RequestCancelled: If the deadline passed or the client disconnected
         Exception: If scraping fails for any reason
     """
     try:
-        # Validate URL format
-        parsed_url = urlparse(url)
-        if not parsed_url.scheme or not parsed_url.netloc:
-            raise ValueError("Invalid URL format")
-        if parsed_url.scheme not in ['http', 'https']:
-            raise ValueError("URL must use HTTP or HTTPS protocol")
+        parsed_url = _validate_url(url)
         
         # Configure headers to avoid blocking
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        # Make request with timeout
-        logger.info(f"Scraping content from: {url}")
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        # Parse HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Extract text content
-        text = soup.get_text()
+        if replay:
+            logger.info(f"Replaying archived content for: {url}")
+            content, content_type = _archived_body(url)
+        else:
+            # Make request with timeout
+            logger.info(f"Scraping content from: {url}")
+            with metrics.timer('scrape.fetch'):
+                response = requests.get(url, headers=headers, timeout=_fetch_timeout(deadline, 'fetch'), stream=True)
+                response.raise_for_status()
+            content_type = str(response.headers.get('Content-Type', ''))
         
-        # Clean up text - remove extra whitespace and empty lines
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
+        # PDFs and Word documents are streamed to disk and extracted page by page
+        document_type = detect_document_type(content_type, parsed_url.path)
+        if document_type:
+            logger.info(f"Extracting text from {document_type.upper()} document")
+            if replay:
+                chunks = [content]
+            else:
+                chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+                if page_archive is not None:
+                    chunks = archived_chunks(page_archive, url, content_type, chunks)
+            text = extract_document_stream(chunks, document_type)
+        else:
+            if not replay:
+                content = response.content
+                _archive_page(url, content, content_type)
+            if content[:5] == b'%PDF-':
+                # Served with a generic content type; sniff the PDF signature
+                text = extract_document_stream([content], 'pdf')
+            else:
+                text, page_links = _html_to_text(content, content_type, url)
+                
+                # Multi-page transcripts: fetch the following pages concurrently
+                # and stitch them on in page order
+                if page_links:
+                    with metrics.timer('scrape.pagination'):
+                        following = _fetch_following_pages(url, page_links, headers, len(content), replay, deadline)
+                    if following:
+                        logger.info(f"Stitched {len(following)} additional transcript pages")
+                        text = ' '.join([text] + following)
         
         if len(text.strip()) < 100:
             raise ValueError("Insufficient text content found on the page")
         
-        logger.info(f"Successfully extracted {len(text)} characters of text")
-        return text
+        # Keep speaker turns and the remarks/Q&A split alongside the text
+        with metrics.timer('scrape.segment'):
+            transcript = Transcript.from_text(text)
         
+        logger.info(f"Successfully extracted {len(text)} characters of text in {len(transcript.segments)} segments")
+        return transcript
+        
+    except RequestCancelled:
+        raise
     except requests.exceptions.Timeout:
         logger.error(f"Timeout while scraping {url}")
         raise Exception("Request timed out - the website took too long to respond")
@@ -179,83 +695,463 @@ def scrape_text_from_url(url):
         logger.error(f"Unexpected error while scraping {url}: {str(e)}")
         raise Exception("Failed to extract content from the website")
 
-def analyze_text_with_ai(text):
+def _html_to_text(content, content_type, url):
+    """
+    Decode, parse and clean one HTML page (large pages on the parse pool).
+    
+    Returns:
+        tuple: (cleaned text, URLs of the following pages of a paginated transcript)
+    """
+    return parse_pool.parse(content, content_type, url, max_pages=MAX_TRANSCRIPT_PAGES)
+
+def _archive_page(url, content, content_type, referrer=''):
+    """Add a fetched body to the page archive, if enabled; failures are only logged."""
+    if page_archive is None:
+        return
+    try:
+        page_archive.put(url, content, content_type, referrer)
+    except ARCHIVE_ERRORS as e:
+        logger.warning(f"Could not archive {url}: {str(e)}")
+
+def _archived_body(url):
+    """
+    Return the archived (content, content type) of a URL for replay.
+    
+    Raises:
+        ValueError: If archiving is disabled or the URL is not archived
+    """
+    if page_archive is None:
+        raise ValueError("Page archive is not enabled (set PAGE_ARCHIVE_DIR)")
+    try:
+        return page_archive.load(url)
+    except KeyError:
+        raise ValueError(f"No archived copy of {url}")
+
+def _fetch_page(page_url, headers, replay=False, referrer='', timeout=FETCH_TIMEOUT_SECONDS):
+    """Fetch one following page; returns (text, next page links, size) or None on failure."""
+    try:
+        if replay:
+            content, content_type = _archived_body(page_url)
+        else:
+            response = requests.get(page_url, headers=headers, timeout=timeout)
+            response.raise_for_status()
+            content = response.content
+            content_type = str(response.headers.get('Content-Type', ''))
+            _archive_page(page_url, content, content_type, referrer)
+        text, page_links = _html_to_text(content, content_type, page_url)
+        return text, page_links, len(content)
+    except Exception as e:
+        logger.warning(f"Could not fetch transcript page {page_url}: {str(e)}")
+        return None
+
+def _fetch_following_pages(url, page_links, headers, first_page_bytes, replay=False, deadline=None):
+    """
+    Fetch the remaining pages of a paginated transcript.
+    
+    Known pages are fetched concurrently; if the last one links to further
+    pages (rel="next" chains) another round is started. Fetching stops at
+    MAX_TRANSCRIPT_PAGES pages, MAX_TRANSCRIPT_BYTES in total or the first
+    page that fails, so the stitched text never has gaps.
+    
+    Returns:
+        list: Cleaned text of each following page, in page order
+    
+    Raises:
+        RequestCancelled: If the deadline passed or the client disconnected
+            before a round of pages
+    """
+    visited = {url}
+    texts = []
+    total_bytes = first_page_bytes
+    pending = [link for link in page_links if link not in visited]
+    
+    while pending:
+        batch = pending[:MAX_TRANSCRIPT_PAGES - 1 - len(texts)]
+        if not batch:
+            break
+        visited.update(batch)
+        timeout = _fetch_timeout(deadline, 'pagination')
+        with ThreadPoolExecutor(max_workers=min(len(batch), PAGE_FETCH_WORKERS)) as pool:
+            results = list(pool.map(lambda link: _fetch_page(link, headers, replay, url, timeout), batch))
+        
+        pending = []
+        for result in results:
+            if result is None:
+                return texts
+            text, page_links, size = result
+            total_bytes += size
+            if total_bytes > MAX_TRANSCRIPT_BYTES:
+                logger.info("Transcript byte limit reached, ignoring remaining pages")
+                return texts
+            texts.append(text)
+            metrics.incr('scrape.pages_followed')
+        pending = [link for link in page_links if link not in visited]
+    
+    return texts
+
+REQUIRED_FIELDS = ['sentiment', 'good_news', 'bad_news', 'key_promises', 'verdict']
+
+# Model backend used for analysis (MODEL_PROVIDER=gemini|local|fake)
+model_provider = create_provider()
+
+# Default input mode: "full" truncated text or "compact" condensed key sentences
+DEFAULT_INPUT_MODE = os.getenv('ANALYSIS_INPUT_MODE', 'full')
+COMPACT_MAX_CHARS = int(os.getenv('COMPACT_MAX_CHARS', '6000'))
+
+# Response length: default mode ("brief" or "detailed", per request as
+# "response_mode") and generation settings sent with every model call
+DEFAULT_RESPONSE_MODE = os.getenv('RESPONSE_MODE', 'detailed')
+GENERATION_TEMPERATURE = os.getenv('GENERATION_TEMPERATURE', '')
+GENERATION_STOP_SEQUENCES = [stop for stop in os.getenv('GENERATION_STOP_SEQUENCES', '').split('|') if stop]
+for _mode in RESPONSE_MODES.values():
+    _mode.max_output_tokens = int(os.getenv(f'{_mode.name.upper()}_MAX_OUTPUT_TOKENS', str(_mode.max_output_tokens)))
+
+def _generation_config(mode, documents=1):
+    """
+    Generation settings for a model call in a response mode.
+    
+    Args:
+        mode (ResponseMode): Response mode of the analysis
+        documents (int): Analyses in the answer (packed calls)
+    """
+    config = {'max_output_tokens': mode.max_output_tokens * documents}
+    if GENERATION_TEMPERATURE:
+        config['temperature'] = float(GENERATION_TEMPERATURE)
+    if GENERATION_STOP_SEQUENCES:
+        config['stop_sequences'] = GENERATION_STOP_SEQUENCES
+    return config
+
+# Bulk analysis packs short transcripts into one model call, up to this many
+# estimated transcript tokens and documents per call
+PACK_MAX_TOKENS = int(os.getenv('PACK_MAX_TOKENS', '8000'))
+PACK_MAX_DOCUMENTS = int(os.getenv('PACK_MAX_DOCUMENTS', '8'))
+
+# /readyz: result of validate_environment() and how many model calls may wait
+# for a slot (beyond MAX_INFLIGHT_LLM_CALLS) before the worker is not ready
+_environment_ok = None
+READY_MAX_QUEUE_DEPTH = int(os.getenv('READY_MAX_QUEUE_DEPTH', '0'))
+
+# Serve a local extractive summary when the model is unavailable or saturated
+DEGRADED_FALLBACK = os.getenv('DEGRADED_FALLBACK', '1') != '0'
+
+# Server-side time budget for /analyze; clients may ask for less
+ANALYZE_TIMEOUT_SECONDS = float(os.getenv('ANALYZE_TIMEOUT_SECONDS', '120'))
+
+# Model calls for requests with a deadline run here so the request thread can
+# stop waiting when the deadline passes or the client disconnects
+model_call_executor = ThreadPoolExecutor(
+    max_workers=2 * int(os.getenv('MAX_INFLIGHT_LLM_CALLS', '8')),
+    thread_name_prefix='model-call'
+)
+
+def _request_deadline(data):
     """
-    Analyze transcript text using Google Gemini AI.
+    Build the Deadline for an /analyze request.
+    
+    The client budget comes from the "timeout" field and the
+    X-Request-Timeout header, in seconds; when both are given (a forwarded
+    request keeps the client's field and carries the entry node's remaining
+    budget in the header) the smaller applies. It is capped by
+    ANALYZE_TIMEOUT_SECONDS.
+    
+    Raises:
+        ValueError: If a client budget is not a positive number
+    """
+    budget = ANALYZE_TIMEOUT_SECONDS
+    for requested in (data.get('timeout'), request.headers.get('X-Request-Timeout')):
+        if requested is None:
+            continue
+        try:
+            requested = float(requested)
+        except (TypeError, ValueError):
+            raise ValueError('timeout must be a number of seconds')
+        if not requested > 0:
+            raise ValueError('timeout must be a positive number of seconds')
+        budget = min(budget, requested)
+    return Deadline(budget, client_disconnect_check(request.environ))
+
+def _parse_json_response(response_text, opening='{', closing='}'):
+    """
+    Parse a model response as JSON, ignoring any text around the outermost
+    ``opening``...``closing`` span.
+    
+    Raises:
+        json.JSONDecodeError: If the extracted span is not valid JSON
+        Exception: If the response is empty or has no JSON in it
+    """
+    if not response_text:
+        raise Exception("Empty response from AI service")
+    
+    # Parse JSON response
+    try:
+        return json.loads(response_text.strip())
+    except json.JSONDecodeError:
+        # Try to extract JSON from response if it contains extra text
+        response_text = response_text.strip()
+        start_idx = response_text.find(opening)
+        end_idx = response_text.rfind(closing) + 1
+        
+        if start_idx != -1 and end_idx != 0:
+            json_text = response_text[start_idx:end_idx]
+            return json.loads(json_text)
+        raise Exception("Could not parse AI response as JSON")
+
+def _generate_analysis(template, parts, deadline=None, mode=None):
+    """
+    Send a rendered prompt to the model provider and parse the structured JSON analysis.
     
     Args:
-        text (str): The transcript text to analyze
+        template (PromptTemplate): The template the prompt was rendered from
+        parts (list): [static instruction prefix, request body]
+        deadline (Deadline): Request deadline; the call is abandoned, and
+            times out at the provider, once it passes or the client leaves
+        mode (ResponseMode): Response mode the prompt was rendered with;
+            sets the generation settings and item counts
         
     Returns:
-        dict: Structured analysis results
+        dict: Validated analysis results
         
     Raises:
-        Exception: If AI analysis fails for any reason
+        RequestCancelled: If the deadline passed or the client disconnected
+        ValueError: If the provider is not configured
+        Exception: If the model call, parsing or validation fails
+    """
+    logger.info(f"Sending text to {model_provider.name} for analysis...")
+    mode = mode or RESPONSE_MODES[DEFAULT_RESPONSE_MODE]
+    config = _generation_config(mode)
+    
+    # Generate analysis
+    with metrics.timer('analysis.model'), metrics.timer(f'analysis.model.{mode.name}'):
+        if deadline is None:
+            response_text = model_provider.generate(template, parts, config=config)
+        else:
+            deadline.check('model')
+            future = model_call_executor.submit(
+                model_provider.generate, template, parts, timeout=deadline.remaining(), config=config
+            )
+            response_text = deadline.wait(future, 'model')
+    _record_output_tokens(mode, response_text)
+    
+    analysis_result = _parse_json_response(response_text)
+    
+    # Validate required fields
+    for field in REQUIRED_FIELDS:
+        if field not in analysis_result:
+            raise Exception(f"AI response missing required field: {field}")
+    
+    analysis_result['response_mode'] = mode.name
+    return mode.enforce(analysis_result)
+
+def _record_output_tokens(mode, response_text, documents=1):
+    """Count (estimated) output tokens per response mode, for /metrics."""
+    metrics.incr(f'analysis.output_tokens.{mode.name}', estimate_tokens(response_text or ''))
+    metrics.incr(f'analysis.responses.{mode.name}', documents)
+
+def _prepare_text(text, compact=False):
+    """Condense, render and truncate transcript text for a model call."""
+    if compact:
+        original_length = len(text)
+        text = condense_transcript(text, max_chars=COMPACT_MAX_CHARS)
+        logger.info(f"Condensed transcript from {original_length} to {len(text)} characters")
+    elif isinstance(text, Transcript) and text.speakers:
+        # Speaker turns give the model who said what; cut at 20,000 characters
+        text = text.render(max_chars=20000)
+    
+    # Truncate text if too long (20,000 character limit)
+    if len(text) > 20000:
+        text = text[:20000]
+        logger.info("Text truncated to 20,000 characters for AI processing")
+    return text
+
+def analyze_text_with_ai(text, template=None, compact=False, deadline=None, mode=None):
+    """
+    Analyze transcript text using the configured model provider (Google Gemini by default).
+    
+    Args:
+        text (str): The transcript text to analyze; a Transcript is sent
+            one speaker turn per line with section headings
+        template (PromptTemplate): Prompt template to use, defaults to the
+            latest "earnings_call" template
+        compact (bool): Send only the most salient sentences (figures,
+            guidance, forward-looking statements) instead of the raw text
+        deadline (Deadline): Optional request deadline for the model call
+        mode (ResponseMode): Length limits and generation settings, defaults
+            to RESPONSE_MODE
+        
+    Returns:
+        dict: Structured analysis results, tagged with the prompt version
+            and response mode
+        
+    Raises:
+        RequestCancelled: If the deadline passed or the client disconnected
+        ModelUnavailableError: If the AI service is down, over quota or saturated
+        Exception: If AI analysis fails for any other reason
     """
     try:
-        # Get API key from environment
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("Google API key not configured")
+        template = template or prompt_registry.get()
+        text = _prepare_text(text, compact)
         
-        # Configure Gemini AI
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-pro')
+        # Static instructions and transcript are rendered as separate parts
+        # so the prefix can be cached by the provider
+        mode = mode or RESPONSE_MODES[DEFAULT_RESPONSE_MODE]
+        parts = template.render(mode=mode, text=text)
         
-        # Truncate text if too long (20,000 character limit)
-        if len(text) > 20000:
-            text = text[:20000]
-            logger.info("Text truncated to 20,000 characters for AI processing")
+        analysis_result = _generate_analysis(template, parts, deadline, mode)
+        analysis_result['prompt_version'] = template.id
+        if compact:
+            analysis_result['input_mode'] = 'compact'
         
-        # Create structured prompt for consistent JSON responses
-        prompt = f"""
-        Analyze this earnings call transcript and provide a structured analysis in JSON format.
+        logger.info("AI analysis completed successfully")
+        return analysis_result
         
-        Please analyze the following earnings call transcript and return ONLY a valid JSON object with these exact keys:
-        - "sentiment": A 1-2 word summary of the overall sentiment (e.g., "Positive", "Mixed", "Cautious")
-        - "good_news": An array of 3-5 positive highlights from the call
-        - "bad_news": An array of 3-5 negative points or concerns mentioned
-        - "key_promises": An array of 2-4 key management promises or forward-looking statements
-        - "verdict": A paragraph summary for investors explaining the key takeaways
+    except (ModelUnavailableError, RequestCancelled):
+        raise
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        raise Exception(str(e))
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse AI response as JSON: {e}")
+        raise Exception("AI service returned invalid response format")
+    except Exception as e:
+        logger.error(f"AI analysis failed: {str(e)}")
+        raise Exception("Failed to analyze transcript with AI service")
+
+def analyze_texts_with_ai(documents, template=None, compact=False, mode=None):
+    """
+    Analyze several transcripts, packing short ones into shared model calls.
+    
+    Documents are grouped up to PACK_MAX_TOKENS and PACK_MAX_DOCUMENTS; each
+    group of two or more is sent as one prompt asking for a JSON array keyed
+    by document id. Any document missing from the answer, or with an invalid
+    entry, is analyzed with a call of its own, as is every document of a
+    group whose answer cannot be parsed at all.
+    
+    Args:
+        documents (list): (id, text) pairs
+        template (PromptTemplate): Prompt template, defaults to the latest
+            "earnings_call" template
+        compact (bool): Send condensed transcripts
+        mode (ResponseMode): Length limits and generation settings, defaults
+            to RESPONSE_MODE
         
-        Transcript text:
-        {text}
+    Returns:
+        dict: Document id -> analysis dict, or the Exception its analysis
+            failed with
         
-        Return only the JSON object, no additional text or formatting:
-        """
+    Raises:
+        ModelUnavailableError: If the AI service is down, over quota or saturated
+    """
+    template = template or prompt_registry.get()
+    mode = mode or RESPONSE_MODES[DEFAULT_RESPONSE_MODE]
+    prepared = [(str(doc_id), _prepare_text(text, compact)) for doc_id, text in documents]
+    results = {}
+    
+    for group in pack_documents(prepared, PACK_MAX_TOKENS, PACK_MAX_DOCUMENTS):
+        if len(group) > 1:
+            results.update(_generate_packed_analysis(template, group, mode))
+        for doc_id, text in group:
+            if doc_id in results:
+                continue
+            if len(group) > 1:
+                metrics.incr('analysis.pack_fallbacks')
+            try:
+                # Already condensed above
+                results[doc_id] = analyze_text_with_ai(text, template, mode=mode)
+            except ModelUnavailableError:
+                raise
+            except Exception as e:
+                results[doc_id] = e
+    
+    if compact:
+        for result in results.values():
+            if isinstance(result, dict):
+                result['input_mode'] = 'compact'
+    return {str(doc_id): results[str(doc_id)] for doc_id, _ in documents}
+
+def _generate_packed_analysis(template, group, mode):
+    """
+    Analyze a group of documents in one model call.
+    
+    Returns:
+        dict: Document id -> analysis for each valid entry of the answer;
+            documents left out need a call of their own
+    """
+    ids = {doc_id for doc_id, _ in group}
+    try:
+        with metrics.timer('analysis.model'):
+            response_text = model_provider.generate(template, template.render_batch(group, mode),
+                                                    config=_generation_config(mode, len(group)))
+        _record_output_tokens(mode, response_text, len(group))
+        entries = _parse_json_response(response_text, '[', ']')
+    except ModelUnavailableError:
+        raise
+    except Exception as e:
+        logger.warning(f"Packed analysis of {len(group)} documents failed: {str(e)}")
+        return {}
+    
+    results = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        doc_id = str(entry.pop('document_id', ''))
+        if doc_id in ids and doc_id not in results and all(field in entry for field in REQUIRED_FIELDS):
+            entry['prompt_version'] = template.id
+            entry['response_mode'] = mode.name
+            results[doc_id] = mode.enforce(entry)
+    metrics.incr('analysis.packed_calls')
+    metrics.incr('analysis.packed_documents', len(results))
+    logger.info(f"Packed analysis returned {len(results)} of {len(group)} documents")
+    return results
+
+def update_analysis_with_ai(previous_result, diff, deadline=None, mode=None):
+    """
+    Merge new or revised transcript sections into a previous analysis.
+    
+    Only the changed sections are sent to the model, together with the
+    previous structured result, so re-analysis of a live transcript costs
+    a fraction of a full run.
+    
+    Args:
+        previous_result (dict): The analysis of the previous transcript version
+        diff (dict): Section diff as returned by incremental.diff_sections
+        deadline (Deadline): Optional request deadline for the model call
+        mode (ResponseMode): Length limits and generation settings, defaults
+            to RESPONSE_MODE
         
-        logger.info("Sending text to Gemini AI for analysis...")
+    Returns:
+        dict: Updated structured analysis results
         
-        # Generate analysis
-        response = model.generate_content(prompt)
+    Raises:
+        RequestCancelled: If the deadline passed or the client disconnected
+        ModelUnavailableError: If the AI service is down, over quota or saturated
+        Exception: If AI analysis fails for any other reason
+    """
+    try:
+        added_text = '\n'.join(f"- {section}" for section in diff['added']) or '- (none)'
+        removed_text = '\n'.join(f"- {section}" for section in diff['removed']) or '- (none)'
         
-        if not response.text:
-            raise Exception("Empty response from AI service")
+        # Apply the same 20,000 character budget as a full analysis
+        if len(added_text) > 20000:
+            added_text = added_text[:20000]
+            logger.info("Changed sections truncated to 20,000 characters for AI processing")
         
-        # Parse JSON response
-        try:
-            analysis_result = json.loads(response.text.strip())
-        except json.JSONDecodeError:
-            # Try to extract JSON from response if it contains extra text
-            response_text = response.text.strip()
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != 0:
-                json_text = response_text[start_idx:end_idx]
-                analysis_result = json.loads(json_text)
-            else:
-                raise Exception("Could not parse AI response as JSON")
+        template = prompt_registry.get('incremental_update')
+        mode = mode or RESPONSE_MODES[DEFAULT_RESPONSE_MODE]
+        parts = template.render(
+            mode=mode,
+            previous=json.dumps({field: previous_result.get(field) for field in REQUIRED_FIELDS}),
+            added=added_text,
+            removed=removed_text
+        )
         
-        # Validate required fields
-        required_fields = ['sentiment', 'good_news', 'bad_news', 'key_promises', 'verdict']
-        for field in required_fields:
-            if field not in analysis_result:
-                raise Exception(f"AI response missing required field: {field}")
+        analysis_result = _generate_analysis(template, parts, deadline, mode)
+        analysis_result['prompt_version'] = previous_result.get('prompt_version', template.id)
         
-        logger.info("AI analysis completed successfully")
+        logger.info("Incremental AI analysis completed successfully")
         return analysis_result
         
+    except (ModelUnavailableError, RequestCancelled):
+        raise
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         raise Exception(str(e))
@@ -263,9 +1159,31 @@ def analyze_text_with_ai(text):
         logger.error(f"Failed to parse AI response as JSON: {e}")
         raise Exception("AI service returned invalid response format")
     except Exception as e:
-        logger.error(f"AI analysis failed: {str(e)}")
+        logger.error(f"Incremental AI analysis failed: {str(e)}")
         raise Exception("Failed to analyze transcript with AI service")
 
+def preload():
+    """
+    Import heavy dependencies and compile extraction rules ahead of the
+    first request.
+    
+    Called at import when PRELOAD_DEPENDENCIES=1; a pre-forking server can
+    call it once in the master process so every worker starts warm.
+    """
+    import providers
+    import preextract
+    import documents
+    import domain_rules
+    import encoding
+    for module in (requests, bs4, providers.genai, preextract.np, documents.pypdf, encoding.charset_normalizer):
+        if module is not None:
+            module.load()
+    domain_rules.rules.preload()
+    logger.info("Preloaded heavy dependencies")
+
+if os.getenv('PRELOAD_DEPENDENCIES', '0') == '1':
+    preload()
+
 if __name__ == '__main__':
     # Validate environment on startup
     if not validate_environment():
@@ -0,0 +1,300 @@
+"""
+Content-addressed archive of raw fetched pages.
+
+Every fetched body (HTML pages, following pages of paginated transcripts,
+PDF and Word documents) is stored once under its SHA-256, compressed with
+zstd when the ``zstandard`` package is installed and gzip otherwise. A
+SQLite index maps each URL to the bodies fetched for it. Changing the
+extraction logic or a prompt can then be re-run from the archive instead of
+fetching every transcript site again, including pages that have since
+disappeared.
+
+Blobs are read through mmap and decompressed straight from the mapping, so
+a bulk replay of thousands of pages does not copy each file into a read
+buffer first. ``replay()`` walks the index in blob order for sequential
+disk access.
+"""
+
+import os
+import gzip
+import mmap
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import namedtuple
+
+from lazy import lazy_import
+
+zstandard = lazy_import('zstandard', optional=True)
+
+logger = logging.getLogger(__name__)
+
+# Disk and index failures; archiving is best effort for the scraper
+ARCHIVE_ERRORS = (OSError, sqlite3.Error)
+
+# referrer: the transcript URL whose pagination led to this page ('' for
+# pages fetched directly)
+ArchivedPage = namedtuple('ArchivedPage', ['url', 'sha256', 'content_type', 'size', 'fetched_at', 'referrer'])
+
+
+class PageArchive:
+    """Blob store of raw page bodies plus a URL index, under one directory."""
+
+    def __init__(self, root, compression=None):
+        """
+        Args:
+            root (str): Archive directory, created if missing
+            compression (str): "zstd" or "gzip"; defaults to zstd when available
+        """
+        self.root = root
+        self.compression = compression or ('zstd' if zstandard is not None else 'gzip')
+        if self.compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        if self.compression not in ('zstd', 'gzip'):
+            raise ValueError(f"Unknown archive compression: {self.compression}")
+        os.makedirs(os.path.join(root, 'blobs'), exist_ok=True)
+        self._local = threading.local()
+        with self._index() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS pages (url TEXT NOT NULL, sha256 TEXT NOT NULL, "
+                "content_type TEXT NOT NULL, size INTEGER NOT NULL, fetched_at REAL NOT NULL, "
+                "referrer TEXT NOT NULL DEFAULT '', PRIMARY KEY (url, sha256))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS pages_latest ON pages (url, fetched_at)")
+
+    def _index(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(os.path.join(self.root, 'index.sqlite'), timeout=10.0)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+        return db
+
+    def _blob_path(self, digest, compression):
+        extension = 'zst' if compression == 'zstd' else 'gz'
+        return os.path.join(self.root, 'blobs', digest[:2], f"{digest}.{extension}")
+
+    def _find_blob(self, digest):
+        for compression in ('zstd', 'gzip'):
+            path = self._blob_path(digest, compression)
+            if os.path.exists(path):
+                return path, compression
+        return None, None
+
+    def put(self, url, content, content_type='', referrer=''):
+        """
+        Archive one fetched body.
+
+        Args:
+            url (str): URL the body was fetched from
+            content (bytes): Raw body
+            content_type (str): Content-Type header value
+            referrer (str): For following pages, the transcript URL they belong to
+
+        Returns:
+            str: The body's SHA-256
+        """
+        writer = self.writer(url, content_type, referrer)
+        writer.write(content)
+        return writer.commit()
+
+    def writer(self, url, content_type='', referrer=''):
+        """Return a BlobWriter for a body that arrives in chunks."""
+        return BlobWriter(self, url, content_type, referrer)
+
+    def _commit(self, url, content_type, referrer, digest, size, temp_path):
+        path = self._blob_path(digest, self.compression)
+        if self._find_blob(digest)[0] is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+        else:
+            # Same body already archived (another URL or an earlier fetch)
+            os.unlink(temp_path)
+        with self._index() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO pages (url, sha256, content_type, size, fetched_at, referrer) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, content_type, size, time.time(), referrer)
+            )
+
+    def latest(self, url):
+        """
+        Return the most recently fetched body's record for a URL.
+
+        Returns:
+            ArchivedPage: The record, or None if the URL was never archived
+        """
+        row = self._index().execute(
+            "SELECT url, sha256, content_type, size, fetched_at, referrer FROM pages WHERE url = ? "
+            "ORDER BY fetched_at DESC LIMIT 1", (url,)
+        ).fetchone()
+        return None if row is None else ArchivedPage(*row)
+
+    def read(self, digest):
+        """
+        Return a body by SHA-256, decompressed from a memory-mapped blob.
+
+        Raises:
+            KeyError: If the blob is not in the archive
+        """
+        path, compression = self._find_blob(digest)
+        if path is None:
+            raise KeyError(digest)
+        with open(path, 'rb') as handle:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if compression == 'zstd':
+                    return zstandard.ZstdDecompressor().decompressobj().decompress(mapped)
+                # wbits=31: a gzip member
+                return zlib.decompress(mapped, wbits=31)
+
+    def load(self, url):
+        """
+        Return the latest archived body for a URL.
+
+        Returns:
+            tuple: (content bytes, content type)
+
+        Raises:
+            KeyError: If the URL was never archived
+        """
+        record = self.latest(url)
+        if record is None:
+            raise KeyError(url)
+        return self.read(record.sha256), record.content_type
+
+    def records(self, urls=None, entries_only=False):
+        """
+        Yield the latest record of each URL, in blob order, without reading bodies.
+
+        Records stream from the index, so the whole archive is never held
+        in memory.
+
+        Args:
+            urls (iterable): URLs to include; defaults to every archived URL
+            entries_only (bool): Skip following pages of paginated transcripts
+
+        Yields:
+            ArchivedPage: One record per URL
+        """
+        query = (
+            "SELECT * FROM (SELECT url, sha256, content_type, size, MAX(fetched_at), referrer "
+            "FROM pages GROUP BY url)"
+        )
+        if entries_only:
+            query += " WHERE referrer = ''"
+        wanted = None if urls is None else set(urls)
+        # A connection of its own, so the cursor survives other queries on this thread
+        db = sqlite3.connect(os.path.join(self.root, 'index.sqlite'), timeout=10.0)
+        try:
+            for row in db.execute(query + " ORDER BY sha256"):
+                if wanted is None or row[0] in wanted:
+                    yield ArchivedPage(*row)
+        finally:
+            db.close()
+
+    def replay(self, urls=None, entries_only=False):
+        """
+        Yield the latest archived body of each URL, in blob order.
+
+        Args:
+            urls (iterable): URLs to replay; defaults to every archived URL
+            entries_only (bool): Skip following pages of paginated transcripts
+
+        Yields:
+            tuple: (ArchivedPage, content bytes)
+        """
+        for record in self.records(urls, entries_only):
+            yield record, self.read(record.sha256)
+
+    def __len__(self):
+        return self._index().execute("SELECT COUNT(DISTINCT url) FROM pages").fetchone()[0]
+
+
+class BlobWriter:
+    """Compress and hash a body chunk by chunk, then add it to the archive."""
+
+    def __init__(self, archive, url, content_type, referrer=''):
+        self.archive = archive
+        self.url = url
+        self.content_type = content_type
+        self.referrer = referrer
+        self.size = 0
+        self._hash = hashlib.sha256()
+        handle, self._temp_path = tempfile.mkstemp(dir=os.path.join(archive.root, 'blobs'), suffix='.tmp')
+        self._file = os.fdopen(handle, 'wb')
+        if archive.compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor(level=10).stream_writer(self._file, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._file, mode='wb', compresslevel=6, mtime=0)
+
+    def write(self, chunk):
+        self._hash.update(chunk)
+        self._stream.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self):
+        """Finish the blob and index it; returns the body's SHA-256."""
+        self._stream.close()
+        self._file.close()
+        digest = self._hash.hexdigest()
+        self.archive._commit(self.url, self.content_type, self.referrer, digest, self.size, self._temp_path)
+        return digest
+
+    def abort(self):
+        """Discard a partial body (e.g. the fetch failed midway)."""
+        try:
+            self._stream.close()
+            self._file.close()
+        finally:
+            os.unlink(self._temp_path)
+
+
+def archived_chunks(archive, url, content_type, chunks):
+    """
+    Pass chunks through while archiving them.
+
+    The body is indexed once the chunks are exhausted; a body that is not
+    read to the end is discarded. Archive write failures are logged and
+    never interrupt the chunks.
+    """
+    writer = None
+    try:
+        writer = archive.writer(url, content_type)
+    except ARCHIVE_ERRORS as e:
+        logger.warning(f"Could not archive {url}: {str(e)}")
+    try:
+        for chunk in chunks:
+            if writer is not None:
+                try:
+                    writer.write(chunk)
+                except ARCHIVE_ERRORS as e:
+                    logger.warning(f"Could not archive {url}: {str(e)}")
+                    writer.abort()
+                    writer = None
+            yield chunk
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is not None:
+        try:
+            writer.commit()
+        except ARCHIVE_ERRORS as e:
+            logger.warning(f"Could not archive {url}: {str(e)}")
+
+
+def create_archive():
+    """
+    Build the archive configured through PAGE_ARCHIVE_DIR.
+
+    Returns:
+        PageArchive: The archive, or None when archiving is disabled
+    """
+    root = os.getenv('PAGE_ARCHIVE_DIR', '')
+    if not root:
+        return None
+    return PageArchive(root, compression=os.getenv('PAGE_ARCHIVE_COMPRESSION') or None)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for QuickBrief AI pipeline stages.
+
+Runs without network access or API keys. Usage:
+
+    python benchmark.py > bench_output.txt
+"""
+
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_large_page(target_bytes=3_000_000):
+    """Build a synthetic transcript page of roughly the given size."""
+    paragraph = (
+        "<p>Revenue grew 18% year-over-year to $2.1 billion,   exceeding our guidance.\n"
+        "  Operating margin improved to 22%  despite supply chain pressure.</p>\n"
+        "<div><span>Analyst:</span> <b>What is the outlook</b> for next quarter?</div>\n"
+    )
+    repeats = target_bytes // len(paragraph) + 1
+    body = paragraph * repeats
+    return f"<html><head><script>var x = 1;</script></head><body>{body}</body></html>".encode('utf-8')
+
+
+def legacy_clean_text(soup):
+    """The original get_text()/splitlines()/join cleanup, kept for comparison."""
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def measure(func, *args):
+    """
+    Run func twice and return (result, seconds, peak traced bytes above baseline).
+
+    Timing comes from an untraced run since tracemalloc slows allocation.
+    """
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_text_cleanup():
+    """Compare peak memory of the legacy and streaming text cleanup."""
+    from bs4 import BeautifulSoup
+    from extraction import extract_clean_text
+
+    page = build_large_page()
+    print(f"Text cleanup on a {len(page) / 1_000_000:.1f} MB page")
+
+    legacy_soup = BeautifulSoup(page, 'html.parser')
+    legacy_text, legacy_time, legacy_peak = measure(legacy_clean_text, legacy_soup)
+    del legacy_soup
+
+    soup = BeautifulSoup(page, 'html.parser')
+    text, elapsed, peak = measure(extract_clean_text, soup)
+    del soup
+
+    print(f"  legacy get_text cleanup : {legacy_time * 1000:8.1f} ms, peak {legacy_peak / 1_000_000:7.2f} MB")
+    print(f"  streaming extractor     : {elapsed * 1000:8.1f} ms, peak {peak / 1_000_000:7.2f} MB")
+    print(f"  identical output        : {text == legacy_text}")
+    print(f"  peak memory reduction   : {(1 - peak / legacy_peak) * 100:.0f}%")
+
+
+def bench_compact_input():
+    """Measure how much compact mode shrinks the model input and what it costs."""
+    from preextract import condense_transcript
+
+    sentences = [
+        "Thank you, operator, and good morning everyone.",
+        "It is great to be here with you today to discuss the quarter.",
+        "Revenue grew 18% year-over-year to $2.1 billion.",
+        "Operating margin expanded 200 basis points to 22%.",
+        "Diluted EPS was $1.42, up from $1.10 a year ago.",
+        "We continue to see good engagement from our customers across regions.",
+        "We are raising our full-year revenue guidance to $8.2 to $8.4 billion.",
+        "As I mentioned, we are very pleased with the team's execution.",
+    ]
+    text = ' '.join(f"{sentences[i % 8][:-1]} in segment {i % 40}." for i in range(2000))
+
+    start = time.perf_counter()
+    condensed = condense_transcript(text, max_chars=6000)
+    elapsed = time.perf_counter() - start
+
+    print(f"Compact input on a {len(text):,} character transcript")
+    print(f"  full mode input         : {min(len(text), 20000):8,} chars (truncated to 20,000)")
+    print(f"  compact mode input      : {len(condensed):8,} chars")
+    print(f"  condense time           : {elapsed * 1000:8.1f} ms")
+    print(f"  figures kept            : {condensed.count('$')} dollar amounts")
+
+
+def bench_decode():
+    """Compare parser-side encoding detection with decoding once up front."""
+    from bs4 import BeautifulSoup
+    from encoding import decode_html
+
+    # Euro signs make the page invalid UTF-8
+    page = build_large_page(1_000_000).replace(b'$2.1 billion', b'\x80 2.1 billion')
+    print(f"Page decoding on a {len(page) / 1_000_000:.1f} MB cp1252 page")
+
+    start = time.perf_counter()
+    BeautifulSoup(page, 'html.parser').decompose()
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    html, encoding = decode_html(page, 'text/html; charset=windows-1252')
+    decode_time = time.perf_counter() - start
+    BeautifulSoup(html, 'html.parser').decompose()
+    total_time = time.perf_counter() - start
+
+    print(f"  parser detection + parse: {legacy_time * 1000:8.1f} ms")
+    print(f"  decode ({encoding:7}) + parse: {total_time * 1000:8.1f} ms ({decode_time * 1000:.1f} ms decoding)")
+
+
+def bench_domain_rule():
+    """Compare the generic DOM walk with a compiled per-domain rule."""
+    from bs4 import BeautifulSoup
+    from extraction import extract_clean_text
+    from domain_rules import DomainRule
+
+    transcript = build_large_page(500_000).decode('utf-8')
+    chrome = '<div class="sidebar"><a href="/x">Related article</a><p>Promo text</p></div>' * 3000
+    html = transcript.replace('<body>', f'<body>{chrome}<div class="article-body">') \
+        .replace('</body>', f'</div>{chrome}</body>')
+    rule = DomainRule('example.com', 'div.article-body', drop=['div.interad'], speaker='p > strong')
+    print(f"Extraction on a {len(html) / 1_000_000:.1f} MB page with site chrome")
+
+    start = time.perf_counter()
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(["script", "style"]):
+        element.decompose()
+    generic = extract_clean_text(soup)
+    generic_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    text = rule.extract(html)
+    rule_time = time.perf_counter() - start
+
+    print(f"  generic DOM walk        : {generic_time * 1000:8.1f} ms, {len(generic):,} chars")
+    print(f"  domain rule (strainer)  : {rule_time * 1000:8.1f} ms, {len(text):,} chars")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+def bench_parse_offload():
+    """Latency of concurrent requests while large pages are parsed inline or on the pool."""
+    from concurrent.futures import ThreadPoolExecutor
+    from parsing import ParsePool
+
+    large = build_large_page(3_000_000)
+    small = build_large_page(20_000)
+    # 4 large pages arriving among 32 small ones
+    mix = [large if i % 9 == 0 else small for i in range(36)]
+    print(f"Concurrent scrapes: {mix.count(large)} x {len(large) / 1_000_000:.1f} MB pages "
+          f"among {mix.count(small)} x {len(small) // 1000} KB pages, 16 threads")
+
+    def timed_parse(pool, content):
+        start = time.perf_counter()
+        pool.parse(content, 'text/html; charset=utf-8', 'https://example.com/call')
+        return content is small, time.perf_counter() - start
+
+    for label, workers in (("inline (GIL-bound)", 0), ("process pool (4)", 4)):
+        pool = ParsePool(workers=workers)
+        # Start the workers outside the measurement
+        pool.parse(large, 'text/html', 'https://example.com/call')
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=16) as threads:
+            results = list(threads.map(lambda content: timed_parse(pool, content), mix))
+        wall = time.perf_counter() - start
+        pool.shutdown()
+
+        small_latencies = [seconds for is_small, seconds in results if is_small]
+        all_latencies = [seconds for _, seconds in results]
+        print(f"  {label:19}: small p50 {percentile(small_latencies, 50) * 1000:7.1f} ms, "
+              f"small p95 {percentile(small_latencies, 95) * 1000:7.1f} ms, "
+              f"all p95 {percentile(all_latencies, 95) * 1000:7.1f} ms, wall {wall * 1000:7.1f} ms")
+
+
+def bench_archive_replay(pages=2000):
+    """Throughput of replaying archived pages versus the bytes they take on disk."""
+    import shutil
+    import tempfile
+    from archive import PageArchive
+
+    root = tempfile.mkdtemp(prefix='quickbrief-bench-archive-')
+    try:
+        archive = PageArchive(root)
+        body = build_large_page(60_000)
+        start = time.perf_counter()
+        for index in range(pages):
+            # Distinct bodies, so nothing is deduplicated
+            archive.put(f"https://example.com/call/{index}", body + f"<!-- {index} -->".encode(), 'text/html')
+        write_seconds = time.perf_counter() - start
+        raw_bytes = pages * len(body)
+        stored_bytes = sum(os.path.getsize(os.path.join(directory, name))
+                           for directory, _, names in os.walk(os.path.join(root, 'blobs')) for name in names)
+
+        start = time.perf_counter()
+        replayed_bytes = sum(len(content) for _, content in archive.replay())
+        replay_seconds = time.perf_counter() - start
+        print(f"Archive ({archive.compression}): {pages} pages, {raw_bytes / 1_000_000:.1f} MB raw, "
+              f"{stored_bytes / 1_000_000:.1f} MB stored ({raw_bytes / stored_bytes:.1f}x)")
+        print(f"  write : {pages / write_seconds:7.0f} pages/s")
+        print(f"  replay: {pages / replay_seconds:7.0f} pages/s, "
+              f"{replayed_bytes / replay_seconds / 1_000_000:.0f} MB/s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def import_app(preload=False, importtime=False):
+    """Import the app in a fresh interpreter; returns (wall seconds, stderr)."""
+    env = dict(os.environ, PRELOAD_DEPENDENCIES='1' if preload else '0')
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', 'import app']
+    start = time.perf_counter()
+    result = subprocess.run(command, env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return time.perf_counter() - start, result.stderr
+
+
+def bench_import_time(runs=3):
+    """Measure cold app import with lazy dependencies and with preloading."""
+    print("Cold start (python -c 'import app', best of 3)")
+    for label, preload in (("lazy imports", False), ("PRELOAD_DEPENDENCIES=1", True)):
+        best = min(import_app(preload)[0] for _ in range(runs))
+        print(f"  {label:23}: {best * 1000:8.1f} ms")
+
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    _, stderr = import_app(preload=True, importtime=True)
+    modules = []
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            modules.append((int(parts[1]), parts[2].rstrip()))
+    # Modules imported directly by app (one level of nesting)
+    direct = [entry for entry in modules if entry[1].startswith('  ') and not entry[1].startswith('    ')]
+    print("  slowest imports made by app when preloading:")
+    for cumulative, name in sorted(direct, reverse=True)[:6]:
+        print(f"    {name.strip():28}: {cumulative / 1000:8.1f} ms")
+
+
+def main():
+    """Run all benchmarks."""
+    print("=" * 60)
+    print("QuickBrief AI - Benchmarks")
+    print("=" * 60)
+
+    bench_text_cleanup()
+    bench_compact_input()
+    bench_decode()
+    bench_domain_rule()
+    bench_parse_offload()
+    bench_archive_replay()
+    bench_import_time()
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+"""
+Cache backends shared by the scrape and analysis layers.
+
+With several worker processes an in-process cache is split per worker, so
+the same transcript is scraped and analyzed once per worker and every
+restart starts cold. Backends implement one small interface over bytes:
+
+- ``MemoryBackend``: in-process LRU, the default for a single worker
+- ``SQLiteBackend``: a SQLite file in WAL mode shared by the workers on one host
+- ``RedisBackend``: any server speaking the Redis protocol, shared across hosts
+
+Each backend also provides ``lock(key)``, which is cross-process for the
+shared backends, so only one worker computes a given key while the others
+wait and then read its result. Locks are leases that expire, so a crashed
+worker cannot block a key forever. ``Cache`` adds (de)serialization and
+``get_or_compute`` on top of a backend. Values are pickled, so only point
+shared backends at stores this service trusts.
+"""
+
+import os
+import time
+import uuid
+import pickle
+import socket
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# How long a lock holder may take before its lease expires, and how often
+# waiters poll shared backends
+DEFAULT_LEASE_SECONDS = 180.0
+LOCK_POLL_SECONDS = 0.05
+
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+# Errors that make a shared backend temporarily unusable
+BACKEND_ERRORS = (OSError, sqlite3.Error, RedisError)
+
+
+class CacheBackend:
+    """Interface for byte-valued cache backends."""
+
+    def get(self, key):
+        """Return the bytes stored under key, or None if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """Store bytes under key, expiring after ttl seconds (None keeps them)."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove key if present."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every key of this backend."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    @contextmanager
+    def lock(self, key, timeout=30.0, lease=DEFAULT_LEASE_SECONDS):
+        """
+        Hold the compute lock for key.
+
+        Args:
+            key (str): Key being computed
+            timeout (float): Seconds to wait for another holder
+            lease (float): Seconds after which an abandoned lock expires
+
+        Yields:
+            bool: Whether the lock was acquired; on timeout the caller
+                proceeds unlocked rather than failing
+        """
+        token = self._acquire(key, timeout, lease)
+        try:
+            yield token is not None
+        finally:
+            if token is not None:
+                self._release(key, token)
+
+    def _acquire(self, key, timeout, lease):
+        """Poll for a shared lease; returns the owner token or None on timeout."""
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            if self._try_acquire(key, token, lease):
+                return token
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(LOCK_POLL_SECONDS)
+
+    def _try_acquire(self, key, token, lease):
+        raise NotImplementedError
+
+    def _release(self, key, token):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Thread-safe in-process LRU with optional per-key expiry."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _acquire(self, key, timeout, lease):
+        # Threads of one process can block on a real lock instead of polling
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        if entry[0].acquire(timeout=max(0.0, timeout)):
+            return entry
+        self._forget(key, entry)
+        return None
+
+    def _release(self, key, token):
+        token[0].release()
+        self._forget(key, token)
+
+    def _forget(self, key, entry):
+        with self._lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_locks[key]
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache in a SQLite database shared by the worker processes on one host.
+
+    WAL mode lets readers proceed while one worker writes. Each thread gets
+    its own connection. Entries beyond ``max_entries`` are evicted least
+    recently used first.
+    """
+
+    def __init__(self, path, table='cache', max_entries=None):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, accessed REAL NOT NULL)"
+            )
+            db.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_locks "
+                "(key TEXT PRIMARY KEY, token TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10.0)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+            if self.max_entries is not None:
+                db.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            return bytes(row[0])
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        with self._connect() as db:
+            db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), expires, now)
+            )
+            if self.max_entries is not None:
+                db.execute(
+                    f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} "
+                    "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def delete(self, key):
+        with self._connect() as db:
+            db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        with self._connect() as db:
+            return db.execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE expires IS NULL OR expires > ?", (time.time(),)
+            ).fetchone()[0]
+
+    def _try_acquire(self, key, token, lease):
+        now = time.time()
+        with self._connect() as db:
+            # Take over an expired lease, then claim the key if it is free
+            db.execute(f"DELETE FROM {self.table}_locks WHERE key = ? AND expires <= ?", (key, now))
+            cursor = db.execute(
+                f"INSERT OR IGNORE INTO {self.table}_locks (key, token, expires) VALUES (?, ?, ?)",
+                (key, token, now + lease)
+            )
+            return cursor.rowcount == 1
+
+    def _release(self, key, token):
+        with self._connect() as db:
+            db.execute(f"DELETE FROM {self.table}_locks WHERE key = ? AND token = ?", (key, token))
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache on a Redis-protocol server, shared by workers on any host.
+
+    Speaks RESP directly over a socket (GET, SET with PX/NX, DEL, SCAN and
+    a compare-and-delete EVAL for locks), so no client library is needed.
+    Keys are namespaced with ``prefix``; size limits are left to the
+    server's maxmemory policy.
+    """
+
+    RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='quickbrief:', timeout=5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._pool = []
+        self._pool_lock = threading.Lock()
+
+    def _open(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        connection = (sock, sock.makefile('rb'))
+        try:
+            if self.password:
+                self._roundtrip(connection, ('AUTH', self.password))
+            if self.db:
+                self._roundtrip(connection, ('SELECT', self.db))
+        except Exception:
+            sock.close()
+            raise
+        return connection
+
+    def execute(self, *args):
+        """Send one command and return its decoded reply."""
+        with self._pool_lock:
+            connection = self._pool.pop() if self._pool else None
+        if connection is None:
+            connection = self._open()
+        try:
+            reply = self._roundtrip(connection, args)
+        except RedisError:
+            self._give_back(connection)
+            raise
+        except BaseException:
+            connection[0].close()
+            raise
+        self._give_back(connection)
+        return reply
+
+    def _give_back(self, connection):
+        with self._pool_lock:
+            self._pool.append(connection)
+
+    def _roundtrip(self, connection, args):
+        sock, reader = connection
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode('utf-8')
+            elif not isinstance(arg, bytes):
+                arg = str(arg).encode('ascii')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        sock.sendall(b''.join(parts))
+        return self._read_reply(reader)
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise RedisError(payload.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Redis connection closed")
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply(reader) for _ in range(count)]
+        raise RedisError(f"Unexpected reply from Redis: {line!r}")
+
+    def _scan(self):
+        cursor = b'0'
+        while True:
+            cursor, keys = self.execute('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 1000)
+            yield from keys
+            if cursor in (b'0', 0, '0'):
+                return
+
+    def get(self, key):
+        return self.execute('GET', self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            self.execute('SET', self.prefix + key, value)
+        else:
+            self.execute('SET', self.prefix + key, value, 'PX', max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self.execute('DEL', self.prefix + key)
+
+    def clear(self):
+        keys = list(self._scan())
+        for start in range(0, len(keys), 500):
+            self.execute('DEL', *keys[start:start + 500])
+
+    def __len__(self):
+        # Lock keys live in the same namespace; don't count them
+        return sum(1 for key in self._scan() if not key.startswith(self.prefix.encode('utf-8') + b'lock:'))
+
+    def _try_acquire(self, key, token, lease):
+        reply = self.execute('SET', f"{self.prefix}lock:{key}", token, 'NX', 'PX', max(1, int(lease * 1000)))
+        return reply == 'OK'
+
+    def _release(self, key, token):
+        self.execute('EVAL', self.RELEASE_SCRIPT, 1, f"{self.prefix}lock:{key}", token)
+
+
+class Cache:
+    """
+    Object cache over a backend.
+
+    Backend outages are logged and treated as misses, so a shared cache
+    going away costs duplicate work, not failed requests.
+    """
+
+    def __init__(self, backend, ttl=None):
+        """
+        Args:
+            backend (CacheBackend): Where values are stored
+            ttl (float): Default expiry in seconds (None keeps entries)
+        """
+        self.backend = backend
+        self.ttl = ttl
+
+    def get(self, key):
+        """Return the cached object for key, or None."""
+        try:
+            data = self.backend.get(key)
+        except BACKEND_ERRORS as e:
+            logger.warning(f"Cache read failed for {key}: {str(e)}")
+            return None
+        return None if data is None else pickle.loads(data)
+
+    def set(self, key, value, ttl=None):
+        """Cache an object (anything picklable)."""
+        try:
+            self.backend.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                             self.ttl if ttl is None else ttl)
+        except BACKEND_ERRORS as e:
+            logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+    def delete(self, key):
+        try:
+            self.backend.delete(key)
+        except BACKEND_ERRORS as e:
+            logger.warning(f"Cache delete failed for {key}: {str(e)}")
+
+    def clear(self):
+        self.backend.clear()
+
+    def __len__(self):
+        return len(self.backend)
+
+    @contextmanager
+    def lock(self, key, timeout=30.0, lease=DEFAULT_LEASE_SECONDS):
+        """Hold the compute lock for key; yields whether it was acquired (see CacheBackend.lock)."""
+        try:
+            context = self.backend.lock(key, timeout=timeout, lease=lease)
+            acquired = context.__enter__()
+        except BACKEND_ERRORS as e:
+            logger.warning(f"Cache lock failed for {key}, continuing unlocked: {str(e)}")
+            yield False
+            return
+        try:
+            yield acquired
+        finally:
+            try:
+                context.__exit__(None, None, None)
+            except BACKEND_ERRORS as e:
+                logger.warning(f"Cache unlock failed for {key}: {str(e)}")
+
+    def get_or_compute(self, key, compute, ttl=None, timeout=30.0):
+        """
+        Return the cached value for key, computing it at most once at a time.
+
+        The first worker to miss takes the key's lock and computes; the
+        others wait for the lock and then read its result.
+
+        Args:
+            key (str): Cache key
+            compute (callable): Produces the value on a miss
+            ttl (float): Expiry for a computed value (defaults to the cache's)
+            timeout (float): Longest wait for another worker's computation
+
+        Returns:
+            The cached or computed value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self.lock(key, timeout=timeout):
+            value = self.get(key)
+            if value is None:
+                value = compute()
+                self.set(key, value, ttl)
+            return value
+
+
+def create_backend(namespace, max_entries=1024):
+    """
+    Build the backend configured through the environment.
+
+    CACHE_BACKEND selects "memory" (default), "sqlite" (CACHE_PATH) or
+    "redis" (CACHE_URL).
+
+    Args:
+        namespace (str): Separates this layer's keys (table or key prefix)
+        max_entries (int): Entry limit for the memory and SQLite backends
+
+    Returns:
+        CacheBackend: The configured backend
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = os.getenv('CACHE_BACKEND', 'memory').lower()
+    if name == 'memory':
+        return MemoryBackend(max_entries=max_entries)
+    if name == 'sqlite':
+        return SQLiteBackend(os.getenv('CACHE_PATH', 'quickbrief_cache.db'), table=namespace,
+                             max_entries=max_entries)
+    if name == 'redis':
+        return RedisBackend(os.getenv('CACHE_URL', 'redis://localhost:6379/0'),
+                            prefix=f"quickbrief:{namespace}:")
+    raise ValueError(f"Unknown cache backend: {name}")
@@ -0,0 +1,130 @@
+"""
+Request deadlines and cooperative cancellation.
+
+Each /analyze request gets a Deadline: the client's budget (header or field)
+capped by the server default. The pipeline calls ``check()`` between stages
+and waits on the model call through ``wait()``, so once the deadline passes
+or the client hangs up no further work is started and the model call is
+abandoned (its provider-side timeout ends it shortly after). Cancellations
+are counted in metrics by reason and stage.
+"""
+
+import time
+import select
+import socket
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from metrics import metrics
+
+# How often a pending model call checks for a disconnected client
+POLL_INTERVAL = 0.25
+
+
+class RequestCancelled(Exception):
+    """Raised when a request's deadline passed or its client disconnected."""
+
+    def __init__(self, reason, stage):
+        super().__init__(f"Request cancelled during {stage}: {reason}")
+        self.reason = reason
+        self.stage = stage
+
+
+class Deadline:
+    """Time budget for one request, plus an optional client-disconnect check."""
+
+    def __init__(self, seconds, is_disconnected=None):
+        """
+        Args:
+            seconds (float): Budget from now
+            is_disconnected (callable): Returns True once the client has gone
+        """
+        self.expires_at = time.monotonic() + seconds
+        self.is_disconnected = is_disconnected
+
+    def remaining(self):
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def cancel_reason(self):
+        """Return 'deadline', 'disconnected' or None."""
+        if time.monotonic() >= self.expires_at:
+            return 'deadline'
+        if self.is_disconnected is not None and self.is_disconnected():
+            return 'disconnected'
+        return None
+
+    def check(self, stage):
+        """
+        Stop before starting more work for a cancelled request.
+
+        Raises:
+            RequestCancelled: If the deadline passed or the client disconnected
+        """
+        reason = self.cancel_reason()
+        if reason is not None:
+            raise self._cancelled(reason, stage)
+
+    def wait(self, future, stage):
+        """
+        Wait for a future, giving up when the request is cancelled.
+
+        Returns:
+            The future's result
+
+        Raises:
+            RequestCancelled: If the deadline passed or the client disconnected
+                first, or the call failed after the deadline passed
+            Exception: Whatever the call raised otherwise
+        """
+        while True:
+            try:
+                result = future.result(timeout=min(POLL_INTERVAL, self.remaining()))
+            except FutureTimeoutError:
+                reason = self.cancel_reason()
+                if reason is not None:
+                    future.cancel()
+                    raise self._cancelled(reason, stage)
+                continue
+            except Exception:
+                # A timeout cut short by our own deadline is a cancellation
+                if self.cancel_reason() == 'deadline':
+                    raise self._cancelled('deadline', stage)
+                raise
+            return result
+
+    def _cancelled(self, reason, stage):
+        metrics.incr(f'cancelled.{reason}')
+        metrics.incr(f'cancelled.stage.{stage}')
+        return RequestCancelled(reason, stage)
+
+
+def client_disconnect_check(environ):
+    """
+    Build a disconnect check for a WSGI request, if the server exposes its socket.
+
+    The Werkzeug development server and gunicorn put the client connection
+    in the environ. A closed connection reads as end-of-file; peeking leaves
+    any unread request bytes in place.
+
+    Returns:
+        callable: Returns True once the client has closed the connection, or
+            None when the socket is not available
+    """
+    connection = environ.get('gunicorn.socket') or environ.get('werkzeug.socket')
+    if connection is None:
+        return None
+
+    def is_disconnected():
+        try:
+            readable, _, _ = select.select([connection], [], [], 0)
+            if not readable:
+                return False
+            return connection.recv(1, socket.MSG_PEEK) == b''
+        except ValueError:
+            # TLS sockets cannot be peeked; assume the client is still there
+            return False
+        except OSError:
+            # Reset connection
+            return True
+
+    return is_disconnected
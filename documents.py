@@ -0,0 +1,249 @@
+"""
+PDF, Word and plain-text document text extraction.
+
+Documents are streamed to a temporary file and extracted page by page up to a
+page limit (PDFs through a read-only memory map, DOCX with an incremental XML
+parse), so a 200-page investor-relations PDF never has to sit in worker
+memory as one byte string.
+"""
+
+import os
+import io
+import mmap
+import zipfile
+import tempfile
+import logging
+import xml.etree.ElementTree as ET
+
+from encoding import decode_bytes
+
+from lazy import lazy_import
+
+# Optional, imported on the first PDF; None when pypdf is not installed
+pypdf = lazy_import('pypdf', optional=True)
+
+logger = logging.getLogger(__name__)
+
+MAX_DOCUMENT_PAGES = int(os.getenv('MAX_DOCUMENT_PAGES', '300'))
+MAX_DOCUMENT_BYTES = int(os.getenv('MAX_DOCUMENT_BYTES', str(50 * 1024 * 1024)))
+
+CHUNK_SIZE = 64 * 1024
+
+PDF_CONTENT_TYPES = ('application/pdf', 'application/x-pdf')
+DOCX_CONTENT_TYPES = ('application/vnd.openxmlformats-officedocument.wordprocessingml.document',)
+
+TEXT_CONTENT_TYPES = ('text/plain', 'text/markdown')
+TEXT_EXTENSIONS = ('.txt', '.text', '.md')
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def detect_document_type(content_type, path):
+    """
+    Identify PDF and DOCX documents from a content type or file name.
+
+    Args:
+        content_type (str): HTTP Content-Type or upload mimetype (may be empty)
+        path (str): URL path or file name
+
+    Returns:
+        str: "pdf", "docx", or None for anything else (treated as HTML)
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    path = (path or '').lower()
+    if content_type in PDF_CONTENT_TYPES or path.endswith('.pdf'):
+        return 'pdf'
+    if content_type in DOCX_CONTENT_TYPES or path.endswith('.docx'):
+        return 'docx'
+    return None
+
+
+def spool_to_tempfile(chunks, max_bytes=MAX_DOCUMENT_BYTES):
+    """
+    Write an iterable of byte chunks to a temporary file.
+
+    Returns:
+        str: Path of the temporary file; the caller must remove it
+
+    Raises:
+        ValueError: If the data exceeds max_bytes
+    """
+    handle = tempfile.NamedTemporaryFile(prefix='quickbrief-', suffix='.doc', delete=False)
+    written = 0
+    try:
+        with handle:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                written += len(chunk)
+                if written > max_bytes:
+                    raise ValueError(f"Document is larger than the {max_bytes // (1024 * 1024)} MB limit")
+                handle.write(chunk)
+    except Exception:
+        os.unlink(handle.name)
+        raise
+    return handle.name
+
+
+def _normalize(text):
+    return ' '.join(text.split())
+
+
+def _extract_pdf(stream, max_pages):
+    if pypdf is None:
+        raise ValueError("PDF support requires the pypdf package")
+
+    reader = pypdf.PdfReader(stream)
+    if reader.is_encrypted:
+        raise ValueError("Encrypted PDF documents are not supported")
+
+    buffer = io.StringIO()
+    page_count = len(reader.pages)
+    for index in range(min(page_count, max_pages)):
+        page_text = _normalize(reader.pages[index].extract_text() or '')
+        if page_text:
+            if buffer.tell():
+                buffer.write(' ')
+            buffer.write(page_text)
+    if page_count > max_pages:
+        logger.info(f"PDF truncated to the first {max_pages} of {page_count} pages")
+    return buffer.getvalue()
+
+
+def _extract_docx(stream, max_pages):
+    try:
+        archive = zipfile.ZipFile(stream)
+        document = archive.open('word/document.xml')
+    except (zipfile.BadZipFile, KeyError):
+        raise ValueError("File is not a valid Word document")
+
+    buffer = io.StringIO()
+    paragraph = []
+    page = 1
+    with archive, document:
+        # iterparse keeps memory flat on large documents
+        for _, element in ET.iterparse(document, events=('end',)):
+            tag = element.tag
+            if tag == WORD_NAMESPACE + 't':
+                paragraph.append(element.text or '')
+            elif tag == WORD_NAMESPACE + 'tab':
+                paragraph.append(' ')
+            elif tag == WORD_NAMESPACE + 'br' and element.get(WORD_NAMESPACE + 'type') == 'page':
+                page += 1
+            elif tag == WORD_NAMESPACE + 'p':
+                text = _normalize(''.join(paragraph))
+                paragraph.clear()
+                if text:
+                    if buffer.tell():
+                        buffer.write(' ')
+                    buffer.write(text)
+                element.clear()
+            if page > max_pages:
+                logger.info(f"Word document truncated to the first {max_pages} pages")
+                break
+    return buffer.getvalue()
+
+
+def extract_document_file(path, document_type, max_pages=MAX_DOCUMENT_PAGES):
+    """
+    Extract text from a PDF (through a read-only memory map) or DOCX file.
+
+    Args:
+        path (str): Path of the document on disk
+        document_type (str): "pdf" or "docx"
+        max_pages (int): Maximum number of pages to extract
+
+    Returns:
+        str: Whitespace-normalized document text
+
+    Raises:
+        ValueError: If the document is empty, unsupported or unreadable
+    """
+    if os.path.getsize(path) == 0:
+        raise ValueError("Document is empty")
+
+    if document_type not in ('pdf', 'docx'):
+        raise ValueError(f"Unsupported document type: {document_type}")
+
+    with open(path, 'rb') as handle:
+        try:
+            if document_type == 'docx':
+                # zipfile seeks straight to the members it needs
+                return _extract_docx(handle, max_pages)
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return _extract_pdf(mapped, max_pages)
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to parse {document_type} document: {str(e)}")
+            raise ValueError(f"Could not read the {document_type.upper()} document")
+
+
+def extract_document_stream(chunks, document_type, max_pages=MAX_DOCUMENT_PAGES, max_bytes=MAX_DOCUMENT_BYTES):
+    """
+    Spool a stream of byte chunks to disk and extract its text.
+
+    Args:
+        chunks (iterable): Byte chunks, e.g. response.iter_content()
+        document_type (str): "pdf" or "docx"
+
+    Returns:
+        str: Whitespace-normalized document text
+    """
+    path = spool_to_tempfile(chunks, max_bytes=max_bytes)
+    try:
+        return extract_document_file(path, document_type, max_pages=max_pages)
+    finally:
+        os.unlink(path)
+
+
+def is_text_upload(content_type, filename):
+    """Return True for plain-text transcript files."""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    return content_type in TEXT_CONTENT_TYPES or (filename or '').lower().endswith(TEXT_EXTENSIONS)
+
+
+def read_text_stream(chunks, max_bytes=MAX_DOCUMENT_BYTES):
+    """
+    Read and decode a plain-text stream with a size limit.
+
+    Args:
+        chunks (iterable): Byte chunks
+
+    Returns:
+        tuple: (whitespace-normalized text, detected encoding)
+
+    Raises:
+        ValueError: If the data exceeds max_bytes
+    """
+    buffer = io.BytesIO()
+    for chunk in chunks:
+        if buffer.tell() + len(chunk) > max_bytes:
+            raise ValueError(f"File is larger than the {max_bytes // (1024 * 1024)} MB limit")
+        buffer.write(chunk)
+    text, encoding = decode_bytes(buffer.getvalue())
+    return _normalize(text), encoding
+
+
+def extract_uploaded_document(upload, max_pages=MAX_DOCUMENT_PAGES, max_bytes=MAX_DOCUMENT_BYTES):
+    """
+    Extract text from an uploaded PDF, DOCX or plain-text file.
+
+    Args:
+        upload (werkzeug.datastructures.FileStorage): The uploaded file
+
+    Returns:
+        str: Whitespace-normalized document text
+
+    Raises:
+        ValueError: If the file type is unsupported or the file unreadable
+    """
+    chunks = iter(lambda: upload.stream.read(CHUNK_SIZE), b'')
+    document_type = detect_document_type(upload.mimetype, upload.filename)
+    if document_type is None:
+        if is_text_upload(upload.mimetype, upload.filename):
+            text, encoding = read_text_stream(chunks, max_bytes=max_bytes)
+            logger.info(f"Decoded uploaded text file as {encoding}")
+            return text
+        raise ValueError("Unsupported file type - please upload a PDF, DOCX or plain text file")
+    return extract_document_stream(chunks, document_type, max_pages=max_pages, max_bytes=max_bytes)
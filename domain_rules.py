@@ -0,0 +1,222 @@
+"""
+Per-domain extraction rules for the transcript sites we scrape most.
+
+Each rule names the CSS selector of the transcript container, the speaker
+label elements and the elements to drop (ads, pitches, related links).
+Rules are loaded from a JSON file (``domain_rules.json`` or
+DOMAIN_RULES_PATH) and compiled once, on first use or when the app preloads
+its dependencies.
+
+Simple container selectors (``tag``, ``#id``, ``.class``, ``[attr=value]``)
+also become a SoupStrainer, so only the container subtree is built instead
+of the whole page. Pages a rule does not match fall back to the generic
+extraction path.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+
+from extraction import extract_clean_text
+from lazy import lazy_import
+
+bs4 = lazy_import('bs4')
+soupsieve = lazy_import('soupsieve')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'domain_rules.json')
+
+SIMPLE_SELECTOR = re.compile(r'''(?:[a-zA-Z][\w-]*)?(?:[#.][\w-]+|\[[\w-]+=["']?[^"'\]]+["']?\])*''')
+SELECTOR_PART = re.compile(r'''([#.])([\w-]+)|\[([\w-]+)=["']?([^"'\]]+)["']?\]|([a-zA-Z][\w-]*)''')
+
+
+def _has_class(name):
+    return lambda value: value is not None and name in value.split()
+
+
+def _strainer_for(selector):
+    """
+    Build a SoupStrainer approximating a simple CSS selector.
+
+    The strainer only narrows what gets parsed; the compiled selector is
+    still applied to the result. Returns None for selectors with
+    combinators or pseudo-classes.
+    """
+    selector = selector.strip()
+    if not selector or not SIMPLE_SELECTOR.fullmatch(selector):
+        return None
+    name = None
+    attrs = {}
+    for prefix, value, attr_name, attr_value, tag in SELECTOR_PART.findall(selector):
+        if tag:
+            name = tag
+        elif prefix == '#':
+            attrs['id'] = value
+        elif prefix == '.':
+            # Strainers see the raw class string, so match one class token
+            attrs.setdefault('class', _has_class(value))
+        else:
+            attrs[attr_name] = attr_value
+    return bs4.SoupStrainer(name, attrs)
+
+
+class DomainRule:
+    """Compiled extraction rule for one site."""
+
+    __slots__ = ('domain', 'container', 'drop', 'speaker', 'strainer')
+
+    def __init__(self, domain, container, drop=(), speaker=None):
+        """
+        Compile a rule.
+
+        Args:
+            domain (str): Hostname the rule applies to (and its subdomains)
+            container (str): CSS selector of the transcript container
+            drop (list): CSS selectors of elements to remove inside it
+            speaker (str): CSS selector of speaker label elements
+
+        Raises:
+            soupsieve.SelectorSyntaxError: If a selector is invalid
+        """
+        self.domain = domain
+        self.container = soupsieve.compile(container)
+        self.drop = [soupsieve.compile(selector) for selector in drop]
+        self.speaker = soupsieve.compile(speaker) if speaker else None
+        self.strainer = _strainer_for(container)
+
+    def extract(self, html):
+        """
+        Extract transcript text from a page with this rule.
+
+        Args:
+            html (str): Decoded page HTML
+
+        Returns:
+            str: Cleaned text of the matched containers, or None if the
+                container is not on the page
+        """
+        soup = bs4.BeautifulSoup(html, 'html.parser', parse_only=self.strainer)
+        try:
+            containers = self.container.select(soup)
+            # Nested matches would be extracted twice
+            matched = {id(element) for element in containers}
+            containers = [element for element in containers
+                          if not any(id(parent) in matched for parent in element.parents)]
+            if not containers:
+                return None
+
+            texts = []
+            for container in containers:
+                for element in container.find_all(['script', 'style']):
+                    element.decompose()
+                for selector in self.drop:
+                    for element in selector.select(container):
+                        element.decompose()
+                if self.speaker is not None:
+                    # Normalize labels to "Name:" so speaker turns stay recognizable
+                    for label in self.speaker.select(container):
+                        name = ' '.join(label.get_text(' ').split()).rstrip(':')
+                        if name:
+                            label.string = f" {name}: "
+                texts.append(extract_clean_text(container))
+            return ' '.join(text for text in texts if text)
+        finally:
+            soup.decompose()
+
+
+class DomainRuleRegistry:
+    """Hostname -> DomainRule lookup, optionally loaded from a file on first use."""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): Rules file to load and compile on first lookup (or
+                on preload()); None for an empty registry
+        """
+        self._path = path
+        self._rules = {} if path is None else None
+        self._lock = threading.Lock()
+
+    def _loaded_rules(self):
+        if self._rules is None:
+            with self._lock:
+                if self._rules is None:
+                    self._rules = _read_rules(self._path)
+        return self._rules
+
+    def preload(self):
+        """Load and compile the rules now instead of on the first lookup."""
+        self._loaded_rules()
+
+    def register(self, rule):
+        """Add or replace the rule for a domain."""
+        self._loaded_rules()[rule.domain.lower()] = rule
+
+    def for_host(self, hostname):
+        """
+        Find the rule for a hostname, trying parent domains in turn.
+
+        Args:
+            hostname (str): e.g. "www.fool.com"
+
+        Returns:
+            DomainRule: The most specific matching rule, or None
+        """
+        rules = self._loaded_rules()
+        host = (hostname or '').lower().rstrip('.')
+        while host:
+            rule = rules.get(host)
+            if rule is not None:
+                return rule
+            host = host.partition('.')[2]
+        return None
+
+    def __len__(self):
+        return len(self._loaded_rules())
+
+    @classmethod
+    def load(cls, path=DEFAULT_RULES_PATH):
+        """Load and compile rules from a JSON file right away."""
+        registry = cls(path)
+        registry.preload()
+        return registry
+
+
+def _read_rules(path):
+    """
+    Read and compile rules from a JSON file.
+
+    The file maps domains to {"container", "drop", "speaker"} objects.
+    A missing file gives no rules; invalid rules are logged and skipped so
+    one bad selector cannot disable the others.
+
+    Returns:
+        dict: domain -> DomainRule
+    """
+    compiled = {}
+    try:
+        with open(path, encoding='utf-8') as handle:
+            config = json.load(handle)
+    except FileNotFoundError:
+        logger.info(f"No domain rules file at {path}, using generic extraction only")
+        return compiled
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load domain rules from {path}: {str(e)}")
+        return compiled
+
+    for domain, spec in config.items():
+        try:
+            compiled[domain.lower()] = DomainRule(
+                domain, spec['container'], drop=spec.get('drop', ()), speaker=spec.get('speaker')
+            )
+        except (KeyError, TypeError, soupsieve.SelectorSyntaxError) as e:
+            logger.error(f"Skipping invalid domain rule for {domain}: {str(e)}")
+    logger.info(f"Loaded {len(compiled)} domain extraction rules")
+    return compiled
+
+
+# Rules are compiled once, on the first lookup or app.preload()
+rules = DomainRuleRegistry(os.getenv('DOMAIN_RULES_PATH', DEFAULT_RULES_PATH))
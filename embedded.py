@@ -0,0 +1,92 @@
+"""
+Fast path for transcript pages that ship their content as embedded JSON.
+
+Script-rendered sites (Next.js and similar) put the transcript in a
+``__NEXT_DATA__`` or ``application/json`` blob and often repeat it as the
+JSON-LD ``articleBody``. The scraper drops every <script> tag, so these pages
+used to fail the minimum-length check. Here the raw HTML is scanned for those
+blobs with a regex, only the blobs are parsed, and the longest transcript-like
+text inside them is returned, skipping the DOM parse and text walk entirely.
+"""
+
+import re
+import json
+import html as html_entities
+
+from lazy import lazy_import
+
+bs4 = lazy_import('bs4')
+
+SCRIPT_BLOCK = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+JSON_SCRIPT = re.compile(
+    r'''id\s*=\s*["']__NEXT_DATA__["']|type\s*=\s*["']application/(?:ld\+)?json["']''',
+    re.IGNORECASE
+)
+HTML_MARKUP = re.compile(r'<(?:p|br|div|span|h\d|li)\b', re.IGNORECASE)
+
+# JSON keys whose string values may hold the transcript
+TEXT_KEYS = frozenset((
+    'articlebody', 'transcript', 'transcripttext', 'body', 'bodyhtml', 'content',
+    'contenthtml', 'html', 'text', 'fulltext'
+))
+
+# Shorter embedded text is more likely a teaser than the full transcript
+MIN_EMBEDDED_CHARS = 1000
+
+
+def _clean(value):
+    """Normalize an embedded string that may contain HTML markup or entities."""
+    if HTML_MARKUP.search(value):
+        # Embedded markup is usually minified, so separate every text node
+        soup = bs4.BeautifulSoup(value, 'html.parser')
+        text = ' '.join(soup.get_text(' ').split())
+        soup.decompose()
+        return text
+    return ' '.join(html_entities.unescape(value).split())
+
+
+def _candidates(node, key=''):
+    """Yield transcript-like strings found in a parsed JSON blob."""
+    if isinstance(node, dict):
+        for child_key, child in node.items():
+            yield from _candidates(child, str(child_key).lower())
+    elif isinstance(node, list):
+        # Transcripts split into speaker segments: [{"speaker": ..., "text": ...}, ...]
+        segments = [item for item in node if isinstance(item, dict) and isinstance(item.get('text'), str)]
+        if len(segments) >= 3 and len(segments) == len(node):
+            yield ' '.join(
+                f"{item['speaker']}: {item['text']}" if isinstance(item.get('speaker'), str) else item['text']
+                for item in segments
+            )
+        for item in node:
+            yield from _candidates(item, key)
+    elif isinstance(node, str) and key in TEXT_KEYS:
+        yield node
+
+
+def extract_embedded_text(html, min_chars=MIN_EMBEDDED_CHARS):
+    """
+    Pull transcript text out of embedded JSON in a page.
+
+    Args:
+        html (str): Decoded page HTML
+        min_chars (int): Minimum length for embedded text to be trusted
+
+    Returns:
+        str: Cleaned transcript text, or None if the page has none
+    """
+    best = ''
+    for match in SCRIPT_BLOCK.finditer(html):
+        if not JSON_SCRIPT.search(match.group(1)):
+            continue
+        try:
+            blob = json.loads(match.group(2))
+        except ValueError:
+            continue
+        for candidate in _candidates(blob):
+            # Clean only candidates that could beat the current best
+            if len(candidate) > len(best):
+                text = _clean(candidate)
+                if len(text) > len(best):
+                    best = text
+    return best if len(best) >= min_chars else None
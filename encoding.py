@@ -0,0 +1,140 @@
+"""
+Character set detection for transcript bytes.
+
+Vendor-supplied transcripts and IR pages arrive in whatever encoding the
+publisher's system produced. Bytes are decoded exactly once, trying the
+cheapest reliable signal first: byte order mark, declared charset (HTTP
+header, then <meta> in the first few KB for HTML), strict UTF-8,
+charset_normalizer on a sample (when installed) and finally cp1252, which
+decodes any byte sequence.
+"""
+
+import re
+import codecs
+
+from metrics import metrics
+from lazy import lazy_import
+
+# Statistical detector; imported on first use, None when not installed
+charset_normalizer = lazy_import('charset_normalizer', optional=True)
+
+# UTF-32 LE must be checked before UTF-16 LE, whose BOM is its prefix
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+FALLBACK_ENCODING = 'cp1252'
+
+# Bytes handed to the statistical detector; enough to be confident on prose
+DETECTION_SAMPLE_BYTES = 64 * 1024
+
+# Browsers only honour a <meta> charset within the first 1024 bytes; allow
+# some slack for pages with long <head> preambles
+META_SNIFF_BYTES = 4096
+
+HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+META_CHARSET = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+# Pages labelled latin-1 are nearly always cp1252 (curly quotes, dashes).
+# Keyed by codecs.lookup() names: "latin-1" and "ISO-8859-1" both become "iso8859-1"
+CHARSET_ALIASES = {'iso8859-1': 'cp1252', 'ascii': 'cp1252'}
+
+
+def normalize_charset(label):
+    """
+    Map a declared charset label to a Python codec name.
+
+    Returns:
+        str: Codec name, or None if the label is unknown
+    """
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip().strip('"\'')).name
+    except LookupError:
+        return None
+    return CHARSET_ALIASES.get(name, name)
+
+
+def charset_from_content_type(content_type):
+    """Return the codec declared in a Content-Type header, or None."""
+    match = HEADER_CHARSET.search(content_type or '')
+    return normalize_charset(match.group(1)) if match else None
+
+
+def sniff_meta_charset(data, limit=META_SNIFF_BYTES):
+    """Return the codec declared by a <meta> tag near the start of an HTML page, or None."""
+    match = META_CHARSET.search(data[:limit])
+    return normalize_charset(match.group(1).decode('ascii', 'ignore')) if match else None
+
+
+def _detect(data):
+    """Guess a codec for bytes that are not valid UTF-8."""
+    if charset_normalizer is not None:
+        matches = charset_normalizer.from_bytes(data[:DETECTION_SAMPLE_BYTES])
+        best = matches.best()
+        if best is not None:
+            # Short samples fit several code pages equally well; among the
+            # cleanest candidates prefer the Western default
+            for match in matches:
+                if match.chaos <= best.chaos and FALLBACK_ENCODING in match.could_be_from_charset:
+                    return FALLBACK_ENCODING
+            return best.encoding
+    return FALLBACK_ENCODING
+
+
+def decode_bytes(data, declared=()):
+    """
+    Decode raw text bytes, detecting the character set.
+
+    Args:
+        data (bytes): Raw text bytes
+        declared (iterable): Codec names declared by the source, most
+            authoritative first; a declaration that fails to decode is skipped
+
+    Returns:
+        tuple: (text, encoding)
+    """
+    for mark, encoding in BYTE_ORDER_MARKS:
+        if data.startswith(mark):
+            return data.decode(encoding, errors='replace'), encoding
+
+    for encoding in declared:
+        if encoding:
+            try:
+                return data.decode(encoding), encoding
+            except (UnicodeDecodeError, LookupError):
+                continue
+
+    try:
+        return data.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    encoding = _detect(data)
+    try:
+        return data.decode(encoding), encoding
+    except (UnicodeDecodeError, LookupError):
+        # The detector only saw a sample; never fail on a stray byte
+        return data.decode(FALLBACK_ENCODING, errors='replace'), FALLBACK_ENCODING
+
+
+def decode_html(data, content_type=''):
+    """
+    Decode an HTML response body once, ahead of parsing.
+
+    Args:
+        data (bytes): Response body
+        content_type (str): Content-Type header value
+
+    Returns:
+        tuple: (text, encoding)
+    """
+    with metrics.timer('scrape.decode'):
+        text, encoding = decode_bytes(data, (charset_from_content_type(content_type), sniff_meta_charset(data)))
+    metrics.incr(f'scrape.encoding.{encoding}')
+    return text, encoding
@@ -0,0 +1,76 @@
+"""
+Text extraction helpers for scraped transcript pages.
+"""
+
+import io
+
+# Characters str.splitlines() treats as line boundaries
+LINE_BREAKS = frozenset('\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029')
+
+
+def _write_line(buffer, line, needs_separator):
+    """
+    Write the normalized phrases of one line to the output buffer.
+
+    A line is split on double spaces and every non-empty, stripped phrase is
+    written separated by a single space.
+
+    Returns:
+        bool: Whether the next phrase needs a leading separator
+    """
+    for phrase in line.strip().split("  "):
+        phrase = phrase.strip()
+        if phrase:
+            if needs_separator:
+                buffer.write(' ')
+            buffer.write(phrase)
+            needs_separator = True
+    return needs_separator
+
+
+def extract_clean_text(soup):
+    """
+    Extract whitespace-normalized text from a parsed page.
+
+    Walks the tree's text nodes and writes normalized whitespace straight
+    into one buffer instead of materializing ``soup.get_text()`` and its
+    split lines and phrases. Only the current line is held as fragments.
+    The output is identical to::
+
+        lines = (line.strip() for line in soup.get_text().splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        ' '.join(chunk for chunk in chunks if chunk)
+
+    Args:
+        soup (BeautifulSoup): Parsed page with unwanted elements removed
+
+    Returns:
+        str: Cleaned text content
+    """
+    buffer = io.StringIO()
+    needs_separator = False
+    line_fragments = []
+
+    for string in soup.strings:
+        lines = string.splitlines()
+        if not lines:
+            continue
+        ends_with_break = string[-1] in LINE_BREAKS
+        if len(lines) == 1 and not ends_with_break:
+            # No line break inside this node, the line continues
+            line_fragments.append(lines[0])
+            continue
+
+        line_fragments.append(lines[0])
+        needs_separator = _write_line(buffer, ''.join(line_fragments), needs_separator)
+        line_fragments.clear()
+
+        for line in (lines[1:] if ends_with_break else lines[1:-1]):
+            needs_separator = _write_line(buffer, line, needs_separator)
+        if not ends_with_break:
+            line_fragments.append(lines[-1])
+
+    if line_fragments:
+        _write_line(buffer, ''.join(line_fragments), needs_separator)
+
+    return buffer.getvalue()
@@ -0,0 +1,240 @@
+"""
+Local extractive summarizer used when the model is unavailable or saturated.
+
+Runs on CPU with no network access. Sentences are ranked by TF-IDF salience
+refined with TextRank over the strongest candidates, classified with a small
+finance-aware sentiment lexicon and forward-looking cues, and assembled into
+the same sentiment/good_news/bad_news/key_promises/verdict schema as the AI
+analysis, marked ``"degraded": true``.
+"""
+
+import re
+import math
+from collections import Counter
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=["\'(\[]?[A-Z0-9$])')
+TOKEN = re.compile(r"[a-z][a-z'\-]*|\d+(?:\.\d+)?%?")
+
+# Keep ranking well under a second on very long pages
+MAX_SENTENCES = 1500
+TEXTRANK_CANDIDATES = 120
+MAX_SENTENCE_CHARS = 300
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers him his how i if in into is it its itself just let me more most
+my no nor not now of off on once only or other our ours out over own same she should so some such
+than that the their them then there these they this those through to too under until up very was
+we were what when where which while who whom why will with would you your yours thank thanks
+good morning afternoon everyone call today quarter question operator
+""".split())
+
+POSITIVE_TERMS = frozenset("""
+growth grew grow growing increase increased increases record records strong stronger strength
+exceeded exceed exceeds beat beats outperformed outperform improved improve improvement improving
+expansion expanded expand gain gains gained profitable profitability momentum robust accelerate
+accelerated accelerating upside raised raise raising healthy resilient solid tailwind tailwinds
+success successful successfully win wins won surpassed higher highest milestone efficiency
+efficiencies savings boost boosted rebound recovered recovery favorable positive optimistic
+""".split())
+
+NEGATIVE_TERMS = frozenset("""
+decline declined declines declining decrease decreased decreases loss losses lost weak weaker
+weakness headwind headwinds challenge challenges challenging pressure pressures impairment
+impairments shortfall missed miss lowered lower lowest slowdown slowed slowing softness soft
+disruption disruptions risk risks uncertainty uncertain inflation inflationary restructuring
+layoffs downturn deteriorated deterioration negative unfavorable delay delayed delays concern
+concerns difficult adverse dilution write-down writedown competition volatility
+""".split())
+
+PLEASANTRIES = re.compile(
+    r"\b(?:thank you|thanks|good (?:morning|afternoon|evening)|welcome|joining (?:us|our)|"
+    r"operator|next question|great question|appreciate)\b",
+    re.IGNORECASE
+)
+
+NEGATIONS = frozenset("not no never without neither nor hardly".split())
+
+FORWARD_LOOKING = re.compile(
+    r"\b(?:we (?:expect|anticipate|plan|intend|will|are committed|remain committed|aim|target)|"
+    r"(?:expect|anticipate|plan|intend|aim) to|going forward|looking ahead|outlook (?:for|is)|guidance (?:to|for)|"
+    r"(?:rais|reaffirm|reiterat|initiat|maintain|lower)\w* (?:our )?(?:[\w-]+ ){0,3}guidance|"
+    r"next (?:quarter|year|fiscal)|full[- ]year|fiscal (?:year )?20\d\d|by (?:the end of )?(?:q[1-4] )?20\d\d|"
+    r"over the next|long[- ]term target)\b",
+    re.IGNORECASE
+)
+
+
+def split_sentences(text):
+    """Split cleaned text into sentences, capped for predictable runtime."""
+    sentences = []
+    for sentence in SENTENCE_SPLIT.split(text):
+        sentence = sentence.strip()
+        if len(sentence) >= 20:
+            sentences.append(sentence)
+            if len(sentences) >= MAX_SENTENCES:
+                break
+    return sentences
+
+
+def _tfidf_vectors(tokenized):
+    """Build normalized TF-IDF vectors (as dicts) for tokenized sentences."""
+    document_frequency = Counter()
+    for tokens in tokenized:
+        document_frequency.update(set(tokens))
+
+    count = len(tokenized)
+    idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    vectors = []
+    for tokens in tokenized:
+        weights = {term: tf * idf[term] for term, tf in Counter(tokens).items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in weights.items()})
+    return vectors
+
+
+def _cosine(first, second):
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(weight * second.get(term, 0.0) for term, weight in first.items())
+
+
+def _textrank(vectors, iterations=20, damping=0.85):
+    """Run TextRank over a small similarity graph and return node scores."""
+    size = len(vectors)
+    if size == 0:
+        return []
+    weights = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1, size):
+            similarity = _cosine(vectors[i], vectors[j])
+            weights[i][j] = weights[j][i] = similarity
+    totals = [sum(row) or 1.0 for row in weights]
+
+    scores = [1.0] * size
+    for _ in range(iterations):
+        scores = [
+            (1 - damping) + damping * sum(weights[j][i] / totals[j] * scores[j] for j in range(size))
+            for i in range(size)
+        ]
+    return scores
+
+
+def rank_sentences(sentences):
+    """
+    Score sentences by salience.
+
+    Returns:
+        list: (score, index) tuples, best first
+    """
+    tokenized = [[token for token in TOKEN.findall(sentence.lower()) if token not in STOPWORDS]
+                 for sentence in sentences]
+    vectors = _tfidf_vectors(tokenized)
+
+    # TF-IDF salience: similarity to the document centroid, with a bonus for figures
+    centroid = Counter()
+    for vector in vectors:
+        centroid.update(vector)
+    norm = math.sqrt(sum(weight * weight for weight in centroid.values())) or 1.0
+    centroid = {term: weight / norm for term, weight in centroid.items()}
+
+    salience = []
+    for index, (vector, sentence) in enumerate(zip(vectors, sentences)):
+        score = _cosine(vector, centroid)
+        if re.search(r'\d', sentence):
+            score *= 1.25
+        if PLEASANTRIES.search(sentence):
+            score *= 0.2
+        salience.append(score)
+
+    # Refine the strongest candidates with TextRank
+    candidates = sorted(range(len(sentences)), key=lambda i: salience[i], reverse=True)[:TEXTRANK_CANDIDATES]
+    textrank = _textrank([vectors[i] for i in candidates])
+    top = max(textrank) if textrank else 1.0
+
+    ranked = [(salience[i] * (0.5 + 0.5 * rank / top), i) for i, rank in zip(candidates, textrank)]
+    ranked.sort(reverse=True)
+    return ranked
+
+
+def sentence_polarity(sentence):
+    """Return a lexicon sentiment score for a sentence (>0 positive, <0 negative)."""
+    tokens = TOKEN.findall(sentence.lower())
+    score = 0
+    for position, token in enumerate(tokens):
+        polarity = (token in POSITIVE_TERMS) - (token in NEGATIVE_TERMS)
+        if polarity and NEGATIONS.intersection(tokens[max(0, position - 3):position]):
+            polarity = -polarity
+        score += polarity
+    return score
+
+
+def _clip(sentence):
+    if len(sentence) <= MAX_SENTENCE_CHARS:
+        return sentence
+    return sentence[:MAX_SENTENCE_CHARS].rsplit(' ', 1)[0] + '...'
+
+
+def summarize_transcript(text):
+    """
+    Produce a degraded, extractive analysis of transcript text.
+
+    Args:
+        text (str): Cleaned transcript text
+
+    Returns:
+        dict: Analysis in the standard schema with "degraded": True
+    """
+    sentences = split_sentences(text)
+    ranked = rank_sentences(sentences)
+
+    good_news, bad_news, key_promises = [], [], []
+    positive_total = negative_total = 0
+    highlights = []
+    for _, index in ranked:
+        sentence = sentences[index]
+        if sentence.endswith('?'):
+            # Analyst questions raise topics, they don't report facts
+            continue
+        if len(highlights) < 3:
+            highlights.append(_clip(sentence))
+        if FORWARD_LOOKING.search(sentence) and len(key_promises) < 4:
+            key_promises.append(_clip(sentence))
+            continue
+        polarity = sentence_polarity(sentence)
+        if polarity > 0:
+            positive_total += polarity
+            if len(good_news) < 5:
+                good_news.append(_clip(sentence))
+        elif polarity < 0:
+            negative_total -= polarity
+            if len(bad_news) < 5:
+                bad_news.append(_clip(sentence))
+
+    total = positive_total + negative_total
+    if total == 0:
+        sentiment = "Neutral"
+    elif positive_total >= 2 * negative_total:
+        sentiment = "Positive"
+    elif negative_total >= 2 * positive_total:
+        sentiment = "Negative"
+    else:
+        sentiment = "Mixed"
+
+    verdict = (
+        f"Automated extractive summary (AI analysis unavailable). Overall tone appears {sentiment.lower()} "
+        f"based on {len(sentences)} sentences. Most salient points: " + ' '.join(highlights)
+        if highlights else
+        "Automated extractive summary (AI analysis unavailable). Not enough text to summarize."
+    )
+
+    return {
+        'sentiment': sentiment,
+        'good_news': good_news,
+        'bad_news': bad_news,
+        'key_promises': key_promises,
+        'verdict': verdict,
+        'degraded': True
+    }
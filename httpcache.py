@@ -0,0 +1,234 @@
+"""
+HTTP response compression, content-hash ETags and fingerprinted static assets.
+
+Responses are compressed with brotli (when the ``brotli`` package is
+installed) or gzip, per the client's Accept-Encoding. Bodies carrying a
+strong ETag are compressed once and reused from a small cache, which covers
+static assets and repeated analyses. /analyze results carry a strong ETag
+of their JSON body; a client sending it back in If-None-Match gets a 304 with
+no body. Static assets are linked under fingerprinted names
+(``script.<hash>.js``) and served with long-lived immutable cache headers,
+so browsers only fetch them again after they change.
+"""
+
+import os
+import gzip
+import hashlib
+import mimetypes
+import threading
+from collections import OrderedDict
+
+from flask import request, jsonify, abort, url_for, current_app
+from werkzeug.security import safe_join
+
+from metrics import metrics
+from lazy import lazy_import
+
+brotli = lazy_import('brotli', optional=True)
+
+# Smaller bodies are sent as they are; compression would barely shrink them
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '500'))
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+# Fingerprinted assets never change under the same URL
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+
+def content_etag(data):
+    """Strong ETag value for a body: a prefix of its SHA-256."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def choose_encoding(accept_encodings):
+    """
+    Pick the response encoding for a request's Accept-Encoding.
+
+    Returns:
+        str: "br", "gzip" or None for an uncompressed response
+    """
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+class Compressor:
+    """after_request hook compressing eligible responses."""
+
+    def __init__(self, min_bytes=COMPRESS_MIN_BYTES, cache_entries=64):
+        """
+        Args:
+            min_bytes (int): Smallest body that is compressed
+            cache_entries (int): Compressed bodies kept, keyed by ETag
+        """
+        self.min_bytes = min_bytes
+        self.cache_entries = cache_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        # Caches must keep compressed and plain copies apart
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        encoding = choose_encoding(request.accept_encodings)
+        if len(data) < self.min_bytes or encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (etag, encoding) if etag and not weak else None
+        compressed = self._cached(key)
+        if compressed is None:
+            with metrics.timer('http.compress'):
+                compressed = self._compress(data, encoding)
+            self._store(key, compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            # A different representation needs its own validator
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+        metrics.incr(f'http.compressed.{encoding}')
+        return response
+
+    @staticmethod
+    def _compress(data, encoding):
+        if encoding == 'br':
+            # Quality 5 is close to gzip's speed with smaller output
+            return brotli.compress(data, quality=5)
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    def _cached(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+            return compressed
+
+    def _store(self, key, compressed):
+        if key is None:
+            return
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+
+def not_modified(etag):
+    """
+    Return an empty 304 if the request's If-None-Match names this body.
+
+    Compressed copies carry the ETag with an encoding suffix, so those
+    validate the same body.
+
+    Returns:
+        Response: The 304, or None when the client needs the body
+    """
+    for variant in (etag, f"{etag}-br", f"{etag}-gzip"):
+        if request.if_none_match.contains(variant):
+            metrics.incr('http.not_modified')
+            response = current_app.response_class(status=304)
+            response.set_etag(variant)
+            response.vary.add('Accept-Encoding')
+            return response
+    return None
+
+
+def etag_json(payload, status=200):
+    """
+    jsonify() a result with a strong ETag of its body.
+
+    Returns:
+        Response: The JSON response, or an empty 304 when the request's
+            If-None-Match already names this body (plain or compressed)
+    """
+    response = jsonify(payload)
+    response.status_code = status
+    if status != 200:
+        return response
+
+    etag = content_etag(response.get_data())
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    response.set_etag(etag)
+    # Results change with the transcript; clients may keep them but revalidate
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+class StaticAssets:
+    """Fingerprinted URLs for, and cache-friendly serving of, static files."""
+
+    def __init__(self, folder, endpoint='asset'):
+        """
+        Args:
+            folder (str): Static file directory
+            endpoint (str): Flask endpoint serving ``/<prefix>/<fingerprinted name>``
+        """
+        self.folder = folder
+        self.endpoint = endpoint
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _load(self, filename):
+        """Return (content, digest) of a static file, re-read when it changes."""
+        path = safe_join(self.folder, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._files.get(filename)
+        if entry is None or entry[0] != mtime:
+            with open(path, 'rb') as handle:
+                content = handle.read()
+            entry = (mtime, content, content_etag(content))
+            with self._lock:
+                self._files[filename] = entry
+        return entry[1], entry[2]
+
+    def url(self, filename):
+        """
+        URL of a static file with its content hash in the name, for templates.
+
+        Falls back to the plain static URL when the file does not exist.
+        """
+        loaded = self._load(filename)
+        if loaded is None:
+            return url_for('static', filename=filename)
+        stem, extension = os.path.splitext(filename)
+        return url_for(self.endpoint, filename=f"{stem}.{loaded[1][:12]}{extension}")
+
+    def response(self, fingerprinted):
+        """
+        Serve a fingerprinted file name such as ``script.0123456789ab.js``.
+
+        A current fingerprint is cached for a year as immutable; an outdated
+        one (a page rendered before a deploy) gets the current file with
+        revalidation, so it is never cached under the wrong name.
+        """
+        stem, extension = os.path.splitext(fingerprinted)
+        stem, _, fingerprint = stem.rpartition('.')
+        loaded = self._load(f"{stem}{extension}") if stem else None
+        if loaded is None:
+            abort(404)
+        content, digest = loaded
+        current = fingerprint == digest[:12]
+
+        response = not_modified(digest) or current_app.response_class(
+            content, mimetype=mimetypes.guess_type(fingerprinted)[0] or 'application/octet-stream'
+        )
+        if response.status_code == 200:
+            response.set_etag(digest)
+        if current:
+            response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
@@ -0,0 +1,118 @@
+"""
+Incremental re-analysis support for live or revised transcripts.
+
+Transcript pages are often published partially and updated while the call
+is still running. Instead of re-analyzing the whole text on every re-fetch,
+we keep the previous cleaned text and analysis per URL, diff the new text
+against it and only send the new or changed sections to the model together
+with the previous result.
+"""
+
+import re
+import difflib
+
+from cache import Cache, MemoryBackend
+
+# The cleaned text is a single space-joined string, so sentence boundaries are
+# the finest stable unit we can diff on.
+SECTION_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Above this share of changed sections a full re-analysis is cheaper and
+# more reliable than a merge update.
+MAX_INCREMENTAL_CHANGE_RATIO = 0.5
+
+
+def split_sections(text):
+    """
+    Split cleaned transcript text into diffable sections.
+
+    Args:
+        text (str): Cleaned transcript text
+
+    Returns:
+        list: Non-empty sections in document order
+    """
+    return [section.strip() for section in SECTION_BOUNDARY.split(text) if section.strip()]
+
+
+def diff_sections(old_text, new_text):
+    """
+    Compute a section-level diff between two versions of a transcript.
+
+    Args:
+        old_text (str): Previously analyzed text
+        new_text (str): Freshly scraped text
+
+    Returns:
+        dict: {
+            "added": [str],        # new or revised sections, in order
+            "removed": [str],      # sections no longer present
+            "changed_ratio": float # share of new sections that changed
+        }
+    """
+    old_sections = split_sections(old_text)
+    new_sections = split_sections(new_text)
+
+    matcher = difflib.SequenceMatcher(a=old_sections, b=new_sections, autojunk=False)
+    added = []
+    removed = []
+
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        if tag in ('replace', 'delete'):
+            removed.append(' '.join(old_sections[old_start:old_end]))
+        if tag in ('replace', 'insert'):
+            added.append(' '.join(new_sections[new_start:new_end]))
+
+    changed_count = len(new_sections) - sum(block.size for block in matcher.get_matching_blocks())
+    changed_ratio = changed_count / len(new_sections) if new_sections else 1.0
+
+    return {
+        'added': added,
+        'removed': removed,
+        'changed_ratio': changed_ratio
+    }
+
+
+class TranscriptStore:
+    """
+    Bounded store of the last analyzed text and result per URL.
+
+    Entries live in a cache backend, so with a shared backend every worker
+    process sees the others' analyses and they survive restarts.
+    """
+
+    def __init__(self, max_entries=256, backend=None):
+        """
+        Args:
+            max_entries (int): Entry limit of the default in-process backend
+            backend (CacheBackend): Where entries are kept, defaults to an
+                in-process LRU
+        """
+        self.max_entries = max_entries
+        self._cache = Cache(backend if backend is not None else MemoryBackend(max_entries))
+
+    def get(self, url):
+        """Return the stored {"text", "result"} entry for a URL, or None."""
+        return self._cache.get(url)
+
+    def put(self, url, text, result):
+        """Store the latest analyzed text and result for a URL."""
+        self._cache.set(url, {'text': text, 'result': result})
+
+    def lock(self, url, timeout=30.0):
+        """
+        Hold the analysis lock for a URL across worker processes.
+
+        Yields:
+            bool: Whether the lock was acquired before the timeout
+        """
+        return self._cache.lock(url, timeout=timeout)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        """Drop all stored entries."""
+        self._cache.clear()
@@ -0,0 +1,74 @@
+"""
+Deferred imports for heavy dependencies.
+
+The Gemini SDK alone takes over half a second to import, and requests, bs4,
+pypdf and numpy add a few hundred milliseconds more. Workers and test
+modules that never scrape or call the model should not pay for them, so
+these modules are bound to LazyModule stand-ins that import the real module
+on first attribute access. Attribute reads and writes go to the real
+module, so ``patch('requests.get')`` and ``patch.object(module, ...)`` keep
+working.
+"""
+
+import importlib
+import importlib.util
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    __slots__ = ('_lazy_name', '_lazy_module')
+
+    def __init__(self, name):
+        object.__setattr__(self, '_lazy_name', name)
+        object.__setattr__(self, '_lazy_module', None)
+
+    def load(self):
+        """Import (once) and return the real module."""
+        module = self._lazy_module
+        if module is None:
+            module = importlib.import_module(self._lazy_name)
+            object.__setattr__(self, '_lazy_module', module)
+        return module
+
+    @property
+    def loaded(self):
+        """Whether the real module has been imported."""
+        return self._lazy_module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self.load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self.load(), attr)
+
+    def __dir__(self):
+        return dir(self.load())
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module {self._lazy_name!r} ({state})>"
+
+
+def lazy_import(name, optional=False):
+    """
+    Bind a module lazily.
+
+    Args:
+        name (str): Dotted module name
+        optional (bool): Return None instead of a stand-in when the module is
+            not installed (checked without importing it)
+
+    Returns:
+        LazyModule: Stand-in for the module, or None for a missing optional module
+    """
+    if optional:
+        try:
+            if importlib.util.find_spec(name) is None:
+                return None
+        except (ImportError, ValueError):
+            return None
+    return LazyModule(name)
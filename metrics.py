@@ -0,0 +1,102 @@
+"""
+Lightweight in-process instrumentation.
+
+Stage timings and event counters are aggregated in memory and served as JSON
+from /metrics, so slow stages (fetch, charset detection, parsing, model
+calls) can be spotted without an external monitoring stack.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+
+class Metrics:
+    """Thread-safe registry of named timers and counters."""
+
+    def __init__(self):
+        self._timers = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, name):
+        """Time the enclosed block under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        """Record one duration, in seconds, for a timer."""
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                stats = self._timers[name] = {'count': 0, 'total': 0.0, 'max': 0.0}
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+
+    def incr(self, name, amount=1):
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """
+        Return the current values.
+
+        Returns:
+            dict: {
+                "timers": {name: {"count", "total_ms", "avg_ms", "max_ms"}},
+                "counters": {name: int}
+            }
+        """
+        with self._lock:
+            timers = {
+                name: {
+                    'count': stats['count'],
+                    'total_ms': round(stats['total'] * 1000, 3),
+                    'avg_ms': round(stats['total'] * 1000 / stats['count'], 3),
+                    'max_ms': round(stats['max'] * 1000, 3)
+                }
+                for name, stats in self._timers.items()
+            }
+            return {'timers': timers, 'counters': dict(self._counters)}
+
+    def drain(self):
+        """
+        Return the raw recorded values and reset them.
+
+        Used by worker processes to ship their measurements back to the
+        parent, which adds them with ``merge()``.
+        """
+        with self._lock:
+            state = {'timers': self._timers, 'counters': self._counters}
+            self._timers = {}
+            self._counters = {}
+        return state
+
+    def merge(self, state):
+        """Add values returned by another registry's ``drain()``."""
+        with self._lock:
+            for name, other in state['timers'].items():
+                stats = self._timers.get(name)
+                if stats is None:
+                    stats = self._timers[name] = {'count': 0, 'total': 0.0, 'max': 0.0}
+                stats['count'] += other['count']
+                stats['total'] += other['total']
+                stats['max'] = max(stats['max'], other['max'])
+            for name, amount in state['counters'].items():
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        """Drop all recorded values."""
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+# Process-wide registry
+metrics = Metrics()
@@ -0,0 +1,93 @@
+"""
+Detection of multi-page transcripts.
+
+Some transcript sites split one call across several pages ("Page 1 of 4").
+This module finds the URLs of the following pages on a parsed page, from
+rel="next" links, numbered pagination links and "page X of N" labels, so
+the scraper can fetch them concurrently instead of one after another.
+"""
+
+import re
+from urllib.parse import urljoin, urlparse, urldefrag
+
+PAGE_OF = re.compile(r'\bpage\s+(\d{1,3})\s*(?:of|/)\s*(\d{1,3})\b', re.IGNORECASE)
+
+# URLs that look like page N of a listing: ?page=2, /page/2, -p2, _pg2
+PAGE_HINT = re.compile(r'(?:page|pg|p)(?:=|/|-|_)?\d', re.IGNORECASE)
+
+
+def _number_pattern(number):
+    return re.compile(r'(?<!\d)' + str(number) + r'(?!\d)')
+
+
+def _page_template(page_url, number):
+    """Turn the URL of page ``number`` into a format string, or None."""
+    matches = list(_number_pattern(number).finditer(page_url))
+    if not matches:
+        return None
+    last = matches[-1]
+    return page_url[:last.start()].replace('{', '{{').replace('}', '}}') + '{}' + \
+        page_url[last.end():].replace('{', '{{').replace('}', '}}')
+
+
+def find_page_links(soup, page_url, max_pages=10):
+    """
+    Find the URLs of the pages following this one, in page order.
+
+    Only same-host links are followed. When the total page count is known
+    ("page 1 of 4") missing page URLs are derived from the pattern of the
+    next page's URL, so every page can be fetched at once.
+
+    Args:
+        soup (BeautifulSoup): The parsed page
+        page_url (str): URL the page was fetched from
+        max_pages (int): Highest page number to consider
+
+    Returns:
+        list: Absolute URLs of the consecutive following pages; may hold
+            only the next page when the total is unknown
+    """
+    page_url = urldefrag(page_url)[0]
+    host = urlparse(page_url).netloc
+
+    current, total = 1, None
+    label = soup.find(string=PAGE_OF)
+    if label is not None:
+        current, total = (int(value) for value in PAGE_OF.search(label).groups())
+        if not 1 <= current <= total:
+            current, total = 1, None
+
+    next_url = None
+    numbered = {}
+    for element in soup.find_all(['a', 'link'], href=True):
+        href = urldefrag(urljoin(page_url, element['href']))[0]
+        if href == page_url or urlparse(href).netloc != host:
+            continue
+        if 'next' in (element.get('rel') or []) and next_url is None:
+            next_url = href
+        if element.name == 'a':
+            text = element.get_text(strip=True)
+            if text.isdigit() and current < int(text) <= max_pages and _number_pattern(text).search(href):
+                numbered.setdefault(int(text), href)
+
+    # Bare numbered links are only trusted with some other sign of pagination
+    if not (total or next_url or any(PAGE_HINT.search(href) for href in numbered.values())):
+        numbered = {}
+
+    if next_url is not None:
+        numbered.setdefault(current + 1, next_url)
+
+    if total and current + 1 in numbered:
+        template = _page_template(numbered[current + 1], current + 1)
+        if template is not None:
+            for number in range(current + 2, min(total, max_pages) + 1):
+                numbered.setdefault(number, template.format(number))
+
+    # Stop at the first gap so the stitched transcript never skips a page
+    last = min(total, max_pages) if total else max_pages
+    pages = []
+    number = current + 1
+    while number <= last and number in numbered and numbered[number] not in pages:
+        pages.append(numbered[number])
+        number += 1
+    return pages
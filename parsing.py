@@ -0,0 +1,205 @@
+"""
+HTML page to transcript text, inline or on a process pool.
+
+Decoding, parsing and cleaning a page is CPU-bound and holds the GIL, so a
+few multi-megabyte pages stall every other request thread in the worker,
+including ones only waiting on the model. Pages of at least
+PARSE_OFFLOAD_BYTES are therefore parsed in a separate process: raw bytes
+go in and cleaned text comes out. Bodies of at least SHARED_MEMORY_BYTES
+are handed over through shared memory instead of being pickled through the
+pool's pipe. Small pages stay inline, where a round trip to another process
+would cost more than the parse.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse
+
+from encoding import decode_html
+from embedded import extract_embedded_text
+from domain_rules import rules as domain_rules
+from extraction import extract_clean_text
+from pagination import find_page_links
+from metrics import metrics
+from lazy import lazy_import
+
+bs4 = lazy_import('bs4')
+
+logger = logging.getLogger(__name__)
+
+# Worker processes (0 parses everything inline; by default one core is left
+# for the request threads) and the size thresholds
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(min(4, (os.cpu_count() or 1) - 1))))
+PARSE_OFFLOAD_BYTES = int(os.getenv('PARSE_OFFLOAD_BYTES', str(256 * 1024)))
+SHARED_MEMORY_BYTES = 1024 * 1024
+
+
+def html_to_text(content, content_type, url, max_pages=10):
+    """
+    Decode, parse and clean one HTML page.
+
+    Args:
+        content (bytes): Raw response body
+        content_type (str): Content-Type header value
+        url (str): Page URL, for domain rules and pagination links
+        max_pages (int): Most pages of a paginated transcript to link to
+
+    Returns:
+        tuple: (cleaned text, URLs of the following pages of a paginated transcript)
+    """
+    # Decode once (header, <meta>, then detection) so the parser
+    # does not re-run its own detection over the whole page
+    html, encoding = decode_html(content, content_type)
+    logger.info(f"Decoded page as {encoding}")
+
+    # Script-rendered pages carry the transcript in embedded JSON; reading
+    # it from there skips the DOM parse and text walk
+    with metrics.timer('scrape.embedded'):
+        text = extract_embedded_text(html)
+    if text:
+        logger.info("Extracted transcript from embedded page data")
+        metrics.incr('scrape.embedded_hits')
+        return text, []
+
+    # Known sites: parse only the transcript container with the site's rule
+    rule = domain_rules.for_host(urlparse(url).hostname)
+    if rule is not None:
+        with metrics.timer('scrape.rule'):
+            text = rule.extract(html)
+        if text and len(text) >= 100:
+            logger.info(f"Extracted transcript with the {rule.domain} extraction rule")
+            metrics.incr('scrape.rule_hits')
+            return text, []
+        logger.info(f"Extraction rule for {rule.domain} did not match, using generic extraction")
+        metrics.incr('scrape.rule_misses')
+
+    with metrics.timer('scrape.parse'):
+        # Parse HTML content
+        soup = bs4.BeautifulSoup(html, 'html.parser')
+
+        page_links = find_page_links(soup, url, max_pages=max_pages)
+
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+
+        # Extract text content, normalizing whitespace in a single pass
+        text = extract_clean_text(soup)
+
+        # Release the parsed tree before the next stage
+        soup.decompose()
+
+    return text, page_links
+
+
+def _parse_in_worker(payload, content_type, url, max_pages):
+    """
+    Pool task: run html_to_text on bytes or a shared memory block.
+
+    Args:
+        payload: The body as bytes, or (shared memory name, size)
+
+    Returns:
+        tuple: (html_to_text result, metrics recorded in this process)
+    """
+    # Drop anything inherited from the parent or left by an earlier task
+    metrics.drain()
+    if isinstance(payload, tuple):
+        name, size = payload
+        block = _attach(name)
+        try:
+            content = bytes(block.buf[:size])
+        finally:
+            block.close()
+    else:
+        content = payload
+    result = html_to_text(content, content_type, url, max_pages)
+    return result, metrics.drain()
+
+
+def _attach(name):
+    """Attach to a parent's shared memory block without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching also registers the block, but workers
+        # share the parent's resource tracker, so the parent's unlink still
+        # clears it
+        return shared_memory.SharedMemory(name=name)
+
+
+class ParsePool:
+    """Parse large pages on worker processes and small ones inline."""
+
+    def __init__(self, workers=PARSE_WORKERS, offload_bytes=PARSE_OFFLOAD_BYTES,
+                 shared_memory_bytes=SHARED_MEMORY_BYTES):
+        """
+        Args:
+            workers (int): Worker processes, started on first use; 0 parses inline
+            offload_bytes (int): Smallest body parsed on a worker
+            shared_memory_bytes (int): Smallest body passed through shared memory
+        """
+        self.workers = workers
+        self.offload_bytes = offload_bytes
+        self.shared_memory_bytes = shared_memory_bytes
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Forking a threaded server is unsafe; start clean interpreters
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(method)
+                )
+            return self._executor
+
+    def parse(self, content, content_type, url, max_pages=10):
+        """
+        Run html_to_text, on a worker process when the page is large.
+
+        Returns:
+            tuple: (cleaned text, URLs of the following pages)
+        """
+        if self.workers <= 0 or len(content) < self.offload_bytes:
+            return html_to_text(content, content_type, url, max_pages)
+
+        block = None
+        try:
+            if len(content) >= self.shared_memory_bytes:
+                block = shared_memory.SharedMemory(create=True, size=len(content))
+                block.buf[:len(content)] = content
+                payload = (block.name, len(content))
+            else:
+                payload = content
+            with metrics.timer('scrape.offload'):
+                future = self._get_executor().submit(_parse_in_worker, payload, content_type, url, max_pages)
+                result, worker_metrics = future.result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); parse this page here and
+            # start a fresh pool next time
+            logger.warning("Parse worker pool broke, parsing inline")
+            self.shutdown(wait=False)
+            return html_to_text(content, content_type, url, max_pages)
+        finally:
+            if block is not None:
+                block.close()
+                block.unlink()
+
+        metrics.merge(worker_metrics)
+        metrics.incr('scrape.offloaded_pages')
+        return result
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes; the next large page starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
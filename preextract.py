@@ -0,0 +1,120 @@
+"""
+Fast pre-extraction of financial figures and guidance from transcript text.
+
+Most of a transcript is pleasantries and repetition; the numbers and the
+guidance statements drive the analysis. This stage scores every sentence
+with compiled regexes (feature matrix) and a weight vector, and condenses
+the transcript to its most salient sentences for the model's "compact"
+input mode. NumPy is used for scoring when installed.
+"""
+
+import re
+
+from lazy import lazy_import
+from fallback import SENTENCE_SPLIT, FORWARD_LOOKING, PLEASANTRIES
+
+# Optional, imported on first use; None when numpy is not installed
+np = lazy_import('numpy', optional=True)
+
+MONEY = re.compile(
+    r"\$\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:billion|million|thousand|bn|mm|[bmk])\b)?",
+    re.IGNORECASE
+)
+PERCENT = re.compile(r"\b\d+(?:\.\d+)?\s?(?:%|percent\b|basis points\b|bps\b)", re.IGNORECASE)
+
+# Metric name -> pattern; each sentence gets one feature column per metric
+METRICS = {
+    'revenue': re.compile(r"\b(?:revenue|revenues|sales|top[- ]line|bookings)\b", re.IGNORECASE),
+    'eps': re.compile(r"\b(?:eps|earnings per share|per diluted share|per share)\b", re.IGNORECASE),
+    'margin': re.compile(r"\b(?:gross|operating|net|ebitda|ebit|profit)\s+margins?\b|\bmargins?\b", re.IGNORECASE),
+    'guidance': re.compile(
+        r"\b(?:guidance|outlook|forecast|(?:raise|raising|raised|lower|lowering|lowered|reaffirm|reaffirming|"
+        r"reiterate|reiterating|maintain|maintaining)\w*\s+(?:our\s+)?(?:[\w-]+\s+){0,3}(?:guidance|outlook|range))\b",
+        re.IGNORECASE
+    ),
+}
+
+FEATURES = ['revenue', 'eps', 'margin', 'guidance', 'money', 'percent', 'forward_looking', 'pleasantry', 'short']
+WEIGHTS = [2.0, 2.5, 2.0, 3.0, 1.5, 1.2, 1.5, -4.0, -1.0]
+
+COMPACT_HEADER = "[Condensed transcript: the most salient sentences, in original order]"
+
+
+def _sentences(text):
+    return [sentence.strip() for sentence in SENTENCE_SPLIT.split(text) if sentence.strip()]
+
+
+def _feature_rows(sentences):
+    """Build one feature row per sentence, in FEATURES order."""
+    rows = []
+    for sentence in sentences:
+        rows.append([
+            1.0 if METRICS['revenue'].search(sentence) else 0.0,
+            1.0 if METRICS['eps'].search(sentence) else 0.0,
+            1.0 if METRICS['margin'].search(sentence) else 0.0,
+            1.0 if METRICS['guidance'].search(sentence) else 0.0,
+            float(min(len(MONEY.findall(sentence)), 3)),
+            float(min(len(PERCENT.findall(sentence)), 3)),
+            1.0 if FORWARD_LOOKING.search(sentence) else 0.0,
+            1.0 if PLEASANTRIES.search(sentence) else 0.0,
+            1.0 if len(sentence) < 40 else 0.0,
+        ])
+    return rows
+
+
+def score_sentences(sentences):
+    """
+    Score sentences by financial salience.
+
+    Args:
+        sentences (list): Sentences to score
+
+    Returns:
+        list: One float score per sentence
+    """
+    if not sentences:
+        return []
+    rows = _feature_rows(sentences)
+    if np is not None:
+        return (np.asarray(rows, dtype=np.float32) @ np.asarray(WEIGHTS, dtype=np.float32)).tolist()
+    return [sum(value * weight for value, weight in zip(row, WEIGHTS)) for row in rows]
+
+
+def condense_transcript(text, max_chars=6000):
+    """
+    Condense a transcript to its most salient sentences.
+
+    Repeated sentences are dropped, the remaining ones ranked by score and
+    the best kept until ``max_chars`` is reached, then emitted in their
+    original order so the model still sees the flow of the call.
+
+    Args:
+        text (str): Cleaned transcript text
+        max_chars (int): Character budget for the condensed text
+
+    Returns:
+        str: Condensed text, or the original text if it already fits
+    """
+    if len(text) <= max_chars:
+        return text
+
+    sentences = []
+    seen = set()
+    for sentence in _sentences(text):
+        key = ' '.join(sentence.lower().split())
+        if key not in seen:
+            seen.add(key)
+            sentences.append(sentence)
+
+    scores = score_sentences(sentences)
+    budget = max_chars - len(COMPACT_HEADER) - 1
+    selected = []
+    used = 0
+    for index in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        cost = len(sentences[index]) + 1
+        if used + cost > budget:
+            continue
+        selected.append(index)
+        used += cost
+
+    return COMPACT_HEADER + '\n' + ' '.join(sentences[index] for index in sorted(selected))
@@ -0,0 +1,346 @@
+"""
+Versioned prompt templates for transcript analysis.
+
+Every template splits its prompt into a static instruction prefix and a
+per-request body. The prefix never contains transcript text, so it is
+byte-identical across calls and can be cached by the model provider; the
+template id (``name@version``) is recorded with every result so cached and
+stored analyses can tell which prompt produced them.
+"""
+
+import hashlib
+import threading
+
+# Rough token estimate for budgets and spend reporting; providers do not
+# report usage
+CHARS_PER_TOKEN = 4
+
+# Several documents in one prompt: each starts with this line, and the model
+# answers with a JSON array of analyses keyed by "document_id"
+BATCH_MARKER = "=== Document {id} ==="
+BATCH_INSTRUCTIONS = """
+Several transcripts follow, each starting with a line "=== Document <id> ===".
+Analyze each transcript on its own. Return ONLY a JSON array with one object per
+document; each object has a "document_id" key holding the document's id, plus
+the keys above.
+"""
+
+
+def estimate_tokens(text):
+    """Estimate the token count of a string."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def pack_documents(documents, max_tokens, max_documents):
+    """
+    Group documents for packed model calls, keeping their order.
+
+    Documents are added to the current group until the next one would
+    exceed ``max_tokens`` or ``max_documents``; a document too large to
+    share a call ends up in a group of its own.
+
+    Args:
+        documents (list): (id, text) pairs
+        max_tokens (int): Estimated transcript tokens per group
+        max_documents (int): Documents per group
+
+    Returns:
+        list: Lists of (id, text) pairs
+    """
+    groups = []
+    group, group_tokens = [], 0
+    for document in documents:
+        tokens = estimate_tokens(document[1])
+        if group and (group_tokens + tokens > max_tokens or len(group) >= max_documents):
+            groups.append(group)
+            group, group_tokens = [], 0
+        group.append(document)
+        group_tokens += tokens
+    if group:
+        groups.append(group)
+    return groups
+
+
+class PromptTemplate:
+    """A named, versioned prompt with a static prefix and a formatted body."""
+
+    def __init__(self, name, version, instructions, body):
+        """
+        Args:
+            name (str): Template name, e.g. "earnings_call"
+            version (int): Version number, bumped on every wording change
+            instructions (str): Static instruction prefix, shared by all calls
+            body (str): Per-request part, formatted with str.format(**fields)
+        """
+        self.name = name
+        self.version = version
+        self.instructions = instructions.strip()
+        self.body = body.strip()
+
+    @property
+    def id(self):
+        """Identifier recorded with results, e.g. "earnings_call@1"."""
+        return f"{self.name}@{self.version}"
+
+    @property
+    def prefix_hash(self):
+        """Short content hash of the static prefix, usable as a cache key."""
+        return hashlib.sha256(self.instructions.encode('utf-8')).hexdigest()[:16]
+
+    def render(self, mode=None, **fields):
+        """
+        Render the prompt for one request.
+
+        Args:
+            mode (ResponseMode): Length limits to add to the request body
+
+        Returns:
+            list: [static instruction prefix, formatted request body]
+        """
+        return [self.instructions, _with_limits(mode, self.body.format(**fields))]
+
+    def render_batch(self, documents, mode=None):
+        """
+        Render one prompt covering several documents.
+
+        The prefix is this template's instructions plus fixed batch
+        instructions, so it is as cacheable as the single-document one.
+
+        Args:
+            documents (list): (id, text) pairs
+            mode (ResponseMode): Length limits for each document's analysis
+
+        Returns:
+            list: [static instruction prefix, request body]
+        """
+        sections = [f"{BATCH_MARKER.format(id=doc_id)}\n{text}" for doc_id, text in documents]
+        body = "\n\n".join(sections) + "\n\nReturn only the JSON array, no additional text or formatting:"
+        return [f"{self.instructions}\n{BATCH_INSTRUCTIONS.strip()}", _with_limits(mode, body)]
+
+    def __repr__(self):
+        return f"PromptTemplate({self.id!r})"
+
+
+def _with_limits(mode, body):
+    # Limits go in the body: the prefix stays identical across modes and
+    # keeps its provider-side cache
+    return body if mode is None else f"{mode.instructions()}\n\n{body}"
+
+
+class ResponseMode:
+    """
+    Output budget of an analysis: item counts and word limits per field,
+    plus a cap on generated tokens.
+    """
+
+    def __init__(self, name, limits, max_output_tokens):
+        """
+        Args:
+            name (str): Mode name, e.g. "brief"
+            limits (dict): Field -> (most items, most words per item) for
+                list fields, or (None, most words) for text fields
+            max_output_tokens (int): Generation cap for one analysis
+        """
+        self.name = name
+        self.limits = limits
+        self.max_output_tokens = max_output_tokens
+
+    def instructions(self):
+        """Render the limits as prompt text."""
+        lines = ["Length limits for this answer (do not exceed them):"]
+        for field, (items, words) in self.limits.items():
+            if items is None:
+                lines.append(f'- "{field}": at most {words} words')
+            else:
+                lines.append(f'- "{field}": at most {items} items, each at most {words} words')
+        return "\n".join(lines)
+
+    def enforce(self, analysis):
+        """Drop list items beyond the mode's item counts, in place."""
+        for field, (items, _) in self.limits.items():
+            if items is not None and isinstance(analysis.get(field), list):
+                del analysis[field][items:]
+        return analysis
+
+    def __repr__(self):
+        return f"ResponseMode({self.name!r})"
+
+
+# "detailed" matches the item ranges of the version 1 templates; "brief"
+# trades detail for fewer output tokens and lower latency. On gemini-2.5-pro
+# the output cap also counts thinking tokens, which that model cannot skip,
+# so brief keeps the same headroom and saves through its shorter answer
+RESPONSE_MODES = {
+    'brief': ResponseMode('brief', {
+        'good_news': (3, 15),
+        'bad_news': (3, 15),
+        'key_promises': (2, 15),
+        'verdict': (None, 50),
+    }, max_output_tokens=8192),
+    'detailed': ResponseMode('detailed', {
+        'good_news': (5, 30),
+        'bad_news': (5, 30),
+        'key_promises': (4, 30),
+        'verdict': (None, 150),
+    }, max_output_tokens=8192),
+}
+
+
+class PromptRegistry:
+    """Thread-safe registry of prompt templates keyed by name and version."""
+
+    def __init__(self, default_name=None):
+        self.default_name = default_name
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def register(self, template):
+        """Register a template; registering the same id twice is an error."""
+        with self._lock:
+            versions = self._templates.setdefault(template.name, {})
+            if template.version in versions:
+                raise ValueError(f"Prompt template already registered: {template.id}")
+            versions[template.version] = template
+        return template
+
+    def get(self, name=None, version=None):
+        """
+        Look up a template, defaulting to the latest version of a name.
+
+        Args:
+            name (str): Template name, or None for the registry default
+            version (int): Specific version, or None for the latest
+
+        Returns:
+            PromptTemplate: The matching template
+
+        Raises:
+            KeyError: If no matching template is registered, including for
+                names and versions of the wrong type (e.g. from JSON)
+        """
+        name = name or self.default_name
+        with self._lock:
+            versions = self._templates.get(name) if isinstance(name, str) else None
+            if not versions:
+                raise KeyError(f"Unknown prompt template: {name}")
+            if version is None:
+                return versions[max(versions)]
+            try:
+                return versions[int(version)]
+            except (KeyError, TypeError, ValueError):
+                raise KeyError(f"Unknown prompt template version: {name}@{version}")
+
+
+registry = PromptRegistry(default_name='earnings_call')
+
+registry.register(PromptTemplate(
+    name='earnings_call',
+    version=1,
+    instructions="""
+Analyze this earnings call transcript and provide a structured analysis in JSON format.
+
+Please analyze the following earnings call transcript and return ONLY a valid JSON object with these exact keys:
+- "sentiment": A 1-2 word summary of the overall sentiment (e.g., "Positive", "Mixed", "Cautious")
+- "good_news": An array of 3-5 positive highlights from the call
+- "bad_news": An array of 3-5 negative points or concerns mentioned
+- "key_promises": An array of 2-4 key management promises or forward-looking statements
+- "verdict": A paragraph summary for investors explaining the key takeaways
+""",
+    body="""
+Transcript text:
+{text}
+
+Return only the JSON object, no additional text or formatting:
+"""
+))
+
+registry.register(PromptTemplate(
+    name='investor_day',
+    version=1,
+    instructions="""
+Analyze this investor day transcript and provide a structured analysis in JSON format.
+
+Investor days focus on long-term strategy rather than a single quarter. Return ONLY a valid JSON object with these exact keys:
+- "sentiment": A 1-2 word summary of management's overall tone (e.g., "Confident", "Mixed", "Defensive")
+- "good_news": An array of 3-5 strategic strengths, growth drivers or new long-term targets
+- "bad_news": An array of 3-5 risks, lowered targets or unanswered concerns
+- "key_promises": An array of 2-4 multi-year targets, capital allocation plans or strategic commitments
+- "verdict": A paragraph summary for investors explaining the long-term investment case
+""",
+    body="""
+Transcript text:
+{text}
+
+Return only the JSON object, no additional text or formatting:
+"""
+))
+
+# Version 2 leaves item counts to the response mode's length limits (sent
+# with the transcript), so brief answers are not asked for 3-5 items as well
+registry.register(PromptTemplate(
+    name='earnings_call',
+    version=2,
+    instructions="""
+Analyze this earnings call transcript and provide a structured analysis in JSON format.
+
+Please analyze the following earnings call transcript and return ONLY a valid JSON object with these exact keys:
+- "sentiment": A 1-2 word summary of the overall sentiment (e.g., "Positive", "Mixed", "Cautious")
+- "good_news": An array of positive highlights from the call
+- "bad_news": An array of negative points or concerns mentioned
+- "key_promises": An array of key management promises or forward-looking statements
+- "verdict": A paragraph summary for investors explaining the key takeaways
+Keep to the length limits given with the transcript.
+""",
+    body="""
+Transcript text:
+{text}
+
+Return only the JSON object, no additional text or formatting:
+"""
+))
+
+registry.register(PromptTemplate(
+    name='investor_day',
+    version=2,
+    instructions="""
+Analyze this investor day transcript and provide a structured analysis in JSON format.
+
+Investor days focus on long-term strategy rather than a single quarter. Return ONLY a valid JSON object with these exact keys:
+- "sentiment": A 1-2 word summary of management's overall tone (e.g., "Confident", "Mixed", "Defensive")
+- "good_news": An array of strategic strengths, growth drivers or new long-term targets
+- "bad_news": An array of risks, lowered targets or unanswered concerns
+- "key_promises": An array of multi-year targets, capital allocation plans or strategic commitments
+- "verdict": A paragraph summary for investors explaining the long-term investment case
+Keep to the length limits given with the transcript.
+""",
+    body="""
+Transcript text:
+{text}
+
+Return only the JSON object, no additional text or formatting:
+"""
+))
+
+registry.register(PromptTemplate(
+    name='incremental_update',
+    version=1,
+    instructions="""
+You previously analyzed an earnings call transcript. The transcript has since been updated.
+Update the analysis so it reflects the full, current transcript.
+Keep points that are still supported, revise or drop points contradicted by removed or corrected text,
+and add points from the new sections. Return ONLY a valid JSON object with the same keys:
+"sentiment", "good_news", "bad_news", "key_promises", "verdict".
+""",
+    body="""
+Previous analysis:
+{previous}
+
+New or revised sections:
+{added}
+
+Removed or corrected sections:
+{removed}
+
+Return only the JSON object, no additional text or formatting:
+"""
+))
@@ -0,0 +1,650 @@
+"""
+Model providers for transcript analysis.
+
+``analyze_text_with_ai`` talks to models through the small ``ModelProvider``
+interface so Gemini, a locally hosted model or a fake for tests can be
+plugged in. ``HedgedProvider`` wraps any provider to cut tail latency: when
+a call has not returned by a percentile of recent latencies it fires a
+second request and takes whichever finishes first, with the share of
+hedged requests capped so spend stays bounded. ``GuardedProvider`` caps
+in-flight calls and trips a circuit breaker when the backend is down, so
+callers can fall back to a local summary instead of failing.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import datetime
+import inspect
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from lazy import lazy_import
+from metrics import metrics
+from prompts import BATCH_MARKER
+
+# The Gemini SDK is slow to import; load it on the first model call
+genai = lazy_import('google.generativeai')
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes that mean the backend is over quota or temporarily down
+UNAVAILABLE_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class ModelUnavailableError(Exception):
+    """Raised when the model backend is down, over quota or saturated."""
+
+
+def is_unavailable_error(error):
+    """Return whether an exception means the backend is unavailable rather than the request bad."""
+    if isinstance(error, ModelUnavailableError):
+        return True
+    # google.api_core exceptions carry the HTTP status as `code`
+    code = getattr(error, 'code', None)
+    if isinstance(code, int) and code in UNAVAILABLE_STATUS_CODES:
+        return True
+    # Connection failures and timeouts, including requests' exceptions
+    return isinstance(error, (OSError, TimeoutError))
+
+
+class ModelProvider:
+    """Interface for text generation backends."""
+
+    name = 'base'
+
+    def generate(self, template, parts, timeout=None, config=None):
+        """
+        Generate a response for a rendered prompt.
+
+        Args:
+            template (PromptTemplate): The template the prompt was rendered from
+            parts (list): [static instruction prefix, request body]
+            timeout (float): Seconds the caller will wait; backends abort the
+                call (raising TimeoutError or a timeout error of their own)
+                once it has passed
+            config (dict): Generation settings, any of "max_output_tokens",
+                "temperature" and "stop_sequences"; backend defaults otherwise
+
+        Returns:
+            str: Raw response text from the model
+
+        Raises:
+            ValueError: If the provider is not configured
+            Exception: If generation fails
+        """
+        raise NotImplementedError
+
+
+class GeminiProvider(ModelProvider):
+    """Google Gemini backend with provider-side caching of prompt prefixes."""
+
+    name = 'gemini'
+
+    def __init__(self, model_name='gemini-2.5-pro', prefix_cache_ttl=3600):
+        self.model_name = model_name
+        self.prefix_cache_ttl = prefix_cache_ttl
+        self._prefix_caches = {}
+        self._prefix_cache_lock = threading.Lock()
+
+    def _get_model(self, template):
+        """
+        Create a Gemini model for a prompt template.
+
+        Where the installed SDK supports context caching, the template's static
+        instruction prefix is uploaded once and reused until it expires, so only
+        the per-request body is billed as fresh input. Otherwise the prefix is
+        sent as the first, byte-identical part of every request.
+
+        Returns:
+            tuple: (model, prefix_cached)
+        """
+        caching = getattr(genai, 'caching', None)
+        if caching is None or self.prefix_cache_ttl <= 0:
+            return genai.GenerativeModel(self.model_name), False
+
+        with self._prefix_cache_lock:
+            entry = self._prefix_caches.get(template.prefix_hash)
+            if entry is None or entry['expires'] <= time.time():
+                try:
+                    cached_content = caching.CachedContent.create(
+                        model=f'models/{self.model_name}',
+                        system_instruction=template.instructions,
+                        ttl=datetime.timedelta(seconds=self.prefix_cache_ttl)
+                    )
+                    logger.info(f"Cached prompt prefix for {template.id}")
+                except Exception as e:
+                    # e.g. prefix below the provider's minimum cacheable size;
+                    # don't retry until the TTL has passed
+                    logger.warning(f"Prompt prefix caching unavailable for {template.id}: {str(e)}")
+                    cached_content = None
+                entry = {
+                    'content': cached_content,
+                    'expires': time.time() + self.prefix_cache_ttl - 60
+                }
+                self._prefix_caches[template.prefix_hash] = entry
+
+        if entry['content'] is None:
+            return genai.GenerativeModel(self.model_name), False
+        return genai.GenerativeModel.from_cached_content(cached_content=entry['content']), True
+
+    def generate(self, template, parts, timeout=None, config=None):
+        # Get API key from environment
+        api_key = os.getenv('GOOGLE_API_KEY')
+        if not api_key:
+            raise ValueError("Google API key not configured")
+
+        # Configure Gemini AI
+        genai.configure(api_key=api_key)
+        model, prefix_cached = self._get_model(template)
+        contents = parts[1:] if prefix_cached else parts
+
+        options = {}
+        if config:
+            options['generation_config'] = config
+        if timeout is not None and self._accepts_request_options(model):
+            options['request_options'] = {'timeout': timeout}
+        response = model.generate_content(contents, **options)
+        self._record_usage(response)
+        self._check_finished(response, config)
+        return response.text
+
+    @staticmethod
+    def _check_finished(response, config):
+        """
+        Raise for an answer cut off at max_output_tokens.
+
+        Thinking tokens count against the cap, so a cut-off answer is
+        partial JSON or has no text at all.
+        """
+        try:
+            candidates = list(response.candidates)
+        except (AttributeError, TypeError):
+            return
+        for candidate in candidates:
+            reason = getattr(candidate, 'finish_reason', None)
+            if getattr(reason, 'name', reason) == 'MAX_TOKENS':
+                metrics.incr('model.truncated')
+                limit = (config or {}).get('max_output_tokens')
+                raise Exception(f"AI response was cut off at the output token limit ({limit})")
+
+    @staticmethod
+    def _accepts_request_options(model):
+        """
+        Return whether the SDK's generate_content takes a per-call timeout.
+
+        Older SDKs (0.3.x) forward unknown keyword arguments into the request
+        proto, which rejects them; there the caller's Deadline still bounds
+        the wait.
+        """
+        try:
+            return 'request_options' in inspect.signature(model.generate_content).parameters
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _record_usage(response):
+        """Count the tokens Gemini reports for a response."""
+        usage = getattr(response, 'usage_metadata', None)
+        for field, counter in (('prompt_token_count', 'model.input_tokens'),
+                               ('candidates_token_count', 'model.output_tokens')):
+            count = getattr(usage, field, None)
+            if isinstance(count, int):
+                metrics.incr(counter, count)
+
+
+class LocalProvider(ModelProvider):
+    """Locally hosted model served through an Ollama-compatible HTTP API."""
+
+    name = 'local'
+
+    def __init__(self, base_url='http://localhost:11434', model_name='llama3.1', timeout=120):
+        self.base_url = base_url.rstrip('/')
+        self.model_name = model_name
+        self.timeout = timeout
+
+    # Generation settings under their Ollama option names
+    OPTION_NAMES = {'max_output_tokens': 'num_predict', 'temperature': 'temperature', 'stop_sequences': 'stop'}
+
+    def generate(self, template, parts, timeout=None, config=None):
+        import requests
+
+        payload = {
+            'model': self.model_name,
+            'prompt': '\n\n'.join(parts),
+            'format': 'json',
+            'stream': False
+        }
+        if config:
+            payload['options'] = {self.OPTION_NAMES[key]: value for key, value in config.items()}
+        response = requests.post(
+            f"{self.base_url}/api/generate",
+            json=payload,
+            timeout=self.timeout if timeout is None else min(self.timeout, timeout)
+        )
+        response.raise_for_status()
+        body = response.json()
+        if isinstance(body.get('eval_count'), int):
+            metrics.incr('model.output_tokens', body['eval_count'])
+        return body.get('response', '')
+
+
+class FakeProvider(ModelProvider):
+    """
+    Deterministic in-process provider for tests and offline runs.
+
+    Responses come from ``responses`` (a list cycled in order, or a callable
+    taking the prompt parts); by default a fixed, schema-valid analysis is
+    returned, or an array of them for a packed prompt. ``delay`` may be a
+    number of seconds or a callable returning one.
+    """
+
+    name = 'fake'
+
+    DEFAULT_RESPONSE = {
+        "sentiment": "Neutral",
+        "good_news": ["Placeholder highlight"],
+        "bad_news": ["Placeholder concern"],
+        "key_promises": ["Placeholder commitment"],
+        "verdict": "Generated by the fake model provider."
+    }
+
+    BATCH_IDS = re.compile('^' + re.escape(BATCH_MARKER).replace(re.escape('{id}'), '(.+)') + '$', re.MULTILINE)
+
+    def __init__(self, responses=None, delay=0):
+        self.responses = responses
+        self.delay = delay
+        self.calls = []
+        self.configs = []
+        self._lock = threading.Lock()
+
+    def generate(self, template, parts, timeout=None, config=None):
+        with self._lock:
+            call_index = len(self.calls)
+            self.calls.append(parts)
+            self.configs.append(config)
+
+        delay = self.delay(call_index) if callable(self.delay) else self.delay
+        if timeout is not None and delay and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Fake model call timed out")
+        if delay:
+            time.sleep(delay)
+
+        if self.responses is None:
+            document_ids = self.BATCH_IDS.findall(parts[-1])
+            if document_ids:
+                return json.dumps([dict(self.DEFAULT_RESPONSE, document_id=doc_id) for doc_id in document_ids])
+            return json.dumps(self.DEFAULT_RESPONSE)
+        if callable(self.responses):
+            return self.responses(parts)
+        response = self.responses[call_index % len(self.responses)]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class HedgedProvider(ModelProvider):
+    """
+    Wrap a provider with hedged requests for tail latency.
+
+    A call runs inline until enough latency samples exist. After that it runs
+    on a worker thread; if it has not returned after the configured percentile
+    of recent latencies (never less than ``min_delay``), a second request is
+    sent to ``secondary`` (or the primary again) and the first successful
+    response wins. The slower call cannot be interrupted mid-flight, so its
+    result is ignored. At most ``max_hedge_ratio`` of recent requests hedge.
+
+    With ``slots`` (the GuardedProvider in front), the hedge takes an
+    in-flight slot of its own, held until both calls have finished, so
+    backend concurrency stays within the guard's limit; no free slot means
+    no hedge.
+    """
+
+    def __init__(self, primary, secondary=None, percentile=95, max_hedge_ratio=0.1,
+                 min_samples=20, min_delay=1.0, window=200, max_workers=16):
+        self.primary = primary
+        self.secondary = secondary or primary
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_workers = max_workers
+        self._latencies = deque(maxlen=window)
+        self._history = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = None
+        self.slots = None
+
+    @property
+    def name(self):
+        return f"hedged({self.primary.name})"
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='hedged-model'
+                )
+            return self._executor
+
+    def _timed(self, provider, template, parts, timeout=None, config=None):
+        start = time.monotonic()
+        result = provider.generate(template, parts, timeout=timeout, config=config)
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return result
+
+    @staticmethod
+    def _release_when_done(futures, release):
+        """
+        Call release once every future has finished.
+
+        The caller's own slot is given back when generate() returns, while
+        the losing call may still run; holding the hedge's slot until both
+        are done keeps one slot per running backend call.
+        """
+        lock = threading.Lock()
+        pending = [len(futures)]
+
+        def finished(_):
+            with lock:
+                pending[0] -= 1
+                last = pending[0] == 0
+            if last:
+                release()
+
+        for future in futures:
+            future.add_done_callback(finished)
+
+    def hedge_delay(self):
+        """Return the current hedging deadline in seconds, or None if unknown."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1))
+        return max(self.min_delay, ordered[index])
+
+    def _record_request(self, hedged):
+        """Record a request and return whether it may hedge under the cap."""
+        with self._lock:
+            if hedged:
+                hedges = sum(self._history)
+                hedged = hedges + 1 <= self.max_hedge_ratio * (len(self._history) + 1)
+            self._history.append(hedged)
+            return hedged
+
+    def stats(self):
+        """Return current latency and hedging statistics."""
+        with self._lock:
+            requests = len(self._history)
+            hedges = sum(self._history)
+            samples = len(self._latencies)
+        return {
+            'samples': samples,
+            'hedge_delay': self.hedge_delay(),
+            'recent_requests': requests,
+            'recent_hedges': hedges
+        }
+
+    def generate(self, template, parts, timeout=None, config=None):
+        delay = self.hedge_delay()
+        if delay is None or self.max_hedge_ratio <= 0:
+            self._record_request(False)
+            return self._timed(self.primary, template, parts, timeout, config)
+
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        executor = self._get_executor()
+        first = executor.submit(self._timed, self.primary, template, parts, timeout, config)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            self._record_request(False)
+            return first.result()
+        if self.slots is not None and not self.slots.try_acquire_slot():
+            # Every in-flight slot is taken; a hedge would exceed the limit
+            self._record_request(False)
+            metrics.incr('model.hedges_skipped')
+            return first.result()
+        if not self._record_request(True):
+            # Hedge budget exhausted, wait for the original call
+            if self.slots is not None:
+                self.slots.release_slot()
+            return first.result()
+
+        logger.info(f"Model call exceeded {delay:.2f}s, sending hedged request")
+        remaining = None if expires_at is None else max(0.0, expires_at - time.monotonic())
+        second = executor.submit(self._timed, self.secondary, template, parts, remaining, config)
+        if self.slots is not None:
+            self._release_when_done([first, second], self.slots.release_slot)
+
+        pending = {first, second}
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                errors.append(future.exception())
+        raise errors[0]
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive failures, rejects calls for
+    ``reset_timeout`` seconds, then lets a single trial call through
+    (half-open) and closes again if it succeeds.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Current state, accounting for an elapsed reset timeout."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Return whether a call may proceed."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """Give back a half-open trial slot for a call that never ran or was inconclusive."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("Model circuit breaker opened")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class GuardedProvider(ModelProvider):
+    """
+    Wrap a provider with an in-flight limit and a circuit breaker.
+
+    Calls beyond ``max_in_flight`` wait up to ``queue_timeout`` seconds for a
+    slot. Saturation, an open breaker and backend outages all surface as
+    ``ModelUnavailableError`` so the caller can degrade gracefully; other
+    errors propagate unchanged.
+    """
+
+    def __init__(self, provider, max_in_flight=8, queue_timeout=2.0, breaker=None):
+        self.provider = provider
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._in_flight = 0
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.provider.name
+
+    def stats(self):
+        """Return in-flight, queue and breaker state."""
+        with self._lock:
+            in_flight = self._in_flight
+            waiting = self._waiting
+        return {
+            'in_flight': in_flight,
+            'max_in_flight': self.max_in_flight,
+            'waiting': waiting,
+            'circuit': self.breaker.state
+        }
+
+    def try_acquire_slot(self):
+        """Take an in-flight slot without waiting (for hedged calls); returns whether one was free."""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._lock:
+            self._in_flight += 1
+        return True
+
+    def release_slot(self):
+        """Give back a slot taken with try_acquire_slot()."""
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def generate(self, template, parts, timeout=None, config=None):
+        if not self.breaker.allow():
+            raise ModelUnavailableError("AI service is temporarily unavailable")
+
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        queue_timeout = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+        with self._lock:
+            self._waiting += 1
+        acquired = self._slots.acquire(timeout=queue_timeout)
+        with self._lock:
+            self._waiting -= 1
+            if acquired:
+                self._in_flight += 1
+        if not acquired:
+            # This call never reached the backend, so it can't be the trial
+            self.breaker.release_trial()
+            raise ModelUnavailableError("AI service is at capacity")
+
+        if expires_at is not None:
+            timeout = max(0.0, expires_at - time.monotonic())
+        try:
+            result = self.provider.generate(template, parts, timeout=timeout, config=config)
+        except Exception as e:
+            if expires_at is not None and time.monotonic() >= expires_at and is_unavailable_error(e):
+                # Cut short by the caller's deadline, which says nothing
+                # about the backend's health
+                self.breaker.release_trial()
+                raise TimeoutError("Model call exceeded the request deadline") from e
+            if is_unavailable_error(e):
+                self.breaker.record_failure()
+                raise ModelUnavailableError(f"AI service unavailable: {str(e)}") from e
+            # The backend answered, the request itself was bad
+            self.breaker.record_success()
+            raise
+        else:
+            self.breaker.record_success()
+            return result
+        finally:
+            self.release_slot()
+
+
+def create_provider(name=None):
+    """
+    Build the model provider configured through the environment.
+
+    Args:
+        name (str): Provider name ("gemini", "local" or "fake"), defaults to
+            the MODEL_PROVIDER environment variable
+
+    Returns:
+        GuardedProvider: The configured provider behind an in-flight limit and
+            circuit breaker, hedged unless HEDGE_MAX_RATIO is 0
+
+    Raises:
+        ValueError: If the provider name is unknown
+    """
+    name = (name or os.getenv('MODEL_PROVIDER', 'gemini')).lower()
+    if name == 'gemini':
+        provider = GeminiProvider(
+            model_name=os.getenv('GEMINI_MODEL', 'gemini-2.5-pro'),
+            prefix_cache_ttl=int(os.getenv('PROMPT_CACHE_TTL_SECONDS', '3600'))
+        )
+    elif name == 'local':
+        provider = LocalProvider(
+            base_url=os.getenv('LOCAL_MODEL_URL', 'http://localhost:11434'),
+            model_name=os.getenv('LOCAL_MODEL_NAME', 'llama3.1'),
+            timeout=float(os.getenv('LOCAL_MODEL_TIMEOUT', '120'))
+        )
+    elif name == 'fake':
+        provider = FakeProvider()
+    else:
+        raise ValueError(f"Unknown model provider: {name}")
+
+    max_hedge_ratio = float(os.getenv('HEDGE_MAX_RATIO', '0.1'))
+    if max_hedge_ratio > 0:
+        provider = HedgedProvider(
+            provider,
+            percentile=float(os.getenv('HEDGE_PERCENTILE', '95')),
+            max_hedge_ratio=max_hedge_ratio,
+            min_samples=int(os.getenv('HEDGE_MIN_SAMPLES', '20')),
+            min_delay=float(os.getenv('HEDGE_MIN_DELAY_SECONDS', '1.0'))
+        )
+
+    guarded = GuardedProvider(
+        provider,
+        max_in_flight=int(os.getenv('MAX_INFLIGHT_LLM_CALLS', '8')),
+        queue_timeout=float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', '2.0')),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5')),
+            reset_timeout=float(os.getenv('CIRCUIT_RESET_SECONDS', '30'))
+        )
+    )
+    if isinstance(provider, HedgedProvider):
+        # Hedges count against MAX_INFLIGHT_LLM_CALLS too
+        provider.slots = guarded
+    return guarded
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Bulk re-analysis of stored transcripts with a new prompt or model.
+
+After a prompt template is bumped or the model changes, every stored brief
+can be regenerated with this tool. Transcripts are streamed from the page
+archive (replayed through the normal extraction) or from a JSONL file of
+{"id": ..., "text": ...} lines. Only a bounded number of documents is in
+flight at a time, so memory does not grow with the corpus.
+
+Results are appended to
+``<output dir>/<prompt>@<version>-<mode>-<input mode>-<provider>[-<model>].jsonl``,
+one line per document tagged with that version. The file is also the
+checkpoint: rerunning the same command after a crash or Ctrl-C skips the
+documents already in it, while a different model or input mode starts a
+file of its own. Model calls go through the app's provider, so
+MAX_INFLIGHT_LLM_CALLS and the circuit breaker apply; calls turned away as
+unavailable are retried with backoff. Short transcripts are packed several
+to a model call (PACK_MAX_TOKENS, PACK_MAX_DOCUMENTS), which saves the
+fixed prompt overhead and round trip of each.
+
+Usage:
+
+    python reanalyze.py --archive ./archive --prompt earnings_call --workers 8
+    MODEL_PROVIDER=fake python reanalyze.py --input transcripts.jsonl
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prompts import estimate_tokens
+
+
+def backend_provider(provider):
+    """Unwrap hedging, guard and metering wrappers down to the model backend."""
+    while True:
+        inner = getattr(provider, 'primary', None) or getattr(provider, 'provider', None)
+        if inner is None:
+            return provider
+        provider = inner
+
+
+def run_tag(template, mode, compact, provider):
+    """
+    Version tag of a run: what the results depend on, and nothing else.
+
+    Wrappers (hedging, circuit breaker) do not change results and are left
+    out, so toggling them keeps the checkpoint.
+
+    Args:
+        template (PromptTemplate): Prompt template
+        mode (ResponseMode): Response mode
+        compact (bool): Condensed rather than full transcripts
+        provider (ModelProvider): Provider, possibly wrapped
+
+    Returns:
+        str: e.g. "earnings_call@2-detailed-full-gemini-gemini-2.5-pro"
+    """
+    backend = backend_provider(provider)
+    parts = [template.id, mode.name, 'compact' if compact else 'full', backend.name]
+    model_name = getattr(backend, 'model_name', None)
+    if model_name:
+        # Model names may contain "/" or ":" (e.g. llama3.1:8b)
+        parts.append(re.sub(r'[^\w.@-]+', '_', model_name))
+    return '-'.join(parts)
+
+
+class MeteredProvider:
+    """Wrap a model provider to count the (estimated) tokens sent and received."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def generate(self, template, parts, timeout=None, config=None):
+        result = self.provider.generate(template, parts, timeout=timeout, config=config)
+        input_tokens = sum(estimate_tokens(part) for part in parts)
+        output_tokens = estimate_tokens(result or '')
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+        previous = getattr(self._local, 'usage', (0, 0))
+        self._local.usage = (previous[0] + input_tokens, previous[1] + output_tokens)
+        return result
+
+    def take_usage(self):
+        """Return and clear (input, output) tokens of this thread's calls since the last take."""
+        usage = getattr(self._local, 'usage', (0, 0))
+        self._local.usage = (0, 0)
+        return usage
+
+
+class ResultLog:
+    """Append-only JSONL of results for one version; doubles as the checkpoint."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Results file, created if missing; documents with a
+                result in it are skipped
+        """
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        valid_bytes = 0
+        with open(self.path, 'rb') as handle:
+            for line in handle:
+                if not line.endswith(b'\n'):
+                    # Torn last line from a crash; that document is redone
+                    break
+                valid_bytes += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'result' in record:
+                    self.done.add(record['id'])
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as handle:
+                handle.truncate(valid_bytes)
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if 'result' in record:
+                self.done.add(record['id'])
+
+    def close(self):
+        self._file.close()
+
+
+class Progress:
+    """Counts, throughput, ETA and token spend of a run."""
+
+    def __init__(self, total=None, meter=None):
+        self.total = total
+        self.meter = meter
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    @property
+    def finished(self):
+        return self.done + self.skipped + self.failed
+
+    def rate(self):
+        """Documents analyzed per second (skipped ones excluded)."""
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def line(self):
+        rate = self.rate()
+        if self.total is None:
+            line = f"{self.finished} docs"
+        else:
+            eta = (self.total - self.finished) / rate if rate > 0 else None
+            line = (f"{self.finished}/{self.total} docs ({self.finished / max(self.total, 1):.1%}), "
+                    f"ETA {_format_seconds(eta)}")
+        line += f", {rate:.1f} docs/s, {self.skipped} already done, {self.failed} failed"
+        if self.meter is not None:
+            line += (f", ~{_format_count(self.meter.input_tokens)} tokens in / "
+                     f"~{_format_count(self.meter.output_tokens)} out")
+        return line
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return '?'
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _format_count(count):
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M"
+    if count >= 1000:
+        return f"{count / 1000:.1f}k"
+    return str(count)
+
+
+def jsonl_documents(path):
+    """
+    Stream (id, load) pairs from a JSONL file of {"id", "text"} objects.
+
+    Lines without an "id" are numbered by their line number.
+    """
+    with open(path, encoding='utf-8') as handle:
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record['text']
+            yield str(record.get('id', number)), (lambda text=text: text)
+
+
+def archive_documents(archive, scrape):
+    """
+    Stream (id, load) pairs for every transcript URL in a page archive.
+
+    Following pages of paginated transcripts are stitched on by ``scrape``
+    rather than analyzed on their own. Bodies are only read when a worker
+    calls ``load``.
+    """
+    for record in archive.records(entries_only=True):
+        yield record.url, (lambda url=record.url: scrape(url, replay=True))
+
+
+def run(documents, analyze, log, version, workers=4, batch_size=1, progress=None, retries=3,
+        retry_delay=1.0, report_every=5.0, report=None, meter=None):
+    """
+    Analyze documents concurrently, appending each result to the log.
+
+    Args:
+        documents (iterable): (id, load) pairs; ``load()`` returns the text
+        analyze (callable): List of (id, text) -> {id: analysis dict or the
+            Exception it failed with}
+        log (ResultLog): Output and checkpoint; ids already in it are skipped
+        version (str): Tag written with every result
+        workers (int): Batches analyzed at once
+        batch_size (int): Documents handed to ``analyze`` together, so short
+            ones can share a model call
+        progress (Progress): Progress to update, created if None
+        retries (int): Retries of a batch turned away by an unavailable model
+        retry_delay (float): First backoff in seconds, doubled on each retry
+        report_every (float): Seconds between progress reports
+        report (callable): Receives progress lines, defaults to stderr
+        meter (MeteredProvider): Source of token counts, split evenly over
+            the documents of a batch
+
+    Returns:
+        Progress: Final counts
+    """
+    from providers import ModelUnavailableError
+
+    progress = progress or Progress()
+    report = report or (lambda line: print(line, file=sys.stderr, flush=True))
+
+    def failure(doc_id, error):
+        return {'id': doc_id, 'version': version, 'error': str(error)}
+
+    def process(batch):
+        texts, records = [], []
+        for doc_id, load in batch:
+            try:
+                texts.append((doc_id, load()))
+            except Exception as e:
+                records.append(failure(doc_id, e))
+        results = {}
+        for attempt in range(retries + 1):
+            try:
+                results = analyze(texts) if texts else {}
+                break
+            except ModelUnavailableError:
+                if attempt == retries:
+                    raise
+                time.sleep(retry_delay * 2 ** attempt)
+        tokens = None
+        if meter is not None and texts:
+            input_tokens, output_tokens = meter.take_usage()
+            tokens = {'input': input_tokens // len(texts), 'output': output_tokens // len(texts)}
+        for doc_id, _ in texts:
+            result = results.get(doc_id)
+            if not isinstance(result, dict):
+                records.append(failure(doc_id, result or "No analysis returned"))
+                continue
+            record = {'id': doc_id, 'version': version, 'result': result}
+            if tokens is not None:
+                record['tokens'] = tokens
+            records.append(record)
+        return records
+
+    pending = {}
+    last_report = time.monotonic()
+
+    def collect(futures):
+        for future in futures:
+            doc_ids = pending.pop(future)
+            try:
+                records = future.result()
+            except Exception as e:
+                records = [failure(doc_id, e) for doc_id in doc_ids]
+            for record in records:
+                log.write(record)
+                if 'result' in record:
+                    progress.done += 1
+                else:
+                    progress.failed += 1
+
+    def submit(batch):
+        while len(pending) >= 2 * workers:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished)
+        pending[pool.submit(process, batch)] = [doc_id for doc_id, _ in batch]
+
+    # At most two batches per worker are in flight, so the source is pulled
+    # only as fast as the model keeps up
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reanalyze') as pool:
+        batch = []
+        for doc_id, load in documents:
+            if doc_id in log.done:
+                progress.skipped += 1
+                continue
+            batch.append((doc_id, load))
+            if len(batch) >= batch_size:
+                submit(batch)
+                batch = []
+            if time.monotonic() - last_report >= report_every:
+                report(progress.line())
+                last_report = time.monotonic()
+        if batch:
+            submit(batch)
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished)
+
+    report(progress.line())
+    return progress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-analyze stored transcripts with a new prompt or model.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--archive', default=os.getenv('PAGE_ARCHIVE_DIR', ''),
+                        help="page archive to replay (default: PAGE_ARCHIVE_DIR)")
+    source.add_argument('--input', help='JSONL file of {"id": ..., "text": ...} lines')
+    parser.add_argument('--output', default='reanalysis', help="directory for versioned result files")
+    parser.add_argument('--prompt', help="prompt template name (default: the app default)")
+    parser.add_argument('--prompt-version', help="prompt template version (default: latest)")
+    parser.add_argument('--provider', help="model provider (default: MODEL_PROVIDER)")
+    parser.add_argument('--compact', action='store_true', help="send condensed transcripts")
+    parser.add_argument('--mode', choices=['brief', 'detailed'], help="response mode (default: RESPONSE_MODE)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="documents analyzed at once (capped by MAX_INFLIGHT_LLM_CALLS)")
+    parser.add_argument('--pack', type=int,
+                        help="documents per batch; short ones share a model call up to PACK_MAX_TOKENS "
+                             "(default: PACK_MAX_DOCUMENTS, 1 disables packing)")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--report-every', type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument('--verbose', action='store_true', help="log every scrape and model call")
+    args = parser.parse_args(argv)
+
+    if args.provider:
+        os.environ['MODEL_PROVIDER'] = args.provider
+    import app
+    from archive import PageArchive
+    if not args.verbose:
+        # The app logs each request at INFO; keep the progress lines readable
+        logging.getLogger().setLevel(logging.WARNING)
+
+    template = app.prompt_registry.get(args.prompt, args.prompt_version)
+    mode = app.RESPONSE_MODES[args.mode or app.DEFAULT_RESPONSE_MODE]
+    meter = MeteredProvider(app.model_provider)
+    app.model_provider = meter
+    workers = max(1, min(args.workers, getattr(meter.provider, 'max_in_flight', args.workers)))
+
+    if args.input:
+        documents = jsonl_documents(args.input)
+        with open(args.input, encoding='utf-8') as handle:
+            total = sum(1 for line in handle if line.strip())
+    elif args.archive:
+        app.page_archive = PageArchive(args.archive)
+        documents = archive_documents(app.page_archive, app.scrape_text_from_url)
+        total = sum(1 for _ in app.page_archive.records(entries_only=True))
+    else:
+        parser.error("give --input or --archive (or set PAGE_ARCHIVE_DIR)")
+
+    version = run_tag(template, mode, args.compact, meter)
+    os.makedirs(args.output, exist_ok=True)
+    log = ResultLog(os.path.join(args.output, f"{version}.jsonl"))
+    print(f"Re-analyzing {total} documents as {version} with {workers} workers -> {log.path}",
+          file=sys.stderr)
+    try:
+        progress = run(
+            documents,
+            lambda texts: app.analyze_texts_with_ai(texts, template, compact=args.compact, mode=mode),
+            log, version, workers=workers, batch_size=max(1, args.pack or app.PACK_MAX_DOCUMENTS),
+            progress=Progress(total, meter),
+            retries=args.retries, report_every=args.report_every, meter=meter
+        )
+    finally:
+        log.close()
+    return 1 if progress.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Consistent-hash routing of transcript URLs across QuickBrief nodes.
+
+When several nodes sit behind a load balancer, requests for the same
+transcript land on random nodes and per-node caches and single-flight
+deduplication rarely help. Each node therefore hashes the normalized URL
+onto a ring of all nodes (with virtual nodes for an even spread) and
+forwards the request to the owner when it is not the owner itself.
+
+Nodes that fail a forward or a periodic /healthz probe are marked down and
+skipped on the ring, so only their keys move to the next node; they take
+their keys back once healthy again.
+"""
+
+import os
+import time
+import bisect
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from metrics import metrics
+from lazy import lazy_import
+
+requests = lazy_import('requests')
+
+logger = logging.getLogger(__name__)
+
+# Marks a request that was already forwarded once, so it is never bounced again
+FORWARDED_HEADER = 'X-QuickBrief-Forwarded'
+# Names the node that served a response
+NODE_HEADER = 'X-QuickBrief-Node'
+
+# Query parameters that do not change which transcript a URL points to
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+
+def normalize_url(url):
+    """
+    Canonical form of a transcript URL for routing and cache keys.
+
+    Lowercases the scheme and host, drops default ports, fragments, tracking
+    parameters and a trailing slash, and sorts the query.
+
+    Args:
+        url (str): Transcript URL
+
+    Returns:
+        str: Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip('/') or '/'
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def _hash(value):
+    # Stable across processes and hosts, unlike hash()
+    return int.from_bytes(hashlib.md5(value.encode('utf-8'), usedforsecurity=False).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes and per-node health."""
+
+    def __init__(self, nodes, vnodes=128):
+        """
+        Args:
+            nodes (list): Node base URLs, e.g. "http://10.0.0.5:5001"
+            vnodes (int): Ring positions per node
+        """
+        self.nodes = list(dict.fromkeys(node.rstrip('/') for node in nodes))
+        self.vnodes = vnodes
+        ring = sorted((_hash(f"{node}#{index}"), node) for node in self.nodes for index in range(vnodes))
+        self._points = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+        self._down = set()
+        self._lock = threading.Lock()
+
+    def owner(self, key):
+        """
+        Return the first healthy node clockwise from the key's position.
+
+        Returns:
+            str: Node URL, or None if every node is down
+        """
+        with self._lock:
+            down = set(self._down)
+        if not self._points or len(down) >= len(self.nodes):
+            return None
+        start = bisect.bisect(self._points, _hash(key))
+        for offset in range(len(self._points)):
+            node = self._owners[(start + offset) % len(self._points)]
+            if node not in down:
+                return node
+        return None
+
+    def mark_down(self, node):
+        with self._lock:
+            if node not in self._down:
+                logger.warning(f"Routing: marking {node} down")
+            self._down.add(node)
+
+    def mark_up(self, node):
+        with self._lock:
+            if node in self._down:
+                logger.info(f"Routing: {node} is healthy again")
+            self._down.discard(node)
+
+    def healthy_nodes(self):
+        with self._lock:
+            return [node for node in self.nodes if node not in self._down]
+
+
+class Router:
+    """Route transcript URLs to their owner node and forward requests there."""
+
+    def __init__(self, self_url, nodes, vnodes=128, health_interval=5.0, timeout=120.0):
+        """
+        Args:
+            self_url (str): This node's base URL as it appears in ``nodes``
+            nodes (list): Base URLs of every node, this one included
+            vnodes (int): Ring positions per node
+            health_interval (float): Seconds between /healthz probes of the
+                other nodes (0 disables probing; failed forwards still mark
+                nodes down)
+            timeout (float): Longest forward, in seconds
+        """
+        self.self_url = self_url.rstrip('/')
+        self.ring = HashRing(nodes, vnodes=vnodes)
+        if self.self_url not in self.ring.nodes:
+            raise ValueError(f"This node ({self.self_url}) is not in the cluster node list")
+        self.health_interval = health_interval
+        self.timeout = timeout
+        self._checker = None
+        self._checker_lock = threading.Lock()
+
+    def owner(self, url):
+        """Return the node that should handle a transcript URL (this node if all others are down)."""
+        self._start_health_checks()
+        return self.ring.owner(normalize_url(url)) or self.self_url
+
+    def is_local(self, node):
+        return node == self.self_url
+
+    def forward(self, node, path, payload, timeout=None):
+        """
+        Send a JSON request to another node.
+
+        Args:
+            node (str): Owner node URL
+            path (str): Endpoint path, e.g. "/analyze"
+            payload (dict): JSON body
+            timeout (float): Seconds to wait, defaults to the router's timeout
+
+        Returns:
+            tuple: (status code, JSON body) from the owner, or None if it could
+                not be connected to (it is marked down and the caller should
+                handle the request itself). An owner that accepted the request
+                but did not answer in time, or answered with something other
+                than JSON, is not marked down and the request is not run again
+                here; the client gets a 504 or 502.
+        """
+        timeout = self.timeout if timeout is None else min(self.timeout, timeout)
+        headers = {FORWARDED_HEADER: self.self_url, 'X-Request-Timeout': str(timeout)}
+        try:
+            with metrics.timer('routing.forward'):
+                response = requests.post(f"{node}{path}", json=payload, headers=headers, timeout=timeout)
+            body = response.json()
+        except requests.exceptions.ConnectionError as e:
+            # Also covers ConnectTimeout; nothing reached the owner
+            logger.warning(f"Routing: could not connect to {node}: {str(e)}")
+            metrics.incr('routing.forward_failures')
+            self.ring.mark_down(node)
+            return None
+        except requests.exceptions.Timeout as e:
+            # The owner is working on it; running it here too would double the model spend
+            logger.warning(f"Routing: {node} did not answer in time: {str(e)}")
+            metrics.incr('routing.forward_timeouts')
+            return 504, {'error': 'The request did not finish within the time limit'}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning(f"Routing: invalid response from {node}: {str(e)}")
+            metrics.incr('routing.forward_errors')
+            return 502, {'error': 'Invalid response from the cluster node handling this URL'}
+        metrics.incr('routing.forwarded')
+        return response.status_code, body
+
+    def check_health(self):
+        """Probe every other node's /healthz once and update the ring."""
+        for node in self.ring.nodes:
+            if self.is_local(node):
+                continue
+            try:
+                healthy = requests.get(f"{node}/healthz", timeout=2).status_code == 200
+            except requests.exceptions.RequestException:
+                healthy = False
+            if healthy:
+                self.ring.mark_up(node)
+            else:
+                self.ring.mark_down(node)
+
+    def _start_health_checks(self):
+        if self.health_interval <= 0 or self._checker is not None:
+            return
+        with self._checker_lock:
+            if self._checker is None:
+                self._checker = threading.Thread(target=self._health_loop, name='cluster-health', daemon=True)
+                self._checker.start()
+
+    def _health_loop(self):
+        while True:
+            time.sleep(self.health_interval)
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"Routing: health check failed: {str(e)}")
+
+
+def create_router():
+    """
+    Build the router configured through the environment.
+
+    CLUSTER_NODES lists every node's base URL (comma-separated) and
+    CLUSTER_SELF names this node's entry.
+
+    Returns:
+        Router: The router, or None when no cluster is configured
+    """
+    nodes = [node.strip() for node in os.getenv('CLUSTER_NODES', '').split(',') if node.strip()]
+    if len(nodes) < 2:
+        return None
+    return Router(
+        os.getenv('CLUSTER_SELF', ''),
+        nodes,
+        vnodes=int(os.getenv('CLUSTER_VNODES', '128')),
+        health_interval=float(os.getenv('CLUSTER_HEALTH_INTERVAL', '5')),
+    )
@@ -32,7 +32,29 @@ def main():
         ("test_workflow.py", "Basic Workflow Tests"),
         ("test_real_workflow.py", "Realistic Workflow Tests"),
         ("test_error_scenarios.py", "Error Handling Tests"),
-        ("test_core_functions.py", "Automated Core Function Tests")
+        ("test_core_functions.py", "Automated Core Function Tests"),
+        ("test_incremental.py", "Incremental Re-analysis Tests"),
+        ("test_extraction.py", "Text Extraction Tests"),
+        ("test_prompts.py", "Prompt Template Tests"),
+        ("test_providers.py", "Model Provider Tests"),
+        ("test_fallback.py", "Degraded Mode Tests"),
+        ("test_preextract.py", "Pre-extraction Tests"),
+        ("test_documents.py", "Document Ingestion Tests"),
+        ("test_text_input.py", "Direct Text Input Tests"),
+        ("test_pagination.py", "Pagination Tests"),
+        ("test_embedded.py", "Embedded Data Tests"),
+        ("test_domain_rules.py", "Domain Rule Tests"),
+        ("test_transcript.py", "Transcript Model Tests"),
+        ("test_lazy.py", "Lazy Import Tests"),
+        ("test_deadline.py", "Deadline Tests"),
+        ("test_parsing.py", "Parse Pool Tests"),
+        ("test_cache.py", "Cache Backend Tests"),
+        ("test_routing.py", "Routing Tests"),
+        ("test_archive.py", "Page Archive Tests"),
+        ("test_reanalyze.py", "Bulk Re-analysis Tests"),
+        ("test_httpcache.py", "HTTP Caching Tests"),
+        ("test_health.py", "Health Probe Tests"),
+        ("test_prefetch.py", "Prefetch Tests")
     ]
     
     results = []
@@ -0,0 +1,86 @@
+"""
+Duplicate-call suppression for concurrent identical work.
+"""
+
+import time
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Set once a caller has taken the result, so it is not kept as well
+        self.taken = False
+
+
+class SingleFlight:
+    """
+    Share one execution among concurrent callers with the same key.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait and receive the same result or exception. Nothing
+    is cached once the call completes, unless it was started with ``keep``:
+    a successful result nobody took yet is then held for that many seconds
+    and handed to the first caller that asks to ``take`` it (e.g. the
+    analysis following a speculative prefetch), then dropped.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._kept = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, keep=0, take=False):
+        """
+        Run func for key, or wait for an identical call already in flight.
+
+        Args:
+            key: Identifies identical calls
+            func (callable): The work, called without arguments
+            keep (float): Seconds to hold a successful result for one later
+                taker (if this caller runs the function)
+            take (bool): Use up a held result, or claim the result of the
+                call in flight so it is not held for anyone else
+
+        Returns:
+            The function's result
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        with self._lock:
+            self._drop_expired()
+            if take and key in self._kept:
+                return self._kept.pop(key)[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            if take:
+                call.taken = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                    if keep > 0 and call.error is None and not call.taken:
+                        self._kept[key] = (time.monotonic() + keep, call.result)
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _drop_expired(self):
+        now = time.monotonic()
+        expired = [key for key, (expires, _) in self._kept.items() if expires <= now]
+        for key in expired:
+            del self._kept[key]
@@ -19,8 +19,22 @@ class QuickBriefAI {
         this.badNewsList = document.getElementById('badNewsList');
         this.promisesList = document.getElementById('promisesList');
         this.verdictText = document.getElementById('verdictText');
+        this.degradedNotice = document.getElementById('degradedNotice');
+        this.degradedMessage = document.getElementById('degradedMessage');
         
         this.isAnalyzing = false;
+        this.currentUrl = null;
+        
+        // Speculative prefetch of the pasted/typed URL
+        this.prefetchDelay = 400;
+        this.prefetchTimer = null;
+        this.prefetchedUrl = null;
+        this.pasted = false;
+        
+        // Recent results by URL, always revalidated with their ETag
+        // (If-None-Match) so live transcripts are re-analyzed
+        this.resultCache = new Map();
+        this.resultCacheSize = 20;
         this.loadingMessages = [
             'Extracting content from URL...',
             'Processing transcript text...',
@@ -36,6 +50,7 @@ class QuickBriefAI {
         // Bind event listeners
         this.form.addEventListener('submit', this.handleFormSubmit.bind(this));
         this.urlInput.addEventListener('input', this.handleInputChange.bind(this));
+        this.urlInput.addEventListener('paste', () => { this.pasted = true; });
         
         // Initial state
         this.hideAllContainers();
@@ -63,6 +78,39 @@ class QuickBriefAI {
         if (!this.errorContainer.classList.contains('d-none')) {
             this.hideError();
         }
+        
+        // A pasted URL is complete, a typed one may not be yet
+        this.schedulePrefetch(this.pasted ? 0 : this.prefetchDelay);
+        this.pasted = false;
+    }
+    
+    schedulePrefetch(delay) {
+        // Debounced: only the URL the user settles on is prefetched
+        clearTimeout(this.prefetchTimer);
+        this.prefetchTimer = setTimeout(() => this.prefetch(), delay);
+    }
+    
+    async prefetch() {
+        const url = this.urlInput.value.trim();
+        if (this.isAnalyzing || url === this.prefetchedUrl || !this.validateUrl(url)) {
+            return;
+        }
+        this.prefetchedUrl = url;
+        
+        try {
+            // Starts the scrape on the server so /analyze finds it ready;
+            // no AI analysis is run
+            await fetch('/prefetch', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ url: url })
+            });
+        } catch (error) {
+            // Prefetching is best effort, the analysis fetches the page itself
+            console.log('Prefetch unavailable:', error);
+        }
     }
     
     validateUrl(url) {
@@ -79,26 +127,50 @@ class QuickBriefAI {
     }
     
     async startAnalysis(url) {
+        clearTimeout(this.prefetchTimer);
+        this.currentUrl = url;
+        
+        const cached = this.resultCache.get(url);
+        
         this.isAnalyzing = true;
         this.hideAllContainers();
         this.setLoadingState(true);
         this.startLoadingAnimation();
         
+        // Show an instant local summary while the full AI analysis runs
+        this.requestPreview(url);
+        
         try {
+            const headers = {
+                'Content-Type': 'application/json',
+            };
+            if (cached) {
+                headers['If-None-Match'] = cached.etag;
+            }
             const response = await fetch('/analyze', {
                 method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
+                headers: headers,
                 body: JSON.stringify({ url: url })
             });
             
+            if (response.status === 304 && cached) {
+                // Unchanged since last time; no body was sent
+                this.cacheResult(url, cached.etag, cached.data);
+                this.displayResults(cached.data);
+                return;
+            }
+            
             const data = await response.json();
             
             if (!response.ok) {
                 throw new Error(data.error || `HTTP error! status: ${response.status}`);
             }
             
+            // Degraded summaries are not kept so the next click retries the AI
+            const etag = response.headers.get('ETag');
+            if (etag && !data.degraded) {
+                this.cacheResult(url, etag, data);
+            }
             this.displayResults(data);
             
         } catch (error) {
@@ -110,6 +182,41 @@ class QuickBriefAI {
         }
     }
     
+    cacheResult(url, etag, data) {
+        // Map keeps insertion order: re-inserting marks the entry most recent
+        this.resultCache.delete(url);
+        this.resultCache.set(url, { etag: etag, data: data });
+        if (this.resultCache.size > this.resultCacheSize) {
+            this.resultCache.delete(this.resultCache.keys().next().value);
+        }
+    }
+    
+    async requestPreview(url) {
+        try {
+            const response = await fetch('/preview', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ url: url })
+            });
+            
+            if (!response.ok) {
+                return;
+            }
+            
+            const data = await response.json();
+            
+            // Only show the preview if the full analysis hasn't finished yet
+            if (this.isAnalyzing && this.currentUrl === url) {
+                this.displayResults(data, true);
+            }
+        } catch (error) {
+            // Previews are best effort, the full analysis reports errors
+            console.log('Preview unavailable:', error);
+        }
+    }
+    
     setLoadingState(loading) {
         if (loading) {
             this.analyzeBtn.disabled = true;
@@ -141,9 +248,26 @@ class QuickBriefAI {
         updateMessage();
     }
     
-    displayResults(data) {
+    displayResults(data, isPreview = false) {
+        const wasShowingResults = !this.resultsContainer.classList.contains('d-none');
         this.hideAllContainers();
         
+        // Keep the loading indicator visible under a preview
+        if (isPreview) {
+            this.loadingIndicator.classList.remove('d-none');
+        }
+        
+        // Flag previews and degraded (non-AI) summaries
+        if (isPreview) {
+            this.degradedMessage.textContent = 'Instant preview from a quick local summary. The full AI analysis is still running...';
+            this.degradedNotice.classList.remove('d-none');
+        } else if (data.degraded) {
+            this.degradedMessage.textContent = 'The AI service is currently unavailable. Showing an automated extractive summary instead.';
+            this.degradedNotice.classList.remove('d-none');
+        } else {
+            this.degradedNotice.classList.add('d-none');
+        }
+        
         // Display sentiment
         this.sentimentValue.textContent = data.sentiment || 'N/A';
         this.setSentimentColor(data.sentiment);
@@ -164,6 +288,11 @@ class QuickBriefAI {
         this.resultsContainer.classList.remove('d-none');
         this.resultsContainer.classList.add('slide-in');
         
+        // Don't move the page again when the full analysis replaces a preview
+        if (wasShowingResults) {
+            return;
+        }
+        
         // Scroll to results
         this.resultsContainer.scrollIntoView({ 
             behavior: 'smooth', 
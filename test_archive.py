@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Automated tests for the raw page archive and replaying scrapes from it.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BASE = "https://transcripts.example.com/acme-q3-call"
+
+
+def page_html(number, total=3):
+    """Build one page of a paginated transcript."""
+    body = f"<p>Part {number}: " + f"Revenue discussion for section {number} continues here. " * 4 + "</p>"
+    pager = f'<div class="pager">Page {number} of {total} '
+    if number < total:
+        pager += f'<a rel="next" href="{BASE}?page={number + 1}">Next</a>'
+    return f"<html><body>{body}{pager}</div></body></html>"
+
+
+class ArchiveTestCase(unittest.TestCase):
+    """Gives each test an empty archive directory."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='quickbrief-archive-')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def blob_files(self):
+        return [name for _, _, names in os.walk(os.path.join(self.root, 'blobs')) for name in names]
+
+
+class TestPageArchive(ArchiveTestCase):
+    """Test cases for storing, looking up and replaying bodies."""
+
+    def test_round_trip_and_dedupe(self):
+        """Test that bodies round-trip and identical bodies are stored once."""
+        from archive import PageArchive
+        archive = PageArchive(self.root, compression='gzip')
+        body = b"<html><body>" + b"Same syndicated transcript. " * 200 + b"</body></html>"
+        first = archive.put('https://a.example.com/call', body, 'text/html')
+        second = archive.put('https://b.example.com/call', body, 'text/html')
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.blob_files()), 1)
+        self.assertEqual(len(archive), 2)
+        self.assertEqual(archive.load('https://b.example.com/call'), (body, 'text/html'))
+        # Compressed on disk
+        path = os.path.join(self.root, 'blobs', first[:2], f"{first}.gz")
+        self.assertLess(os.path.getsize(path), len(body) // 4)
+
+    def test_latest_fetch_wins(self):
+        """Test that a URL loads its most recent body and unknown URLs raise KeyError."""
+        from archive import PageArchive
+        archive = PageArchive(self.root, compression='gzip')
+        archive.put(BASE, b"first version", 'text/html')
+        archive.put(BASE, b"second version", 'text/plain')
+        self.assertEqual(archive.load(BASE), (b"second version", 'text/plain'))
+        self.assertEqual(len(archive), 1)
+        with self.assertRaises(KeyError):
+            archive.load('https://never.example.com/')
+
+    def test_replay_in_blob_order(self):
+        """Test that replay yields every URL once, ordered by digest, optionally filtered."""
+        from archive import PageArchive
+        archive = PageArchive(self.root, compression='gzip')
+        urls = [f"https://example.com/call/{n}" for n in range(20)]
+        for url in urls:
+            archive.put(url, f"body of {url}".encode(), 'text/html')
+
+        replayed = list(archive.replay())
+        self.assertEqual(sorted(record.url for record, _ in replayed), sorted(urls))
+        digests = [record.sha256 for record, _ in replayed]
+        self.assertEqual(digests, sorted(digests))
+        for record, content in replayed:
+            self.assertEqual(content, f"body of {record.url}".encode())
+        self.assertEqual(sorted(record.url for record, _ in archive.replay(urls[:2])), sorted(urls[:2]))
+
+    def test_streamed_chunks(self):
+        """Test that streamed chunks are archived once read to the end, and discarded otherwise."""
+        from archive import PageArchive, archived_chunks
+        archive = PageArchive(self.root, compression='gzip')
+        chunks = [b"%PDF-1.7 ", b"page one ", b"page two"]
+        self.assertEqual(list(archived_chunks(archive, BASE, 'application/pdf', iter(chunks))), chunks)
+        self.assertEqual(archive.load(BASE), (b"".join(chunks), 'application/pdf'))
+
+        def failing():
+            yield b"partial"
+            raise IOError("connection reset")
+
+        with self.assertRaises(IOError):
+            list(archived_chunks(archive, f"{BASE}/broken", 'application/pdf', failing()))
+        self.assertIsNone(archive.latest(f"{BASE}/broken"))
+        self.assertFalse([name for name in self.blob_files() if name.endswith('.tmp')])
+
+    def test_unknown_compression(self):
+        """Test that an unknown compression setting is rejected."""
+        from archive import PageArchive
+        with self.assertRaises(ValueError):
+            PageArchive(self.root, compression='lz4')
+
+
+class TestScrapeReplay(ArchiveTestCase):
+    """Test cases for archiving scrapes and replaying them without fetching."""
+
+    def mock_pages(self, mock_get, pages):
+        def get(url, **kwargs):
+            response = Mock()
+            response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+            response.content = pages[url].encode('utf-8')
+            response.raise_for_status.return_value = None
+            return response
+        mock_get.side_effect = get
+
+    @patch('requests.get')
+    def test_paginated_scrape_replays_from_archive(self, mock_get):
+        """Test that every page of a scrape is archived and replay does not fetch."""
+        import app
+        from archive import PageArchive
+        pages = {BASE: page_html(1)}
+        pages.update({f"{BASE}?page={n}": page_html(n) for n in (2, 3)})
+        self.mock_pages(mock_get, pages)
+
+        with patch.object(app, 'page_archive', PageArchive(self.root, compression='gzip')):
+            fetched = app.scrape_text_from_url(BASE)
+            self.assertEqual(mock_get.call_count, 3)
+            mock_get.reset_mock()
+            replayed = app.scrape_text_from_url(BASE, replay=True)
+
+        mock_get.assert_not_called()
+        self.assertEqual(str(replayed), str(fetched))
+        self.assertIn("Part 3:", str(replayed))
+
+    @patch('requests.get')
+    def test_replay_without_archived_copy(self, mock_get):
+        """Test that replaying an unarchived URL or without an archive fails cleanly."""
+        import app
+        from archive import PageArchive
+        with patch.object(app, 'page_archive', PageArchive(self.root, compression='gzip')):
+            with self.assertRaises(Exception) as context:
+                app.scrape_text_from_url(BASE, replay=True)
+            self.assertIn("No archived copy", str(context.exception))
+        with patch.object(app, 'page_archive', None):
+            with self.assertRaises(Exception) as context:
+                app.scrape_text_from_url(BASE, replay=True)
+            self.assertIn("not enabled", str(context.exception))
+        mock_get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Automated tests for the cache backends and cross-process locking.
+"""
+
+import fnmatch
+import os
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal in-process Redis-protocol server for tests.
+
+    Supports the commands RedisBackend uses: GET, SET (NX, PX), DEL, SCAN,
+    the compare-and-delete EVAL script, PING, AUTH and SELECT.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RedisHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            entry = None
+        return entry
+
+
+class RedisHandler(socketserver.StreamRequestHandler):
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, value):
+        if value is None:
+            return b'$-1\r\n'
+        if isinstance(value, str):
+            return b'+' + value.encode() + b'\r\n'
+        if isinstance(value, int):
+            return b':%d\r\n' % value
+        if isinstance(value, bytes):
+            return b'$%d\r\n%s\r\n' % (len(value), value)
+        return b'*%d\r\n' % len(value) + b''.join(self.reply(item) for item in value)
+
+    def handle(self):
+        server = self.server
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            name = args[0].upper()
+            with server.lock:
+                if name in (b'PING', b'AUTH', b'SELECT'):
+                    result = 'OK'
+                elif name == b'GET':
+                    entry = server.live(args[1])
+                    result = entry and entry[0]
+                elif name == b'SET':
+                    options = [arg.upper() for arg in args[3:]]
+                    expires = None
+                    if b'PX' in options:
+                        expires = time.monotonic() + int(args[3 + options.index(b'PX') + 1]) / 1000
+                    if b'NX' in options and server.live(args[1]) is not None:
+                        result = None
+                    else:
+                        server.data[args[1]] = (args[2], expires)
+                        result = 'OK'
+                elif name == b'DEL':
+                    result = sum(1 for key in args[1:] if server.data.pop(key, None) is not None)
+                elif name == b'SCAN':
+                    pattern = args[args.index(b'MATCH') + 1].decode()
+                    keys = [key for key in list(server.data) if server.live(key) is not None
+                            and fnmatch.fnmatchcase(key.decode(), pattern)]
+                    result = [b'0', keys]
+                elif name == b'EVAL':
+                    key, token = args[3], args[4]
+                    entry = server.live(key)
+                    result = 1 if entry is not None and entry[0] == token and server.data.pop(key) else 0
+                else:
+                    self.wfile.write(b'-ERR unknown command\r\n')
+                    continue
+            self.wfile.write(self.reply(result))
+
+
+class BackendContract:
+    """Tests every backend must pass; subclasses provide make_backend()."""
+
+    def test_get_set_delete_clear(self):
+        """Test basic storage operations."""
+        backend = self.make_backend()
+        self.assertIsNone(backend.get('missing'))
+        backend.set('a', b'alpha')
+        backend.set('b', b'\x00binary\xff')
+        self.assertEqual(backend.get('a'), b'alpha')
+        self.assertEqual(backend.get('b'), b'\x00binary\xff')
+        self.assertEqual(len(backend), 2)
+        backend.delete('a')
+        self.assertIsNone(backend.get('a'))
+        backend.clear()
+        self.assertEqual(len(backend), 0)
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after their TTL."""
+        backend = self.make_backend()
+        backend.set('short', b'x', ttl=0.05)
+        backend.set('long', b'y', ttl=60)
+        time.sleep(0.1)
+        self.assertIsNone(backend.get('short'))
+        self.assertEqual(backend.get('long'), b'y')
+
+    def test_lock_is_exclusive(self):
+        """Test that a held lock makes other callers wait, then time out."""
+        backend = self.make_backend()
+        with backend.lock('key', timeout=1) as acquired:
+            self.assertTrue(acquired)
+            results = []
+            waiter = threading.Thread(
+                target=lambda: results.append(backend.lock('key', timeout=0.1).__enter__()))
+            waiter.start()
+            waiter.join()
+            self.assertEqual(results, [False])
+        with backend.lock('key', timeout=0.1) as acquired:
+            self.assertTrue(acquired)
+
+    def test_get_or_compute_runs_once(self):
+        """Test that concurrent misses compute the value once."""
+        from cache import Cache
+        cache = Cache(self.make_backend())
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'text': 'scraped'}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('url', compute)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'text': 'scraped'}] * 4)
+
+
+class TestMemoryBackend(BackendContract, unittest.TestCase):
+    """Test cases for the in-process backend."""
+
+    def make_backend(self):
+        from cache import MemoryBackend
+        return MemoryBackend(max_entries=10)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        from cache import MemoryBackend
+        backend = MemoryBackend(max_entries=2)
+        backend.set('a', b'1')
+        backend.set('b', b'2')
+        backend.get('a')
+        backend.set('c', b'3')
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a'), b'1')
+
+
+class TestSQLiteBackend(BackendContract, unittest.TestCase):
+    """Test cases for the shared SQLite backend."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_backend(self, **kwargs):
+        from cache import SQLiteBackend
+        return SQLiteBackend(self.path, table='test', **kwargs)
+
+    def test_wal_mode_and_eviction(self):
+        """Test WAL journaling and the entry limit."""
+        backend = self.make_backend(max_entries=2)
+        self.assertEqual(backend._connect().execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        for key in ('a', 'b', 'c'):
+            backend.set(key, b'x')
+            time.sleep(0.01)
+        self.assertEqual(len(backend), 2)
+        self.assertIsNone(backend.get('a'))
+
+    def test_lock_across_processes(self):
+        """Test that a lock held by another process blocks this one until released."""
+        code = (
+            "import sys, time; from cache import SQLiteBackend; "
+            f"backend = SQLiteBackend({self.path!r}, table='test'); "
+            "lock = backend.lock('key'); lock.__enter__(); print('locked', flush=True); "
+            "time.sleep(0.5); lock.__exit__(None, None, None)"
+        )
+        self.make_backend()
+        holder = subprocess.Popen([sys.executable, '-c', code], cwd=HERE, stdout=subprocess.PIPE, text=True)
+        try:
+            self.assertEqual(holder.stdout.readline().strip(), 'locked')
+            backend = self.make_backend()
+            with backend.lock('key', timeout=0.1) as acquired:
+                self.assertFalse(acquired)
+            with backend.lock('key', timeout=5) as acquired:
+                self.assertTrue(acquired)
+        finally:
+            holder.wait()
+            holder.stdout.close()
+
+    def test_abandoned_lease_expires(self):
+        """Test that a crashed holder's lock can be taken over after its lease."""
+        backend = self.make_backend()
+        self.assertTrue(backend._try_acquire('key', 'crashed-worker', 0.1))
+        with backend.lock('key', timeout=0.05) as acquired:
+            self.assertFalse(acquired)
+        time.sleep(0.15)
+        with backend.lock('key', timeout=0.05) as acquired:
+            self.assertTrue(acquired)
+
+    def test_transcript_store_is_shared(self):
+        """Test that two workers' stores see each other's analyses."""
+        from incremental import TranscriptStore
+        first = TranscriptStore(backend=self.make_backend())
+        second = TranscriptStore(backend=self.make_backend())
+        first.put('https://example.com/call', 'text', {'sentiment': 'Positive'})
+        self.assertEqual(second.get('https://example.com/call'),
+                         {'text': 'text', 'result': {'sentiment': 'Positive'}})
+
+
+class TestRedisBackend(BackendContract, unittest.TestCase):
+    """Test cases for the Redis-protocol backend against a local stand-in."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = RedisStandIn()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.data.clear()
+
+    def make_backend(self):
+        from cache import RedisBackend
+        return RedisBackend(f"redis://127.0.0.1:{self.server.server_address[1]}/0", prefix='test:')
+
+    def test_keys_are_namespaced(self):
+        """Test that clear() only removes this backend's prefix."""
+        from cache import RedisBackend
+        backend = self.make_backend()
+        other = RedisBackend(f"redis://127.0.0.1:{self.server.server_address[1]}/0", prefix='other:')
+        backend.set('a', b'1')
+        other.set('a', b'2')
+        backend.clear()
+        self.assertEqual(other.get('a'), b'2')
+        self.assertIn(b'other:a', self.server.data)
+
+    def test_unreachable_server_is_a_miss(self):
+        """Test that an outage degrades to cache misses instead of errors."""
+        from cache import Cache, RedisBackend
+        cache = Cache(RedisBackend('redis://127.0.0.1:1/0', timeout=0.2))
+        self.assertIsNone(cache.get('key'))
+        cache.set('key', 'value')
+        with cache.lock('key') as acquired:
+            self.assertFalse(acquired)
+        self.assertEqual(cache.get_or_compute('key', lambda: 'computed'), 'computed')
+
+
+class TestScrapeCache(unittest.TestCase):
+    """Test cases for cached scrapes in the app."""
+
+    def test_cached_scrape_is_reused(self):
+        """Test that SCRAPE_CACHE_SECONDS reuses a scraped transcript."""
+        from unittest.mock import patch
+        import app
+        from cache import Cache, MemoryBackend
+        transcript = "Revenue grew 18% year-over-year to $2.1 billion, exceeding our guidance. " * 3
+        client = app.app.test_client()
+        with patch.object(app, 'SCRAPE_CACHE_SECONDS', 60), \
+                patch.object(app, 'scrape_cache', Cache(MemoryBackend(), ttl=60)), \
+                patch('app.scrape_text_from_url', return_value=transcript) as mock_scrape:
+            for _ in range(2):
+                response = client.post('/preview', json={'url': 'https://example.com/call'})
+                self.assertEqual(response.status_code, 200)
+        mock_scrape.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
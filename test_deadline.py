@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Automated tests for request deadlines and cancellation.
+"""
+
+import socket
+import time
+import unittest
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSCRIPT = (
+    "Revenue grew 18% year-over-year to $2.1 billion, exceeding our guidance. "
+    "Operating margin improved to 22% and we are raising our full-year outlook. "
+)
+
+
+class TestDeadline(unittest.TestCase):
+    """Test cases for the Deadline object."""
+
+    def setUp(self):
+        from metrics import metrics
+        metrics.reset()
+
+    def test_check_after_expiry(self):
+        """Test that check() raises once the budget is spent and counts it."""
+        from deadline import Deadline, RequestCancelled
+        from metrics import metrics
+        deadline = Deadline(0.05)
+        deadline.check('scrape')
+        time.sleep(0.06)
+        with self.assertRaises(RequestCancelled) as context:
+            deadline.check('scrape')
+        self.assertEqual((context.exception.reason, context.exception.stage), ('deadline', 'scrape'))
+        counters = metrics.snapshot()['counters']
+        self.assertEqual(counters['cancelled.deadline'], 1)
+        self.assertEqual(counters['cancelled.stage.scrape'], 1)
+
+    def test_wait_gives_up_on_slow_call(self):
+        """Test that wait() returns fast results and abandons slow ones."""
+        from deadline import Deadline, RequestCancelled
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(Deadline(1).wait(executor.submit(lambda: 'ok'), 'model'), 'ok')
+
+            start = time.monotonic()
+            with self.assertRaises(RequestCancelled):
+                Deadline(0.1).wait(executor.submit(time.sleep, 1), 'model')
+            self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_wait_stops_on_disconnect(self):
+        """Test that a disconnected client cancels the wait."""
+        from deadline import Deadline, RequestCancelled
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with self.assertRaises(RequestCancelled) as context:
+                Deadline(10, is_disconnected=lambda: True).wait(executor.submit(time.sleep, 1), 'model')
+        self.assertEqual(context.exception.reason, 'disconnected')
+
+    def test_socket_disconnect_check(self):
+        """Test disconnect detection on a real socket pair."""
+        from deadline import client_disconnect_check
+        server, client = socket.socketpair()
+        try:
+            self.assertIsNone(client_disconnect_check({}))
+            is_disconnected = client_disconnect_check({'werkzeug.socket': server})
+            self.assertFalse(is_disconnected())
+            client.sendall(b'unread body')
+            self.assertFalse(is_disconnected())
+            self.assertEqual(server.recv(64), b'unread body')
+            client.close()
+            self.assertTrue(is_disconnected())
+        finally:
+            server.close()
+
+
+class TestProviderTimeouts(unittest.TestCase):
+    """Test cases for timeouts passed to providers."""
+
+    def test_deadline_timeout_does_not_trip_breaker(self):
+        """Test that a call cut short by the caller's deadline is not a backend failure."""
+        from providers import GuardedProvider, FakeProvider, CircuitBreaker
+        guarded = GuardedProvider(FakeProvider(delay=0.3), breaker=CircuitBreaker(failure_threshold=1))
+        with self.assertRaises(TimeoutError):
+            guarded.generate(None, [], timeout=0.05)
+        self.assertEqual(guarded.stats()['circuit'], 'closed')
+        self.assertEqual(guarded.stats()['in_flight'], 0)
+
+
+class TestGeminiTimeout(unittest.TestCase):
+    """Test cases for per-call timeouts against the installed Gemini SDK."""
+
+    def test_timeout_builds_valid_request(self):
+        """Test that a timed call builds a real GenerateContentRequest."""
+        import google.generativeai as genai
+        import google.ai.generativelanguage as glm
+        from providers import GeminiProvider
+        from prompts import registry
+
+        sent = []
+
+        class Client:
+            def generate_content(self, request, **kwargs):
+                sent.append((request, kwargs))
+                return glm.GenerateContentResponse(candidates=[
+                    glm.Candidate(content=glm.Content(parts=[glm.Part(text='{"ok": true}')]), finish_reason=1)
+                ])
+
+        provider = GeminiProvider(model_name='gemini-pro', prefix_cache_ttl=0)
+        real_model = genai.GenerativeModel
+
+        def model_with_client(*args, **kwargs):
+            model = real_model(*args, **kwargs)
+            model._client = Client()
+            return model
+
+        with patch.dict(os.environ, {'GOOGLE_API_KEY': 'test-key'}), \
+                patch('google.generativeai.GenerativeModel', side_effect=model_with_client):
+            text = provider.generate(registry.get(), ['Instructions', 'Transcript'], timeout=5.0)
+
+        self.assertEqual(text, '{"ok": true}')
+        self.assertIsInstance(sent[0][0], glm.GenerateContentRequest)
+
+
+class TestAnalyzeDeadline(unittest.TestCase):
+    """Test cases for deadlines on the /analyze endpoint."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app, transcript_store
+        from metrics import metrics
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+        metrics.reset()
+
+    def test_slow_model_call_times_out(self):
+        """Test that the client budget stops a slow model call with 504."""
+        import app
+        from metrics import metrics
+        from providers import FakeProvider
+        with patch.object(app, 'model_provider', FakeProvider(delay=2)):
+            start = time.monotonic()
+            response = self.client.post('/analyze', json={'text': TRANSCRIPT, 'timeout': 0.2})
+        self.assertEqual(response.status_code, 504)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(metrics.snapshot()['counters']['cancelled.stage.model'], 1)
+
+    def test_header_budget_and_validation(self):
+        """Test the X-Request-Timeout header and invalid budgets."""
+        import app
+        from providers import FakeProvider
+        with patch.object(app, 'model_provider', FakeProvider(delay=2)):
+            response = self.client.post('/analyze', json={'text': TRANSCRIPT},
+                                        headers={'X-Request-Timeout': '0.2'})
+        self.assertEqual(response.status_code, 504)
+        # A forwarded request's header budget wins over a larger field
+        with patch.object(app, 'model_provider', FakeProvider(delay=2)):
+            response = self.client.post('/analyze', json={'text': TRANSCRIPT, 'timeout': 60},
+                                        headers={'X-Request-Timeout': '0.2'})
+        self.assertEqual(response.status_code, 504)
+        for timeout in ('soon', 0, -1):
+            response = self.client.post('/analyze', json={'text': TRANSCRIPT, 'timeout': timeout})
+            self.assertEqual(response.status_code, 400)
+
+    def test_disconnected_client_skips_model_call(self):
+        """Test that no model call is made for a client that already left."""
+        import app
+        from providers import FakeProvider
+        provider = FakeProvider()
+        with patch.object(app, 'model_provider', provider), \
+                patch.object(app, 'client_disconnect_check', return_value=lambda: True):
+            response = self.client.post('/analyze', json={'text': TRANSCRIPT})
+        self.assertEqual(response.status_code, 499)
+        self.assertEqual(provider.calls, [])
+
+    def test_shared_scrape_uses_each_request_deadline(self):
+        """Test that a short deadline on one request does not fail another sharing its scrape."""
+        import app
+        from providers import FakeProvider
+        from singleflight import SingleFlight
+
+        def slow_scrape(url, deadline=None):
+            time.sleep(1)
+            deadline.check('pagination')
+            return TRANSCRIPT * 3
+
+        def post(timeout):
+            return self.client.post('/analyze', json={'url': 'https://example.com/slow', 'timeout': timeout})
+
+        with patch.object(app, 'model_provider', FakeProvider()), \
+                patch.object(app, 'scrape_flight', SingleFlight()), \
+                patch.object(app, 'scrape_text_from_url', side_effect=slow_scrape) as scrape:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                short = pool.submit(post, 0.3)
+                time.sleep(0.05)
+                long = pool.submit(post, 30)
+                short, long = short.result(5), long.result(5)
+
+        self.assertEqual(short.status_code, 504)
+        self.assertEqual(long.status_code, 200)
+        self.assertEqual(scrape.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Automated tests for PDF and Word document transcript ingestion.
+"""
+
+import io
+import unittest
+import os
+import sys
+import zipfile
+from unittest.mock import patch, Mock
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PAGE_TEXTS = [
+    "Revenue grew 18 percent year over year to 2.1 billion dollars in the quarter.",
+    "We are raising our full year guidance and expect margins to expand further.",
+    "Operating expenses declined as we completed the restructuring program early.",
+]
+
+SAMPLE_RESULT = {
+    "sentiment": "Positive",
+    "good_news": ["Revenue grew 18%"],
+    "bad_news": [],
+    "key_promises": ["Raised guidance"],
+    "verdict": "Strong quarter."
+}
+
+
+def build_pdf(page_texts):
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 10 Tf 40 700 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1'))
+    xref = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1'))
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode('latin-1'))
+    output.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1'))
+    return output.getvalue()
+
+
+def build_docx(page_texts):
+    """Build a minimal DOCX with one paragraph per page, separated by page breaks."""
+    namespace = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+    paragraphs = []
+    for index, text in enumerate(page_texts):
+        if index:
+            paragraphs.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        paragraphs.append(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>')
+    document = (f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{namespace}">'
+                f'<w:body>{"".join(paragraphs)}</w:body></w:document>')
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w') as archive:
+        archive.writestr('[Content_Types].xml', '<Types/>')
+        archive.writestr('word/document.xml', document)
+    return output.getvalue()
+
+
+class TestDocumentExtraction(unittest.TestCase):
+    """Test cases for the PDF and DOCX extraction paths."""
+
+    def test_detect_document_type(self):
+        """Test content-type and extension dispatch."""
+        from documents import detect_document_type
+        self.assertEqual(detect_document_type('application/pdf; charset=binary', '/ir/q3'), 'pdf')
+        self.assertEqual(detect_document_type('', '/ir/Q3-Transcript.PDF'), 'pdf')
+        self.assertEqual(detect_document_type('application/octet-stream', '/q3.docx'), 'docx')
+        self.assertIsNone(detect_document_type('text/html; charset=utf-8', '/transcript'))
+
+    def test_pdf_pages_are_extracted(self):
+        """Test that every page of a PDF is extracted in order."""
+        from documents import extract_document_stream
+        text = extract_document_stream([build_pdf(PAGE_TEXTS)], 'pdf')
+        self.assertEqual(text, ' '.join(PAGE_TEXTS))
+
+    def test_pdf_page_limit(self):
+        """Test that extraction stops at the page limit."""
+        from documents import extract_document_stream
+        text = extract_document_stream([build_pdf(PAGE_TEXTS)], 'pdf', max_pages=2)
+        self.assertIn("raising our full year guidance", text)
+        self.assertNotIn("restructuring", text)
+
+    def test_docx_paragraphs_and_page_limit(self):
+        """Test DOCX extraction and page-break counting."""
+        from documents import extract_document_stream
+        data = build_docx(PAGE_TEXTS)
+        self.assertEqual(extract_document_stream([data], 'docx'), ' '.join(PAGE_TEXTS))
+        self.assertEqual(extract_document_stream([data], 'docx', max_pages=1), PAGE_TEXTS[0])
+
+    def test_size_limit_and_invalid_files(self):
+        """Test that oversized, empty and corrupt documents raise ValueError."""
+        from documents import extract_document_stream
+        with self.assertRaises(ValueError):
+            extract_document_stream([b'x' * 600, b'x' * 600], 'pdf', max_bytes=1000)
+        with self.assertRaises(ValueError):
+            extract_document_stream([], 'pdf')
+        with self.assertRaises(ValueError):
+            extract_document_stream([b'not a zip archive'], 'docx')
+        with self.assertRaises(ValueError):
+            extract_document_stream([b'%PDF-1.4 garbage'], 'pdf')
+
+
+class TestDocumentIngestion(unittest.TestCase):
+    """Test cases for PDF links and uploads through the app."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app, transcript_store
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+
+    @patch('requests.get')
+    def test_scrape_dispatches_pdf_by_content_type(self, mock_get):
+        """Test that a linked PDF is extracted instead of parsed as HTML."""
+        from app import scrape_text_from_url
+        data = build_pdf(PAGE_TEXTS)
+        mock_response = Mock()
+        mock_response.headers = {'Content-Type': 'application/pdf'}
+        mock_response.iter_content.return_value = [data[:100], data[100:]]
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        text = scrape_text_from_url('https://example.com/ir/transcript')
+
+        self.assertEqual(text, ' '.join(PAGE_TEXTS))
+        self.assertTrue(mock_get.call_args[1]['stream'])
+
+    @patch('requests.get')
+    def test_scrape_sniffs_pdf_signature(self, mock_get):
+        """Test that a PDF served with a generic content type is detected."""
+        from app import scrape_text_from_url
+        mock_response = Mock()
+        mock_response.headers = {'Content-Type': 'application/octet-stream'}
+        mock_response.content = build_pdf(PAGE_TEXTS)
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        self.assertIn("Revenue grew 18 percent", scrape_text_from_url('https://example.com/download?id=7'))
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_upload_is_analyzed_without_scraping(self, mock_scrape, mock_analyze):
+        """Test multipart upload of a DOCX transcript."""
+        mock_analyze.return_value = SAMPLE_RESULT
+
+        response = self.client.post('/analyze', data={
+            'file': (io.BytesIO(build_docx(PAGE_TEXTS)), 'q3-call.docx'),
+            'prompt': 'earnings_call'
+        }, content_type='multipart/form-data')
+
+        self.assertEqual(response.status_code, 200)
+        mock_scrape.assert_not_called()
+        self.assertEqual(mock_analyze.call_args[0][0], ' '.join(PAGE_TEXTS))
+
+    @patch('app.analyze_text_with_ai')
+    def test_unsupported_upload(self, mock_analyze):
+        """Test that unsupported file types are rejected."""
+        response = self.client.post('/analyze', data={
+            'file': (io.BytesIO(b'\x00\x01binary'), 'slides.pptx')
+        }, content_type='multipart/form-data')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unable to read the uploaded file', response.get_json()['error'])
+        mock_analyze.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Automated tests for per-domain extraction rules.
+"""
+
+import json
+import tempfile
+import unittest
+import os
+import sys
+from unittest.mock import patch, Mock
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+REMARKS = "Revenue grew 18% year-over-year to $2.1 billion and we are raising our full-year guidance."
+
+PAGE = f"""
+<html><head><title>ACME Q3 2025 Earnings Call Transcript</title></head>
+<body>
+  <nav>Home | Markets | Subscribe now for 50% off</nav>
+  <div class="article-body transcript">
+    <p><strong>Jane Doe</strong> -- <em>Chief Executive Officer</em></p>
+    <p>{REMARKS}</p>
+    <div class="interad">Buy our premium stock picks today!</div>
+    <p><strong>John Roe:</strong></p>
+    <p>Operating margin expanded 200 basis points to 22% on lower input costs.</p>
+  </div>
+  <footer>Copyright Example Media. Related: 10 stocks to buy now.</footer>
+</body></html>
+"""
+
+
+def make_rule(**overrides):
+    from domain_rules import DomainRule
+    spec = {'container': 'div.article-body', 'drop': ['div.interad'], 'speaker': 'p > strong'}
+    spec.update(overrides)
+    return DomainRule('example.com', **spec)
+
+
+class TestDomainRules(unittest.TestCase):
+    """Test cases for compiled extraction rules."""
+
+    def test_rule_extracts_container_only(self):
+        """Test that the container is extracted without drops or page chrome."""
+        text = make_rule().extract(PAGE)
+        self.assertTrue(text.startswith("Jane Doe: -- Chief Executive Officer " + REMARKS))
+        self.assertIn("John Roe: Operating margin expanded", text)
+        self.assertNotIn("premium stock picks", text)
+        self.assertNotIn("Subscribe", text)
+        self.assertNotIn("Copyright", text)
+
+    def test_simple_selectors_limit_parsing(self):
+        """Test that simple selectors become a SoupStrainer and complex ones do not."""
+        self.assertIsNotNone(make_rule().strainer)
+        self.assertIsNotNone(make_rule(container='div[data-test-id="content"]').strainer)
+        self.assertIsNone(make_rule(container='body > div.article-body').strainer)
+        self.assertEqual(make_rule(container='body > div.article-body').extract(PAGE), make_rule().extract(PAGE))
+
+    def test_missing_container(self):
+        """Test that a rule that does not match returns None."""
+        self.assertIsNone(make_rule(container='#transcript').extract(PAGE))
+
+    def test_hostname_lookup(self):
+        """Test exact and parent-domain matching."""
+        from domain_rules import DomainRuleRegistry
+        registry = DomainRuleRegistry()
+        registry.register(make_rule())
+        self.assertIs(registry.for_host('www.Example.com'), registry.for_host('example.com'))
+        self.assertIsNotNone(registry.for_host('ir.example.com.'))
+        self.assertIsNone(registry.for_host('example.org'))
+        self.assertIsNone(registry.for_host(None))
+
+    def test_load_skips_invalid_rules(self):
+        """Test loading a config file with one bad selector."""
+        from domain_rules import DomainRuleRegistry
+        config = {'good.com': {'container': 'article'}, 'bad.com': {'container': 'div[['}, 'none.com': {}}
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as handle:
+            json.dump(config, handle)
+        try:
+            registry = DomainRuleRegistry.load(handle.name)
+        finally:
+            os.unlink(handle.name)
+        self.assertEqual(len(registry), 1)
+        self.assertIsNotNone(registry.for_host('good.com'))
+        self.assertEqual(len(DomainRuleRegistry.load('/nonexistent/rules.json')), 0)
+
+    def test_bundled_rules_compile(self):
+        """Test that the shipped rules file loads completely."""
+        from domain_rules import DomainRuleRegistry, DEFAULT_RULES_PATH
+        with open(DEFAULT_RULES_PATH) as handle:
+            expected = len(json.load(handle))
+        self.assertEqual(len(DomainRuleRegistry.load()), expected)
+
+
+class TestRuleScrape(unittest.TestCase):
+    """Test cases for rule selection in the scraper."""
+
+    def mock_page(self, mock_get, html):
+        mock_response = Mock()
+        mock_response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        mock_response.content = html.encode('utf-8')
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+    @patch('requests.get')
+    def test_scraper_uses_rule_for_host(self, mock_get):
+        """Test that a matching host uses its rule."""
+        from app import scrape_text_from_url
+        from domain_rules import rules as domain_rules
+        self.mock_page(mock_get, PAGE)
+        with patch.object(domain_rules, 'for_host', return_value=make_rule()) as mock_lookup:
+            text = scrape_text_from_url('https://www.example.com/earnings/acme-q3')
+        mock_lookup.assert_called_once_with('www.example.com')
+        self.assertNotIn("Subscribe", text)
+
+    @patch('requests.get')
+    def test_scraper_falls_back_to_generic(self, mock_get):
+        """Test that a rule that misses falls back to the generic path."""
+        from app import scrape_text_from_url
+        from domain_rules import rules as domain_rules
+        self.mock_page(mock_get, PAGE)
+        with patch.object(domain_rules, 'for_host', return_value=make_rule(container='#transcript')):
+            text = scrape_text_from_url('https://www.example.com/earnings/acme-q3')
+        self.assertIn("Subscribe", text)
+        self.assertIn(REMARKS, text)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
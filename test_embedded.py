@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Automated tests for the embedded-JSON extraction fast path.
+"""
+
+import json
+import unittest
+import os
+import sys
+from unittest.mock import patch, Mock
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PARAGRAPH = "Revenue grew 18% year-over-year to $2.1 billion and we are raising our full-year guidance. "
+TRANSCRIPT = PARAGRAPH * 15
+
+
+def next_data_page(props):
+    """Build a script-rendered page with an empty body and a __NEXT_DATA__ blob."""
+    blob = json.dumps({'props': {'pageProps': props}, 'page': '/transcripts/[slug]'})
+    return (f'<html><head><title>ACME Q3</title></head><body><div id="__next"></div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{blob}</script>'
+            f'<script>window.analytics = {{}};</script></body></html>')
+
+
+class TestEmbeddedExtraction(unittest.TestCase):
+    """Test cases for finding transcript text in embedded JSON."""
+
+    def test_next_data_transcript(self):
+        """Test extraction from a __NEXT_DATA__ blob."""
+        from embedded import extract_embedded_text
+        html = next_data_page({'transcript': {'title': 'ACME Q3', 'body': TRANSCRIPT}})
+        self.assertEqual(extract_embedded_text(html), TRANSCRIPT.strip())
+
+    def test_json_ld_article_body_with_markup(self):
+        """Test JSON-LD articleBody containing HTML and entities."""
+        from embedded import extract_embedded_text
+        body = ''.join(f"<p>{PARAGRAPH.strip()} &amp; more.</p>" for _ in range(15))
+        ld = json.dumps({'@context': 'https://schema.org', '@graph': [
+            {'@type': 'NewsArticle', 'headline': 'ACME Q3 Earnings Call Transcript', 'articleBody': body}
+        ]})
+        html = f'<html><head><script type="application/ld+json">{ld}</script></head><body></body></html>'
+        text = extract_embedded_text(html)
+        self.assertIn("raising our full-year guidance. & more. Revenue grew", text)
+        self.assertNotIn("<p>", text)
+
+    def test_speaker_segments_and_longest_blob(self):
+        """Test segment lists and that the longest candidate wins over a teaser."""
+        from embedded import extract_embedded_text
+        segments = [{'speaker': 'CEO', 'text': PARAGRAPH * 8}, {'speaker': 'CFO', 'text': PARAGRAPH * 8},
+                    {'speaker': 'Analyst', 'text': 'What about margins?'}]
+        teaser = json.dumps({'articleBody': PARAGRAPH * 12})
+        html = (f'<script type="application/ld+json">{teaser}</script>'
+                + next_data_page({'segments': segments}))
+        text = extract_embedded_text(html)
+        self.assertTrue(text.startswith("CEO: Revenue grew"))
+        self.assertTrue(text.endswith("Analyst: What about margins?"))
+
+    def test_no_or_short_embedded_text(self):
+        """Test that regular pages, invalid JSON and teasers fall through."""
+        from embedded import extract_embedded_text
+        self.assertIsNone(extract_embedded_text(f"<html><body><p>{TRANSCRIPT}</p></body></html>"))
+        self.assertIsNone(extract_embedded_text('<script type="application/json">{not json</script>'))
+        self.assertIsNone(extract_embedded_text(next_data_page({'description': TRANSCRIPT, 'body': PARAGRAPH})))
+
+
+class TestEmbeddedScrape(unittest.TestCase):
+    """Test cases for the scraper's use of the fast path."""
+
+    @patch('requests.get')
+    def test_script_rendered_page_is_scraped(self, mock_get):
+        """Test that a page with an empty body but embedded data now scrapes."""
+        from app import scrape_text_from_url
+        mock_response = Mock()
+        mock_response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        mock_response.content = next_data_page({'transcript': {'body': TRANSCRIPT}}).encode('utf-8')
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        with patch('bs4.BeautifulSoup') as mock_soup:
+            text = scrape_text_from_url('https://example.com/transcripts/acme-q3')
+
+        self.assertEqual(text, TRANSCRIPT.strip())
+        mock_soup.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Automated tests for transcript page text extraction.
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import patch, Mock
+from bs4 import BeautifulSoup
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_clean_text(soup):
+    """Reference implementation of the original get_text() cleanup."""
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+class TestStreamingCleanup(unittest.TestCase):
+    """Test cases for the streaming text extractor."""
+
+    SAMPLES = [
+        "",
+        "<p>Short</p>",
+        "<h1>Q3 Call</h1>\n<p>Revenue   grew 15%.\n  Margins held.</p>",
+        "<div>Line one<br>continues <b>bold</b>\r\nLine two\ttabbed</div>",
+        "<p>Split <i>across\n</i>nodes  with  double  spaces</p>\n\n\n<p> nbsp </p>",
+        "<p>A\r</p><p>\nB</p><!-- comment --><p>C D\x85E</p>",
+    ]
+
+    def test_output_matches_legacy_cleanup(self):
+        """Test that the streaming extractor output is identical to get_text cleanup."""
+        from extraction import extract_clean_text
+        for html in self.SAMPLES:
+            expected = legacy_clean_text(BeautifulSoup(html, 'html.parser'))
+            actual = extract_clean_text(BeautifulSoup(html, 'html.parser'))
+            self.assertEqual(actual, expected, html)
+
+    def test_large_page_matches_legacy_cleanup(self):
+        """Test equivalence on a page with many text nodes."""
+        from extraction import extract_clean_text
+        html = "<p>Revenue grew  18%.\n  Guidance raised.</p><span>Q:</span> <b>Outlook?</b>\n" * 500
+        expected = legacy_clean_text(BeautifulSoup(html, 'html.parser'))
+        actual = extract_clean_text(BeautifulSoup(html, 'html.parser'))
+        self.assertEqual(actual, expected)
+
+
+class TestPageDecoding(unittest.TestCase):
+    """Test cases for decoding pages once before parsing."""
+
+    BODY = "<p>" + "Our café in Zürich – “record” demand. " * 5 + "</p>"
+
+    def test_header_charset_wins(self):
+        """Test that the HTTP header charset is used first."""
+        from encoding import decode_html
+        html = f'<html><head><meta charset="utf-8"></head><body>{self.BODY}</body></html>'
+        text, encoding = decode_html(html.encode('cp1252'), 'text/html; charset=windows-1252')
+        self.assertEqual(encoding, 'cp1252')
+        self.assertIn("“record”", text)
+
+    def test_meta_charset_and_latin1_alias(self):
+        """Test <meta> sniffing and that latin-1 labels decode as cp1252."""
+        from encoding import decode_html
+        html = f'<html><head><meta http-equiv="Content-Type" content="text/html; charset=ISO-8859-1"></head>{self.BODY}'
+        text, encoding = decode_html(html.encode('cp1252'), 'text/html')
+        self.assertEqual(encoding, 'cp1252')
+        self.assertIn("Zürich – “record”", text)
+
+    def test_latin1_label_spellings(self):
+        """Test that every spelling of latin-1 maps to cp1252."""
+        from encoding import normalize_charset
+        for label in ('latin-1', 'latin1', 'ISO-8859-1', 'iso_8859_1', 'l1'):
+            self.assertEqual(normalize_charset(label), 'cp1252')
+
+    def test_wrong_declaration_falls_through(self):
+        """Test that an undecodable declared charset is skipped."""
+        from encoding import decode_html
+        html = f'<html><head><meta charset="utf-8"></head>{self.BODY}'
+        text, encoding = decode_html(html.encode('cp1252'), 'text/html; charset=bogus')
+        self.assertEqual(encoding, 'cp1252')
+        self.assertIn("café", text)
+
+    @patch('requests.get')
+    def test_scraper_records_decode_timing(self, mock_get):
+        """Test that the scraper decodes pages itself and instruments it."""
+        from app import scrape_text_from_url
+        from metrics import metrics
+        metrics.reset()
+        mock_response = Mock()
+        mock_response.headers = {'Content-Type': 'text/html; charset=cp1252'}
+        mock_response.content = f'<html><body>{self.BODY}</body></html>'.encode('cp1252')
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        text = scrape_text_from_url('https://example.com/transcript')
+
+        self.assertIn("Our café in Zürich", text)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['timers']['scrape.decode']['count'], 1)
+        self.assertEqual(snapshot['counters']['scrape.encoding.cp1252'], 1)
+        self.assertIn('scrape.parse', snapshot['timers'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Automated tests for degraded mode: the local fallback summarizer, the
+in-flight limit and circuit breaker, and the preview endpoint.
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSCRIPT = (
+    "Good morning everyone, and thank you for joining our Q3 2024 earnings call. "
+    "Revenue grew 18% year-over-year to $2.1 billion, exceeding our guidance. "
+    "Our cloud division delivered record growth and strong margins. "
+    "Supply chain disruptions caused a 5% decline in the hardware segment. "
+    "Increased competition is putting pressure on pricing. "
+    "We expect revenue growth to continue next quarter. "
+    "We plan to open three new offices in Europe by 2025. "
+    "Q: How do you see the competitive landscape? "
+    "A: We believe our technology gives us a durable advantage."
+)
+
+
+class TestFallbackSummarizer(unittest.TestCase):
+    """Test cases for the local extractive summarizer."""
+
+    def test_schema_and_degraded_flag(self):
+        """Test that the summary fills the standard schema and is marked degraded."""
+        from fallback import summarize_transcript
+        result = summarize_transcript(TRANSCRIPT)
+        for field in ['sentiment', 'good_news', 'bad_news', 'key_promises', 'verdict']:
+            self.assertIn(field, result)
+        self.assertTrue(result['degraded'])
+        self.assertIsInstance(result['good_news'], list)
+        self.assertIsInstance(result['verdict'], str)
+
+    def test_sentences_are_classified(self):
+        """Test that positive, negative and forward-looking sentences are separated."""
+        from fallback import summarize_transcript
+        result = summarize_transcript(TRANSCRIPT)
+        self.assertTrue(any("record growth" in item for item in result['good_news']))
+        self.assertTrue(any("5% decline" in item for item in result['bad_news']))
+        self.assertTrue(any("new offices in Europe" in item for item in result['key_promises']))
+        self.assertFalse(any(item.endswith('?') for item in result['bad_news'] + result['good_news']))
+
+    def test_negation_flips_polarity(self):
+        """Test that negated terms count against their usual polarity."""
+        from fallback import sentence_polarity
+        self.assertGreater(sentence_polarity("Margins improved and revenue grew."), 0)
+        self.assertLess(sentence_polarity("Margins have not improved this year."), 0)
+
+    def test_full_transcript_is_fast(self):
+        """Test that a long transcript is summarized well under a second."""
+        from fallback import summarize_transcript
+        long_text = ' '.join(TRANSCRIPT.replace("2024", str(2000 + i)) for i in range(150))
+        start = time.perf_counter()
+        summarize_transcript(long_text)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_empty_text(self):
+        """Test that empty input still returns a valid schema."""
+        from fallback import summarize_transcript
+        result = summarize_transcript("")
+        self.assertEqual(result['sentiment'], "Neutral")
+        self.assertEqual(result['good_news'], [])
+
+
+class TestGuardedProvider(unittest.TestCase):
+    """Test cases for the in-flight limit and circuit breaker."""
+
+    def test_saturation_is_unavailable(self):
+        """Test that calls beyond the in-flight limit fail fast as unavailable."""
+        from providers import GuardedProvider, FakeProvider, ModelUnavailableError
+        guarded = GuardedProvider(FakeProvider(responses=["ok"], delay=0.3), max_in_flight=1, queue_timeout=0.01)
+        worker = threading.Thread(target=guarded.generate, args=(None, []))
+        worker.start()
+        time.sleep(0.05)
+        self.assertEqual(guarded.stats()['in_flight'], 1)
+        with self.assertRaises(ModelUnavailableError):
+            guarded.generate(None, [])
+        worker.join()
+        self.assertEqual(guarded.stats()['in_flight'], 0)
+
+    def test_breaker_opens_and_recovers(self):
+        """Test that repeated outages open the breaker until a trial succeeds."""
+        from providers import GuardedProvider, FakeProvider, CircuitBreaker, ModelUnavailableError
+        provider = FakeProvider(responses=[ConnectionError("down"), ConnectionError("down"), "ok"])
+        guarded = GuardedProvider(provider, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.1))
+
+        for _ in range(2):
+            with self.assertRaises(ModelUnavailableError):
+                guarded.generate(None, [])
+        self.assertEqual(guarded.stats()['circuit'], 'open')
+
+        # Rejected without reaching the backend while open
+        with self.assertRaises(ModelUnavailableError):
+            guarded.generate(None, [])
+        self.assertEqual(len(provider.calls), 2)
+
+        time.sleep(0.15)
+        self.assertEqual(guarded.generate(None, []), "ok")
+        self.assertEqual(guarded.stats()['circuit'], 'closed')
+
+    def test_request_errors_do_not_trip_breaker(self):
+        """Test that bad-request errors propagate unchanged."""
+        from providers import GuardedProvider, FakeProvider, CircuitBreaker
+        guarded = GuardedProvider(
+            FakeProvider(responses=[ValueError("Google API key not configured")]),
+            breaker=CircuitBreaker(failure_threshold=1)
+        )
+        with self.assertRaises(ValueError):
+            guarded.generate(None, [])
+        self.assertEqual(guarded.stats()['circuit'], 'closed')
+
+    def test_quota_status_codes_are_unavailable(self):
+        """Test that quota and server errors are recognised as outages."""
+        from providers import is_unavailable_error
+
+        class QuotaError(Exception):
+            code = 429
+
+        self.assertTrue(is_unavailable_error(QuotaError("Resource exhausted")))
+        self.assertTrue(is_unavailable_error(TimeoutError()))
+        self.assertFalse(is_unavailable_error(Exception("Invalid JSON")))
+
+
+class TestDegradedEndpoints(unittest.TestCase):
+    """Test cases for degraded responses from the API."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app, transcript_store
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_unavailable_model_serves_local_summary(self, mock_scrape, mock_analyze):
+        """Test that /analyze degrades instead of failing when the model is down."""
+        from app import transcript_store
+        from providers import ModelUnavailableError
+        mock_scrape.return_value = TRANSCRIPT
+        mock_analyze.side_effect = ModelUnavailableError("AI service is at capacity")
+
+        response = self.client.post('/analyze', json={'url': 'https://example.com/transcript'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertTrue(data['degraded'])
+        self.assertIn('verdict', data)
+        self.assertEqual(len(transcript_store), 0)
+
+    @patch('app.DEGRADED_FALLBACK', False)
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_fallback_can_be_disabled(self, mock_scrape, mock_analyze):
+        """Test that DEGRADED_FALLBACK=0 reports the outage as 503."""
+        from providers import ModelUnavailableError
+        mock_scrape.return_value = TRANSCRIPT
+        mock_analyze.side_effect = ModelUnavailableError("AI service is temporarily unavailable")
+
+        response = self.client.post('/analyze', json={'url': 'https://example.com/transcript'})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('unable to analyze', response.get_json()['error'].lower())
+
+    @patch('app.scrape_text_from_url')
+    def test_preview_endpoint(self, mock_scrape):
+        """Test that /preview returns an instant degraded summary."""
+        mock_scrape.return_value = TRANSCRIPT
+
+        response = self.client.post('/preview', json={'url': 'https://example.com/transcript'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['degraded'])
+
+    def test_preview_validation(self):
+        """Test request validation on the preview endpoint."""
+        self.assertEqual(self.client.post('/preview', data='not json').status_code, 400)
+        self.assertEqual(self.client.post('/preview', json={}).status_code, 400)
+        self.assertEqual(self.client.post('/preview', json={'url': ' '}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Automated tests for the /healthz and /readyz load balancer probes.
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestHealthEndpoints(unittest.TestCase):
+    """Test cases for the load balancer probes."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+
+    def probe(self, provider, environment_ok=True):
+        import app
+        with patch.object(app, 'model_provider', provider), patch.object(app, '_environment_ok', environment_ok):
+            response = self.client.get('/readyz')
+        return response.status_code, response.get_json()
+
+    def test_healthz(self):
+        """Test the liveness probe."""
+        response = self.client.get('/healthz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'status': 'ok'})
+
+    def test_ready_when_idle(self):
+        """Test that an idle, configured worker is ready."""
+        from providers import GuardedProvider, FakeProvider
+        status, body = self.probe(GuardedProvider(FakeProvider(), max_in_flight=2))
+        self.assertEqual(status, 200)
+        self.assertEqual(body['reasons'], [])
+        self.assertEqual((body['in_flight'], body['max_in_flight'], body['circuit']), (0, 2, 'closed'))
+
+    def test_not_ready_at_capacity(self):
+        """Test that a worker with every model slot busy reports 503."""
+        from providers import GuardedProvider, FakeProvider
+        guarded = GuardedProvider(FakeProvider(responses=["ok"], delay=0.3), max_in_flight=1)
+        worker = threading.Thread(target=guarded.generate, args=(None, []))
+        worker.start()
+        time.sleep(0.05)
+        status, body = self.probe(guarded)
+        worker.join()
+        self.assertEqual(status, 503)
+        self.assertEqual(body['reasons'], ['at_capacity'])
+        self.assertEqual(self.probe(guarded)[0], 200)
+
+    def test_not_ready_when_circuit_open_or_misconfigured(self):
+        """Test that an open breaker and a failed environment check are reported."""
+        from providers import GuardedProvider, FakeProvider, CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        status, body = self.probe(GuardedProvider(FakeProvider(), breaker=breaker), environment_ok=False)
+        self.assertEqual(status, 503)
+        self.assertEqual(body['reasons'], ['environment', 'circuit_open'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
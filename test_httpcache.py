@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Automated tests for HTTP caching: response compression, ETags and 304s on
+/analyze, and fingerprinted static assets.
+"""
+
+import unittest
+import os
+import sys
+import gzip
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSCRIPT = (
+    "Good morning everyone, and thank you for joining our Q3 2024 earnings call. "
+    "Revenue grew 18% year-over-year to $2.1 billion, exceeding our guidance. "
+    "We expect revenue growth to continue next quarter. "
+)
+
+RESULT = {
+    'sentiment': 'Positive',
+    'good_news': ['Revenue grew 18% year-over-year to $2.1 billion'] * 5,
+    'bad_news': [],
+    'key_promises': ['Revenue growth to continue next quarter'],
+    'verdict': 'A strong quarter with growth ahead of guidance. ' * 10,
+}
+
+
+class TestCompression(unittest.TestCase):
+    """Test cases for gzip/brotli response compression."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app, transcript_store
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+
+    def analyze(self, headers=None):
+        with patch('app.scrape_text_from_url', return_value=TRANSCRIPT), \
+                patch('app.analyze_text_with_ai', return_value=dict(RESULT)):
+            return self.client.post('/analyze', json={'url': 'https://example.com/transcript'}, headers=headers)
+
+    def test_gzip_when_accepted(self):
+        """Test that a large JSON result is gzipped for clients that accept it."""
+        plain = self.analyze()
+        compressed = self.analyze({'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed.headers['Vary'])
+        self.assertLess(len(compressed.data), len(plain.data))
+        self.assertEqual(gzip.decompress(compressed.data), plain.data)
+        self.assertEqual(compressed.headers['ETag'], plain.headers['ETag'][:-1] + '-gzip"')
+
+    def test_plain_without_accept_encoding(self):
+        """Test that clients that do not accept compression get the raw body."""
+        response = self.analyze()
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.get_json()['sentiment'], 'Positive')
+
+    def test_small_responses_not_compressed(self):
+        """Test that bodies under the size threshold are sent as they are."""
+        response = self.client.get('/healthz', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_brotli_only_when_installed(self):
+        """Test that br is chosen only when the brotli package is available."""
+        import httpcache
+        from werkzeug.datastructures import Accept
+        accept = Accept([('br', 1), ('gzip', 1)])
+
+        with patch.object(httpcache, 'brotli', None):
+            self.assertEqual(httpcache.choose_encoding(accept), 'gzip')
+            self.assertIsNone(httpcache.choose_encoding(Accept([('br', 1)])))
+        with patch.object(httpcache, 'brotli', object()):
+            self.assertEqual(httpcache.choose_encoding(accept), 'br')
+
+    def test_compressed_body_reused_by_etag(self):
+        """Test that a body with a strong ETag is compressed only once."""
+        import httpcache
+        compressor = httpcache.Compressor()
+        with patch.object(httpcache.Compressor, '_compress', wraps=httpcache.Compressor._compress) as spy, \
+                patch('app.app.after_request_funcs', {None: [compressor]}):
+            self.analyze({'Accept-Encoding': 'gzip'})
+            self.analyze({'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(spy.call_count, 1)
+
+
+class TestAnalyzeETags(unittest.TestCase):
+    """Test cases for conditional /analyze requests."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app, transcript_store
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_matching_etag_returns_304(self, mock_scrape, mock_analyze):
+        """Test that an unchanged result is answered with an empty 304."""
+        mock_scrape.return_value = TRANSCRIPT
+        mock_analyze.return_value = dict(RESULT)
+
+        first = self.client.post('/analyze', json={'url': 'https://example.com/transcript'})
+        etag = first.headers['ETag']
+        second = self.client.post(
+            '/analyze', json={'url': 'https://example.com/transcript'}, headers={'If-None-Match': etag}
+        )
+
+        self.assertEqual(first.status_code, 200)
+        self.assertFalse(etag.startswith('W/'))
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b'')
+        self.assertEqual(second.headers['ETag'], etag)
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_compressed_etag_also_matches(self, mock_scrape, mock_analyze):
+        """Test that the gzip variant's ETag validates the same result."""
+        mock_scrape.return_value = TRANSCRIPT
+        mock_analyze.return_value = dict(RESULT)
+
+        first = self.client.post(
+            '/analyze', json={'url': 'https://example.com/transcript'}, headers={'Accept-Encoding': 'gzip'}
+        )
+        second = self.client.post(
+            '/analyze', json={'url': 'https://example.com/transcript'},
+            headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']}
+        )
+
+        self.assertEqual(second.status_code, 304)
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_changed_result_returns_body(self, mock_scrape, mock_analyze):
+        """Test that a stale ETag gets the new result."""
+        mock_scrape.return_value = TRANSCRIPT
+        mock_analyze.return_value = dict(RESULT)
+
+        response = self.client.post(
+            '/analyze', json={'url': 'https://example.com/transcript'}, headers={'If-None-Match': '"stale"'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['sentiment'], 'Positive')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+    def test_errors_have_no_etag(self):
+        """Test that error responses are never validated."""
+        response = self.client.post('/analyze', json={})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('ETag', response.headers)
+
+
+class TestStaticAssets(unittest.TestCase):
+    """Test cases for fingerprinted static asset URLs."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+
+    def asset_url(self, filename):
+        from app import app, static_assets
+        with app.test_request_context():
+            return static_assets.url(filename)
+
+    def test_index_links_fingerprinted_assets(self):
+        """Test that the page links script and stylesheet by content hash."""
+        page = self.client.get('/').get_data(as_text=True)
+
+        self.assertIn(self.asset_url('script.js'), page)
+        self.assertIn(self.asset_url('style.css'), page)
+        self.assertRegex(self.asset_url('script.js'), r'^/assets/script\.[0-9a-f]{12}\.js$')
+
+    def test_fingerprinted_asset_is_immutable(self):
+        """Test that a current fingerprint is cached long-term."""
+        from app import app
+        response = self.client.get(self.asset_url('script.js'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('max-age=31536000', response.headers['Cache-Control'])
+        with open(os.path.join(app.static_folder, 'script.js'), 'rb') as handle:
+            self.assertEqual(response.data, handle.read())
+        response.close()
+
+    def test_revalidation_returns_304(self):
+        """Test that an asset request with its ETag is answered with 304."""
+        url = self.asset_url('style.css')
+        etag = self.client.get(url).headers['ETag']
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_outdated_fingerprint_not_cached(self):
+        """Test that an old fingerprint serves the current file without long caching."""
+        response = self.client.get('/assets/script.000000000000.js')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+    def test_unknown_asset_404(self):
+        """Test that missing files and path escapes are not served."""
+        self.assertEqual(self.client.get('/assets/missing.000000000000.js').status_code, 404)
+        self.assertEqual(self.client.get('/assets/../app.000000000000.py').status_code, 404)
+
+    def test_assets_compressed(self):
+        """Test that text assets are gzipped for clients that accept it."""
+        response = self.client.get(self.asset_url('script.js'), headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertTrue(response.headers['ETag'].endswith('-gzip"'))
+        revalidated = self.client.get(
+            self.asset_url('script.js'),
+            headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Automated tests for incremental re-analysis of live or revised transcripts.
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BASE_TRANSCRIPT = (
+    "Good morning and welcome to the call. Revenue grew 18% to $2.1 billion. "
+    "Operating margin improved to 22%. Supply chain issues hurt hardware sales. "
+    "We expect growth to continue next quarter."
+)
+
+SAMPLE_RESULT = {
+    "sentiment": "Positive",
+    "good_news": ["Revenue grew 18%"],
+    "bad_news": ["Hardware supply issues"],
+    "key_promises": ["Continued growth"],
+    "verdict": "Solid quarter."
+}
+
+
+class TestSectionDiff(unittest.TestCase):
+    """Test cases for section splitting and diffing."""
+
+    def test_split_sections(self):
+        """Test that cleaned text is split on sentence boundaries."""
+        from incremental import split_sections
+        sections = split_sections(BASE_TRANSCRIPT)
+        self.assertEqual(len(sections), 5)
+        self.assertEqual(sections[1], "Revenue grew 18% to $2.1 billion.")
+
+    def test_identical_text_has_no_changes(self):
+        """Test that identical versions produce an empty diff."""
+        from incremental import diff_sections
+        diff = diff_sections(BASE_TRANSCRIPT, BASE_TRANSCRIPT)
+        self.assertEqual(diff['added'], [])
+        self.assertEqual(diff['removed'], [])
+        self.assertEqual(diff['changed_ratio'], 0.0)
+
+    def test_appended_and_revised_sections(self):
+        """Test that appended and corrected sections are reported."""
+        from incremental import diff_sections
+        revised = BASE_TRANSCRIPT.replace("22%", "23%") + " Q: What about pricing? A: Pricing is stable."
+        diff = diff_sections(BASE_TRANSCRIPT, revised)
+        self.assertIn("Operating margin improved to 23%.", diff['added'])
+        self.assertIn("Operating margin improved to 22%.", diff['removed'])
+        self.assertTrue(any("Pricing is stable" in section for section in diff['added']))
+        self.assertGreater(diff['changed_ratio'], 0)
+        self.assertLess(diff['changed_ratio'], 0.5)
+
+
+class TestTranscriptStore(unittest.TestCase):
+    """Test cases for the per-URL transcript store."""
+
+    def test_store_is_bounded(self):
+        """Test that least recently used URLs are evicted."""
+        from incremental import TranscriptStore
+        store = TranscriptStore(max_entries=2)
+        store.put("https://a", "a", {})
+        store.put("https://b", "b", {})
+        store.get("https://a")
+        store.put("https://c", "c", {})
+        self.assertIsNotNone(store.get("https://a"))
+        self.assertIsNone(store.get("https://b"))
+        self.assertIsNotNone(store.get("https://c"))
+
+
+class TestIncrementalEndpoint(unittest.TestCase):
+    """Test cases for incremental re-analysis through /analyze."""
+
+    def setUp(self):
+        """Set up test client with an empty transcript store."""
+        from app import app, transcript_store
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+
+    @patch('app.update_analysis_with_ai')
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_unchanged_transcript_reuses_result(self, mock_scrape, mock_analyze, mock_update):
+        """Test that an unchanged re-fetch does not call the model again."""
+        mock_scrape.return_value = BASE_TRANSCRIPT
+        mock_analyze.return_value = SAMPLE_RESULT
+
+        for _ in range(2):
+            response = self.client.post('/analyze', json={'url': 'https://example.com/live'})
+            self.assertEqual(response.status_code, 200)
+
+        mock_analyze.assert_called_once()
+        mock_update.assert_not_called()
+
+    @patch('app.update_analysis_with_ai')
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_small_update_sends_only_changes(self, mock_scrape, mock_analyze, mock_update):
+        """Test that a partial update is merged into the previous result."""
+        updated = BASE_TRANSCRIPT + " Q: Any update on buybacks? A: We will repurchase $500 million."
+        mock_scrape.side_effect = [BASE_TRANSCRIPT, updated]
+        mock_analyze.return_value = SAMPLE_RESULT
+        mock_update.return_value = dict(SAMPLE_RESULT, key_promises=["$500 million buyback"])
+
+        self.client.post('/analyze', json={'url': 'https://example.com/live'})
+        response = self.client.post('/analyze', json={'url': 'https://example.com/live'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['key_promises'], ["$500 million buyback"])
+        mock_analyze.assert_called_once()
+        previous_result, diff = mock_update.call_args[0]
+        self.assertEqual(previous_result, SAMPLE_RESULT)
+        self.assertTrue(all("Revenue grew" not in section for section in diff['added']))
+
+    @patch('app.update_analysis_with_ai')
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_incremental_can_be_disabled(self, mock_scrape, mock_analyze, mock_update):
+        """Test that incremental=false forces a full re-analysis."""
+        mock_scrape.return_value = BASE_TRANSCRIPT
+        mock_analyze.return_value = SAMPLE_RESULT
+
+        self.client.post('/analyze', json={'url': 'https://example.com/live'})
+        self.client.post('/analyze', json={'url': 'https://example.com/live', 'incremental': False})
+
+        self.assertEqual(mock_analyze.call_count, 2)
+        mock_update.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Automated tests for lazy dependency loading.
+"""
+
+import subprocess
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def loaded_after(code, preload=False):
+    """Run code in a fresh interpreter and return the printed module names."""
+    env = dict(os.environ, PRELOAD_DEPENDENCIES='1' if preload else '0')
+    result = subprocess.run([sys.executable, '-c', code], env=env, cwd=HERE,
+                            capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+CHECK = (
+    "import sys, app; "
+    "print(' '.join(m for m in ('google.generativeai', 'requests', 'bs4', 'numpy', 'pypdf', 'charset_normalizer') if m in sys.modules))"
+)
+
+
+class TestLazyModule(unittest.TestCase):
+    """Test cases for the LazyModule stand-in."""
+
+    def test_import_deferred_until_attribute_access(self):
+        """Test that nothing is imported until an attribute is read."""
+        from lazy import lazy_import
+        module = lazy_import('json')
+        self.assertFalse(module.loaded)
+        self.assertEqual(module.dumps([1]), '[1]')
+        self.assertTrue(module.loaded)
+        self.assertIs(module.load(), sys.modules['json'])
+
+    def test_patching_reaches_real_module(self):
+        """Test that patch.object on the stand-in patches the real module."""
+        import json
+        from lazy import lazy_import
+        module = lazy_import('json')
+        with patch.object(module, 'dumps', return_value='patched'):
+            self.assertEqual(json.dumps([1]), 'patched')
+        self.assertEqual(json.dumps([1]), '[1]')
+
+    def test_missing_optional_module(self):
+        """Test that a missing optional module is None and a required one fails on use."""
+        from lazy import lazy_import
+        self.assertIsNone(lazy_import('no_such_module_xyz', optional=True))
+        missing = lazy_import('no_such_module_xyz')
+        with self.assertRaises(ImportError):
+            missing.anything
+
+
+class TestAppStartup(unittest.TestCase):
+    """Test cases for what importing the app loads."""
+
+    def test_import_skips_heavy_dependencies(self):
+        """Test that importing app does not import the SDK, scraper or parsers."""
+        self.assertEqual(loaded_after(CHECK), set())
+
+    def test_preload_imports_dependencies(self):
+        """Test that PRELOAD_DEPENDENCIES=1 imports them and compiles the rules."""
+        loaded = loaded_after(CHECK + "; import domain_rules; print(domain_rules.rules._rules is not None)", preload=True)
+        self.assertTrue({'google.generativeai', 'requests', 'bs4', 'True'} <= loaded)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Automated tests for multi-page transcript following.
+"""
+
+import unittest
+import os
+import sys
+import threading
+from unittest.mock import patch, Mock
+from bs4 import BeautifulSoup
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BASE = "https://transcripts.example.com/acme-q3-call"
+
+
+def page_html(number, total=4, nav=True):
+    """Build one page of a paginated transcript."""
+    body = f"<p>Part {number}: " + f"Revenue discussion for section {number} continues here. " * 4 + "</p>"
+    links = ''
+    if nav:
+        links = f'<div class="pager">Page {number} of {total} '
+        if number < total:
+            links += f'<a rel="next" href="{BASE}?page={number + 1}">Next</a>'
+        links += '</div>'
+    return f"<html><body>{body}{links}</body></html>"
+
+
+class TestPageLinkDetection(unittest.TestCase):
+    """Test cases for finding the following pages of a transcript."""
+
+    def links(self, html, url=BASE, **kwargs):
+        from pagination import find_page_links
+        return find_page_links(BeautifulSoup(html, 'html.parser'), url, **kwargs)
+
+    def test_total_expands_next_link_pattern(self):
+        """Test that "page 1 of 4" plus rel=next yields every page at once."""
+        self.assertEqual(self.links(page_html(1)), [f"{BASE}?page={n}" for n in (2, 3, 4)])
+
+    def test_later_page_and_page_cap(self):
+        """Test starting from a later page and capping the page count."""
+        self.assertEqual(self.links(page_html(2), url=f"{BASE}?page=2"), [f"{BASE}?page={n}" for n in (3, 4)])
+        self.assertEqual(self.links(page_html(1, total=30), max_pages=3), [f"{BASE}?page={n}" for n in (2, 3)])
+
+    def test_rel_next_without_total(self):
+        """Test that a bare rel=next link is followed."""
+        html = '<html><head><link rel="next" href="/acme-q3-call/2"></head><body>Text</body></html>'
+        self.assertEqual(self.links(html), [f"{BASE}/2"])
+
+    def test_numbered_links(self):
+        """Test numbered pager links, stopping at gaps and ignoring other hosts."""
+        html = (f'<a href="{BASE}/page/2">2</a><a href="{BASE}/page/3">3</a><a href="{BASE}/page/5">5</a>'
+                f'<a href="https://ads.example.net/page/4">4</a>')
+        self.assertEqual(self.links(html), [f"{BASE}/page/2", f"{BASE}/page/3"])
+
+    def test_unrelated_numbers_are_ignored(self):
+        """Test that footnote-style number links are not treated as pages."""
+        html = '<p>Revenue grew<a href="#fn2">2</a> and margins<a href="/notes/3">3</a>.</p>'
+        self.assertEqual(self.links(html), [])
+
+
+class TestPaginatedScrape(unittest.TestCase):
+    """Test cases for concurrent fetching and stitching of pages."""
+
+    def mock_pages(self, mock_get, pages, fail=()):
+        """Serve ``pages`` ({url: html}) from the mocked requests.get."""
+        def get(url, **kwargs):
+            response = Mock()
+            response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+            response.content = pages[url].encode('utf-8')
+            if url in fail:
+                response.raise_for_status.side_effect = Exception("503 Service Unavailable")
+            else:
+                response.raise_for_status.return_value = None
+            return response
+        mock_get.side_effect = get
+
+    @patch('requests.get')
+    def test_pages_are_stitched_in_order(self, mock_get):
+        """Test that all pages are fetched and joined in page order."""
+        from app import scrape_text_from_url
+        pages = {BASE: page_html(1)}
+        pages.update({f"{BASE}?page={n}": page_html(n) for n in (2, 3, 4)})
+        self.mock_pages(mock_get, pages)
+
+        text = scrape_text_from_url(BASE)
+
+        positions = [text.index(f"Part {n}:") for n in (1, 2, 3, 4)]
+        self.assertEqual(positions, sorted(positions))
+        self.assertEqual(mock_get.call_count, 4)
+
+    @patch('requests.get')
+    def test_following_pages_fetched_concurrently(self, mock_get):
+        """Test that known pages are requested in parallel."""
+        from app import scrape_text_from_url
+        pages = {BASE: page_html(1)}
+        pages.update({f"{BASE}?page={n}": page_html(n) for n in (2, 3, 4)})
+        self.mock_pages(mock_get, pages)
+        serve = mock_get.side_effect
+        barrier = threading.Barrier(3, timeout=5)
+
+        def get(url, **kwargs):
+            if url != BASE:
+                barrier.wait()  # Deadlocks (and times out) unless all three run at once
+            return serve(url, **kwargs)
+        mock_get.side_effect = get
+
+        self.assertIn("Part 4:", scrape_text_from_url(BASE))
+
+    @patch('requests.get')
+    def test_rel_next_chain_and_failure(self, mock_get):
+        """Test chained rel=next pages and stopping at a failed page."""
+        from app import scrape_text_from_url
+        pages = {}
+        for n in range(1, 5):
+            url = BASE if n == 1 else f"{BASE}/{n}"
+            pages[url] = page_html(n, nav=False).replace(
+                '</body>', f'<a rel="next" href="{BASE}/{n + 1}">Next</a></body>')
+        self.mock_pages(mock_get, pages, fail=(f"{BASE}/4",))
+
+        text = scrape_text_from_url(BASE)
+
+        self.assertIn("Part 3:", text)
+        self.assertNotIn("Part 4:", text)
+
+    @patch('app.MAX_TRANSCRIPT_BYTES', 800)
+    @patch('requests.get')
+    def test_byte_cap(self, mock_get):
+        """Test that stitching stops at the total byte limit."""
+        from app import scrape_text_from_url
+        pages = {BASE: page_html(1)}
+        pages.update({f"{BASE}?page={n}": page_html(n) for n in (2, 3, 4)})
+        self.mock_pages(mock_get, pages)
+
+        text = scrape_text_from_url(BASE)
+
+        self.assertIn("Part 2:", text)
+        self.assertNotIn("Part 3:", text)
+
+    @patch('requests.get')
+    def test_deadline_bounds_fetches(self, mock_get):
+        """Test that fetch timeouts shrink to the request's remaining budget."""
+        from app import scrape_text_from_url
+        from deadline import Deadline
+        pages = {BASE: page_html(1)}
+        pages.update({f"{BASE}?page={n}": page_html(n) for n in (2, 3, 4)})
+        self.mock_pages(mock_get, pages)
+
+        scrape_text_from_url(BASE, deadline=Deadline(5))
+
+        for call in mock_get.call_args_list:
+            self.assertLessEqual(call.kwargs['timeout'], 5)
+
+    @patch('requests.get')
+    def test_expired_deadline_stops_before_next_pages(self, mock_get):
+        """Test that no following page is fetched once the deadline has passed."""
+        from app import scrape_text_from_url
+        from deadline import Deadline, RequestCancelled
+        pages = {BASE: page_html(1)}
+        pages.update({f"{BASE}?page={n}": page_html(n) for n in (2, 3, 4)})
+        self.mock_pages(mock_get, pages)
+        deadline = Deadline(60)
+        serve = mock_get.side_effect
+
+        def get(url, **kwargs):
+            deadline.expires_at = 0  # The first page used up the budget
+            return serve(url, **kwargs)
+        mock_get.side_effect = get
+
+        with self.assertRaises(RequestCancelled) as raised:
+            scrape_text_from_url(BASE, deadline=deadline)
+
+        self.assertEqual(raised.exception.stage, 'pagination')
+        self.assertEqual(mock_get.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Automated tests for page parsing on the process pool.
+"""
+
+import unittest
+import os
+import sys
+from multiprocessing import shared_memory
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PARAGRAPH = "<p>Revenue grew 18% year-over-year to $2.1 billion, exceeding our guidance.</p>\n"
+
+
+def build_page(repeats):
+    body = PARAGRAPH * repeats
+    return f"<html><head><script>var x = 1;</script></head><body>{body}</body></html>".encode('utf-8')
+
+
+class TestParsePool(unittest.TestCase):
+    """Test cases for inline and offloaded parsing."""
+
+    @classmethod
+    def setUpClass(cls):
+        from parsing import ParsePool
+        # Offload anything over 10 KB; shared memory from 100 KB
+        cls.pool = ParsePool(workers=1, offload_bytes=10_000, shared_memory_bytes=100_000)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        from metrics import metrics
+        metrics.reset()
+
+    def parse(self, content):
+        return self.pool.parse(content, 'text/html; charset=utf-8', 'https://example.com/call')
+
+    def test_small_pages_stay_inline(self):
+        """Test that pages under the threshold are not sent to a worker."""
+        from metrics import metrics
+        text, links = self.parse(build_page(10))
+        self.assertIn("Revenue grew 18%", text)
+        self.assertNotIn('scrape.offloaded_pages', metrics.snapshot()['counters'])
+
+    def test_offloaded_result_matches_inline(self):
+        """Test that pickled and shared-memory offloads give the inline result."""
+        from parsing import html_to_text
+        from metrics import metrics
+        for content in (build_page(500), build_page(5000)):
+            self.assertGreater(len(content), 10_000)
+            self.assertEqual(self.parse(content),
+                             html_to_text(content, 'text/html; charset=utf-8', 'https://example.com/call'))
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['counters']['scrape.offloaded_pages'], 2)
+        # Worker timings are merged into this process's metrics
+        self.assertEqual(snapshot['timers']['scrape.parse']['count'], 4)
+
+    def test_shared_memory_is_released(self):
+        """Test that the shared memory block is unlinked after the parse."""
+        names = []
+        original = shared_memory.SharedMemory
+
+        def tracking(*args, **kwargs):
+            block = original(*args, **kwargs)
+            names.append(block.name)
+            return block
+
+        with patch('parsing.shared_memory.SharedMemory', side_effect=tracking):
+            self.parse(build_page(5000))
+        self.assertEqual(len(names), 1)
+        with self.assertRaises(FileNotFoundError):
+            original(name=names[0])
+
+    def test_disabled_pool_parses_inline(self):
+        """Test that PARSE_WORKERS=0 keeps every page inline."""
+        from parsing import ParsePool
+        pool = ParsePool(workers=0, offload_bytes=1)
+        self.assertIn("Revenue grew 18%", pool.parse(build_page(500), '', 'https://example.com/call')[0])
+        self.assertIsNone(pool._executor)
+
+
+class TestMetricsMerge(unittest.TestCase):
+    """Test cases for shipping worker metrics to the parent."""
+
+    def test_drain_and_merge(self):
+        """Test that drained values add up in another registry."""
+        from metrics import Metrics
+        worker, parent = Metrics(), Metrics()
+        worker.observe('scrape.parse', 0.5)
+        worker.incr('scrape.rule_hits')
+        parent.observe('scrape.parse', 0.1)
+        parent.merge(worker.drain())
+        snapshot = parent.snapshot()
+        self.assertEqual(snapshot['timers']['scrape.parse']['count'], 2)
+        self.assertEqual(snapshot['timers']['scrape.parse']['max_ms'], 500.0)
+        self.assertEqual(snapshot['counters'], {'scrape.rule_hits': 1})
+        self.assertEqual(worker.snapshot(), {'timers': {}, 'counters': {}})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
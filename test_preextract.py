@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Automated tests for figure and guidance pre-extraction and compact input mode.
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+FILLER = "Thank you, operator, and good morning everyone. It is great to be here with you today. "
+FACTS = (
+    "Revenue grew 18% year-over-year to $2.1 billion. "
+    "Diluted EPS was $1.42, up from $1.10 a year ago. "
+    "Operating margin expanded 200 basis points to 22%. "
+    "We are raising our full-year revenue guidance to $8.2 to $8.4 billion. "
+)
+
+
+class TestPreExtraction(unittest.TestCase):
+    """Test cases for sentence scoring."""
+
+    def test_figures_outscore_pleasantries(self):
+        """Test that factual sentences rank above small talk."""
+        from preextract import score_sentences
+        scores = score_sentences([
+            "Thank you, operator, and good morning everyone.",
+            "Revenue grew 18% year-over-year to $2.1 billion."
+        ])
+        self.assertGreater(scores[1], scores[0])
+
+    def test_scoring_without_numpy(self):
+        """Test that the pure Python scorer matches the NumPy scorer."""
+        import preextract
+        sentences = [s + "." for s in (FILLER + FACTS).split(". ") if s]
+        expected = preextract.score_sentences(sentences)
+        with patch.object(preextract, 'np', None):
+            actual = preextract.score_sentences(sentences)
+        for first, second in zip(expected, actual):
+            self.assertAlmostEqual(first, second, places=4)
+
+    def test_condense_keeps_facts_within_budget(self):
+        """Test that condensing keeps the figures and respects the budget."""
+        from preextract import condense_transcript
+        text = FILLER * 40 + FACTS + FILLER * 40
+        condensed = condense_transcript(text, max_chars=600)
+        self.assertLessEqual(len(condensed), 600)
+        self.assertIn("$2.1 billion", condensed)
+        self.assertIn("Diluted EPS was $1.42", condensed)
+        self.assertLess(condensed.index("Revenue grew"), condensed.index("Diluted EPS"))
+        # Repeated filler appears at most once
+        self.assertLessEqual(condensed.count("great to be here"), 1)
+
+    def test_short_text_is_unchanged(self):
+        """Test that text within budget is passed through untouched."""
+        from preextract import condense_transcript
+        self.assertEqual(condense_transcript(FACTS, max_chars=6000), FACTS)
+
+
+class TestCompactMode(unittest.TestCase):
+    """Test cases for the compact input mode of /analyze."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app, transcript_store
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+
+    def test_compact_analysis_sends_condensed_text(self):
+        """Test that compact mode sends the condensed transcript to the model."""
+        from app import analyze_text_with_ai
+        from providers import FakeProvider
+        provider = FakeProvider()
+        text = FILLER * 200 + FACTS
+
+        with patch('app.model_provider', provider):
+            result = analyze_text_with_ai(text, compact=True)
+
+        body = provider.calls[0][1]
+        self.assertIn("$2.1 billion", body)
+        self.assertLess(len(body), 7000)
+        self.assertEqual(result['input_mode'], 'compact')
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_input_mode_selected_per_request(self, mock_scrape, mock_analyze):
+        """Test that the endpoint passes the requested input mode."""
+        mock_scrape.return_value = FACTS
+        mock_analyze.return_value = {"sentiment": "Positive", "good_news": [], "bad_news": [],
+                                     "key_promises": [], "verdict": "ok"}
+
+        response = self.client.post('/analyze', json={'url': 'https://example.com/t', 'input_mode': 'compact'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(mock_analyze.call_args.kwargs['compact'])
+
+    def test_invalid_input_mode(self):
+        """Test that unknown input modes are rejected."""
+        response = self.client.post('/analyze', json={'url': 'https://example.com/t', 'input_mode': 'tiny'})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
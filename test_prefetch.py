@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Automated tests for shared concurrent scrapes and speculative prefetch.
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+from unittest.mock import patch, ANY
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSCRIPT = (
+    "Good morning everyone, and thank you for joining our Q3 2024 earnings call. "
+    "Revenue grew 18% year-over-year to $2.1 billion, exceeding our guidance. "
+    "Our cloud division delivered record growth and strong margins. "
+    "Supply chain disruptions caused a 5% decline in the hardware segment. "
+    "Increased competition is putting pressure on pricing. "
+    "We expect revenue growth to continue next quarter. "
+    "We plan to open three new offices in Europe by 2025. "
+    "Q: How do you see the competitive landscape? "
+    "A: We believe our technology gives us a durable advantage."
+)
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for shared concurrent scrapes."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that concurrent callers with the same key run the function once."""
+        from singleflight import SingleFlight
+        flight = SingleFlight()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return "page text"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("url", slow_fetch)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["page text"] * 4)
+
+    def test_errors_are_shared_and_not_cached(self):
+        """Test that failures propagate and the next call runs again."""
+        from singleflight import SingleFlight
+        flight = SingleFlight()
+
+        def failing():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("url", failing)
+        self.assertEqual(flight.do("url", lambda: "ok"), "ok")
+
+    def test_kept_result_is_taken_once(self):
+        """Test that a result started with keep goes to one taker, then is dropped."""
+        from singleflight import SingleFlight
+        flight = SingleFlight()
+        self.assertEqual(flight.do("url", lambda: "prefetched", keep=60), "prefetched")
+        # Callers that do not take it run the function themselves
+        self.assertEqual(flight.do("url", lambda: "preview"), "preview")
+        self.assertEqual(flight.do("url", lambda: "fresh", take=True), "prefetched")
+        self.assertEqual(flight.do("url", lambda: "fresh", take=True), "fresh")
+
+    def test_kept_result_expires(self):
+        """Test that an untaken result is dropped after keep seconds."""
+        from singleflight import SingleFlight
+        flight = SingleFlight()
+        flight.do("url", lambda: "prefetched", keep=0.2)
+        time.sleep(0.25)
+        self.assertEqual(flight.do("url", lambda: "fresh", take=True), "fresh")
+
+    def test_joined_take_is_not_kept(self):
+        """Test that a result claimed by a taker while running is not held afterwards."""
+        from singleflight import SingleFlight
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "prefetched"
+
+        prefetch = threading.Thread(target=lambda: flight.do("url", slow, keep=60))
+        prefetch.start()
+        started.wait(5)
+        taker = threading.Thread(target=lambda: self.assertEqual(flight.do("url", None, take=True), "prefetched"))
+        taker.start()
+        time.sleep(0.05)
+        release.set()
+        prefetch.join(5)
+        taker.join(5)
+
+        self.assertEqual(flight.do("url", lambda: "fresh", take=True), "fresh")
+
+    def test_failed_calls_are_not_kept(self):
+        """Test that a failure started with keep is not served to later callers."""
+        from singleflight import SingleFlight
+        flight = SingleFlight()
+
+        def failing():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("url", failing, keep=60)
+        self.assertEqual(flight.do("url", lambda: "ok"), "ok")
+
+
+class TestPrefetch(unittest.TestCase):
+    """Test cases for speculative scrapes started from the URL field."""
+
+    def setUp(self):
+        """Set up test client and an empty single-flight registry."""
+        import app
+        from singleflight import SingleFlight
+        from metrics import metrics
+        self.client = app.app.test_client()
+        app.app.config['TESTING'] = True
+        app.transcript_store.clear()
+        metrics.reset()
+        patcher = patch.object(app, 'scrape_flight', SingleFlight())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait_for(self, counter):
+        from metrics import metrics
+        for _ in range(100):
+            if metrics.snapshot()['counters'].get(counter):
+                return
+            time.sleep(0.02)
+        self.fail(f"{counter} was not recorded")
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_analyze_reuses_finished_prefetch(self, mock_scrape, mock_analyze):
+        """Test that /analyze after a finished prefetch does not scrape again."""
+        mock_scrape.return_value = TRANSCRIPT
+        mock_analyze.return_value = {'sentiment': 'Positive'}
+
+        response = self.client.post('/prefetch', json={'url': ' https://example.com/prefetched '})
+        self.assertEqual(response.status_code, 202)
+        self.wait_for('prefetch.completed')
+        response = self.client.post('/analyze', json={'url': 'https://example.com/prefetched'})
+
+        self.assertEqual(response.status_code, 200)
+        mock_scrape.assert_called_once_with('https://example.com/prefetched', deadline=ANY)
+        mock_analyze.assert_called_once()
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_prefetch_is_used_once(self, mock_scrape, mock_analyze):
+        """Test that a second /analyze after the prefetch was used scrapes again."""
+        mock_scrape.return_value = TRANSCRIPT
+        mock_analyze.return_value = {'sentiment': 'Positive'}
+
+        self.client.post('/prefetch', json={'url': 'https://example.com/live'})
+        self.wait_for('prefetch.completed')
+        self.client.post('/analyze', json={'url': 'https://example.com/live'})
+        self.assertEqual(mock_scrape.call_count, 1)
+        response = self.client.post('/analyze', json={'url': 'https://example.com/live'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_scrape.call_count, 2)
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_analyze_joins_running_prefetch(self, mock_scrape, mock_analyze):
+        """Test that /analyze during a prefetch waits for it instead of fetching again."""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_scrape(url, deadline=None):
+            started.set()
+            release.wait(5)
+            return TRANSCRIPT
+
+        mock_scrape.side_effect = slow_scrape
+        mock_analyze.return_value = {'sentiment': 'Positive'}
+        self.client.post('/prefetch', json={'url': 'https://example.com/slow'})
+        self.assertTrue(started.wait(5))
+
+        responses = []
+        request = threading.Thread(target=lambda: responses.append(
+            self.client.post('/analyze', json={'url': 'https://example.com/slow'})))
+        request.start()
+        time.sleep(0.1)
+        release.set()
+        request.join(5)
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(mock_scrape.call_count, 1)
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_failed_prefetch_is_retried(self, mock_scrape, mock_analyze):
+        """Test that a failed prefetch leaves /analyze to fetch and report on its own."""
+        mock_scrape.side_effect = [Exception("503 Service Unavailable"), TRANSCRIPT]
+        mock_analyze.return_value = {'sentiment': 'Positive'}
+        self.client.post('/prefetch', json={'url': 'https://example.com/flaky'})
+        self.wait_for('prefetch.failed')
+
+        response = self.client.post('/analyze', json={'url': 'https://example.com/flaky'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_scrape.call_count, 2)
+
+    @patch('app.scrape_text_from_url')
+    def test_prefetch_validation_and_limits(self, mock_scrape):
+        """Test URL validation, the pending limit and disabling prefetch."""
+        self.assertEqual(self.client.post('/prefetch', data='not json').status_code, 400)
+        self.assertEqual(self.client.post('/prefetch', json={}).status_code, 400)
+        response = self.client.post('/prefetch', json={'url': 'ftp://example.com/call'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('HTTP', response.get_json()['error'])
+        self.assertEqual(self.client.post('/prefetch', json={'url': 'example.com'}).status_code, 400)
+        with patch('app.PREFETCH_MAX_PENDING', 0):
+            self.assertEqual(self.client.post('/prefetch', json={'url': 'https://example.com/a'}).status_code, 429)
+        with patch('app.PREFETCH_KEEP_SECONDS', 0):
+            response = self.client.post('/prefetch', json={'url': 'https://example.com/a'})
+            self.assertEqual(response.get_json()['status'], 'disabled')
+        mock_scrape.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Automated tests for versioned prompt templates.
+"""
+
+import unittest
+import os
+import sys
+import json
+from unittest.mock import patch, Mock, MagicMock
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+VALID_RESPONSE = json.dumps({
+    "sentiment": "Positive",
+    "good_news": ["Revenue up"],
+    "bad_news": ["Costs up"],
+    "key_promises": ["Buybacks"],
+    "verdict": "Good quarter."
+})
+
+
+class TestPromptRegistry(unittest.TestCase):
+    """Test cases for the prompt template registry."""
+
+    def test_default_template(self):
+        """Test that the default template is the latest earnings call prompt."""
+        from prompts import registry
+        template = registry.get()
+        self.assertEqual(template.name, 'earnings_call')
+        self.assertEqual(template.id, f"earnings_call@{template.version}")
+
+    def test_latest_version_is_selected(self):
+        """Test that the highest registered version wins when none is requested."""
+        from prompts import PromptRegistry, PromptTemplate
+        registry = PromptRegistry(default_name='demo')
+        registry.register(PromptTemplate('demo', 1, "Old instructions", "{text}"))
+        registry.register(PromptTemplate('demo', 2, "New instructions", "{text}"))
+        self.assertEqual(registry.get().version, 2)
+        self.assertEqual(registry.get('demo', 1).instructions, "Old instructions")
+        self.assertEqual(registry.get('demo', '1').version, 1)
+
+    def test_unknown_template(self):
+        """Test that unknown names and versions raise KeyError."""
+        from prompts import registry
+        with self.assertRaises(KeyError):
+            registry.get('quarterly_poem')
+        with self.assertRaises(KeyError):
+            registry.get('earnings_call', 999)
+        for name, version in ((['earnings_call'], None), ('earnings_call', [1]), ('earnings_call', {'v': 1})):
+            with self.assertRaises(KeyError):
+                registry.get(name, version)
+
+    def test_duplicate_registration(self):
+        """Test that a template id cannot be registered twice."""
+        from prompts import PromptRegistry, PromptTemplate
+        registry = PromptRegistry()
+        registry.register(PromptTemplate('demo', 1, "Instructions", "{text}"))
+        with self.assertRaises(ValueError):
+            registry.register(PromptTemplate('demo', 1, "Other", "{text}"))
+
+    def test_prefix_is_static(self):
+        """Test that the instruction prefix never contains transcript text."""
+        from prompts import registry
+        template = registry.get('investor_day')
+        first = template.render(text="Transcript A {with braces}")
+        second = template.render(text="Transcript B")
+        self.assertEqual(first[0], second[0])
+        self.assertNotIn("Transcript A", first[0])
+        self.assertIn("Transcript A {with braces}", first[1])
+
+
+class TestPromptSelection(unittest.TestCase):
+    """Test cases for per-request prompt selection."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app, transcript_store
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_template_selected_per_request(self, mock_scrape, mock_analyze):
+        """Test that the requested template is passed to the analysis."""
+        mock_scrape.return_value = "Investor day transcript text."
+        mock_analyze.return_value = json.loads(VALID_RESPONSE)
+
+        response = self.client.post('/analyze', json={
+            'url': 'https://example.com/investor-day',
+            'prompt': 'investor_day'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_analyze.call_args.kwargs['template'].name, 'investor_day')
+
+    def test_unknown_template_rejected(self):
+        """Test that an unknown template name or malformed version is a client error."""
+        response = self.client.post('/analyze', json={
+            'url': 'https://example.com/transcript',
+            'prompt': 'does_not_exist'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown prompt template', response.get_json()['error'])
+        response = self.client.post('/analyze', json={
+            'url': 'https://example.com/transcript',
+            'prompt_version': [1]
+        })
+        self.assertEqual(response.status_code, 400)
+
+    @patch('google.generativeai.configure')
+    @patch('google.generativeai.GenerativeModel')
+    @patch.dict(os.environ, {'GOOGLE_API_KEY': 'test_key'})
+    def test_result_tagged_with_prompt_version(self, mock_model_class, mock_configure):
+        """Test that results record which prompt produced them."""
+        from app import analyze_text_with_ai
+        from prompts import registry
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text=VALID_RESPONSE)
+        mock_model_class.return_value = mock_model
+
+        result = analyze_text_with_ai("Transcript text")
+
+        template = registry.get()
+        self.assertEqual(result['prompt_version'], template.id)
+        contents = mock_model.generate_content.call_args[0][0]
+        self.assertEqual(contents[0], template.instructions)
+        self.assertIn("Transcript text", contents[1])
+
+
+class TestPrefixCaching(unittest.TestCase):
+    """Test cases for provider-side caching of the static prefix."""
+
+    def setUp(self):
+        """Use an unhedged Gemini provider with empty prefix caches."""
+        from providers import GeminiProvider
+        self.provider = GeminiProvider()
+
+    @patch('google.generativeai.configure')
+    @patch('google.generativeai.GenerativeModel')
+    @patch.dict(os.environ, {'GOOGLE_API_KEY': 'test_key'})
+    def test_prefix_cached_once_when_supported(self, mock_model_class, mock_configure):
+        """Test that the prefix is uploaded once and only the body is sent."""
+        import app
+        import providers
+        caching = MagicMock()
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text=VALID_RESPONSE)
+        mock_model_class.from_cached_content.return_value = mock_model
+
+        with patch.object(providers.genai, 'caching', caching, create=True), \
+             patch('app.model_provider', self.provider):
+            app.analyze_text_with_ai("First transcript")
+            app.analyze_text_with_ai("Second transcript")
+
+        caching.CachedContent.create.assert_called_once()
+        contents = mock_model.generate_content.call_args[0][0]
+        self.assertEqual(len(contents), 1)
+        self.assertIn("Second transcript", contents[0])
+
+    @patch('google.generativeai.configure')
+    @patch('google.generativeai.GenerativeModel')
+    @patch.dict(os.environ, {'GOOGLE_API_KEY': 'test_key'})
+    def test_caching_failure_falls_back_to_full_prompt(self, mock_model_class, mock_configure):
+        """Test that a rejected cache falls back to sending the prefix inline."""
+        import app
+        import providers
+        caching = MagicMock()
+        caching.CachedContent.create.side_effect = Exception("Cached content is too small")
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text=VALID_RESPONSE)
+        mock_model_class.return_value = mock_model
+
+        with patch.object(providers.genai, 'caching', caching, create=True), \
+             patch('app.model_provider', self.provider):
+            result = app.analyze_text_with_ai("Transcript")
+
+        self.assertEqual(result['sentiment'], "Positive")
+        self.assertEqual(len(mock_model.generate_content.call_args[0][0]), 2)
+
+
+class TestResponseModes(unittest.TestCase):
+    """Test cases for brief and detailed answers and generation settings."""
+
+    def setUp(self):
+        """Set up test client and a fake model."""
+        from app import app, transcript_store
+        from providers import FakeProvider
+        from metrics import metrics
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+        metrics.reset()
+        long_answer = dict(json.loads(VALID_RESPONSE), good_news=[f"Highlight {n}" for n in range(8)])
+        self.provider = FakeProvider(responses=[json.dumps(long_answer)])
+
+    def analyze(self, **fields):
+        payload = dict({'text': "Revenue grew 18% year-over-year to $2.1 billion. " * 5}, **fields)
+        with patch('app.model_provider', self.provider):
+            return self.client.post('/analyze', json=payload)
+
+    def test_limits_go_in_the_body(self):
+        """Test that each mode's limits are in the request body and the prefix is shared."""
+        from prompts import registry, RESPONSE_MODES
+        template = registry.get()
+        brief = template.render(mode=RESPONSE_MODES['brief'], text="Transcript")
+        detailed = template.render(mode=RESPONSE_MODES['detailed'], text="Transcript")
+        self.assertEqual(brief[0], detailed[0])
+        self.assertIn('"good_news": at most 3 items, each at most 15 words', brief[1])
+        self.assertIn('"verdict": at most 150 words', detailed[1])
+        self.assertNotIn("Length limits", template.render(text="Transcript")[1])
+
+    def test_brief_mode(self):
+        """Test that brief mode caps generation and item counts and is reported."""
+        from metrics import metrics
+        response = self.analyze(response_mode='brief')
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()
+        self.assertEqual(result['response_mode'], 'brief')
+        self.assertEqual(len(result['good_news']), 3)
+        self.assertEqual(self.provider.configs[0]['max_output_tokens'], 8192)
+        self.assertIn("at most 50 words", self.provider.calls[0][1])
+        counters = metrics.snapshot()['counters']
+        self.assertEqual(counters['analysis.responses.brief'], 1)
+        self.assertGreater(counters['analysis.output_tokens.brief'], 0)
+
+    def test_modes_are_stored_separately(self):
+        """Test that a brief answer is not served for a detailed request of the same text."""
+        self.assertEqual(self.analyze(response_mode='brief').get_json()['response_mode'], 'brief')
+        result = self.analyze(response_mode='detailed').get_json()
+        self.assertEqual(result['response_mode'], 'detailed')
+        self.assertEqual(len(result['good_news']), 5)
+        self.assertEqual(len(self.provider.calls), 2)
+
+    def test_unknown_mode_rejected(self):
+        """Test that an unknown response mode is a client error."""
+        response = self.analyze(response_mode='verbose')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('response_mode', response.get_json()['error'])
+
+    @patch('google.generativeai.configure')
+    @patch('google.generativeai.GenerativeModel')
+    @patch.dict(os.environ, {'GOOGLE_API_KEY': 'test_key'})
+    def test_gemini_generation_config_and_usage(self, mock_model_class, mock_configure):
+        """Test that Gemini receives the generation settings and its token counts are recorded."""
+        import app
+        from providers import GeminiProvider
+        from metrics import metrics
+        mock_model = Mock()
+        usage = Mock(prompt_token_count=900, candidates_token_count=120)
+        mock_model.generate_content.return_value = Mock(text=VALID_RESPONSE, usage_metadata=usage)
+        mock_model_class.return_value = mock_model
+
+        with patch('app.model_provider', GeminiProvider(prefix_cache_ttl=0)), \
+             patch('app.GENERATION_TEMPERATURE', '0.2'), \
+             patch('app.GENERATION_STOP_SEQUENCES', ['\n\n\n']):
+            app.analyze_text_with_ai("Transcript text")
+
+        config = mock_model.generate_content.call_args.kwargs['generation_config']
+        self.assertEqual(config, {'max_output_tokens': 8192, 'temperature': 0.2, 'stop_sequences': ['\n\n\n']})
+        counters = metrics.snapshot()['counters']
+        self.assertEqual((counters['model.input_tokens'], counters['model.output_tokens']), (900, 120))
+
+
+    @patch('google.generativeai.configure')
+    @patch('google.generativeai.GenerativeModel')
+    @patch.dict(os.environ, {'GOOGLE_API_KEY': 'test_key'})
+    def test_truncated_gemini_answer_is_an_error(self, mock_model_class, mock_configure):
+        """Test that an answer cut off at max_output_tokens fails clearly, with or without text."""
+        import google.ai.generativelanguage as glm
+        from google.generativeai.types import generation_types
+        from providers import GeminiProvider
+        from prompts import registry, RESPONSE_MODES
+        from metrics import metrics
+        cut_off = glm.Candidate.FinishReason.MAX_TOKENS
+        partial = glm.Content(parts=[glm.Part(text='{"sentiment": "Positive", "good_news": ["Reve')])
+        provider = GeminiProvider(prefix_cache_ttl=0)
+        parts = registry.get().render(mode=RESPONSE_MODES['brief'], text="Transcript")
+
+        for candidate in (glm.Candidate(content=partial, finish_reason=cut_off),
+                          glm.Candidate(finish_reason=cut_off)):
+            mock_model_class.return_value.generate_content.return_value = \
+                generation_types.GenerateContentResponse.from_response(
+                    glm.GenerateContentResponse(candidates=[candidate]))
+            with self.assertRaisesRegex(Exception, 'output token limit'):
+                provider.generate(registry.get(), parts, config={'max_output_tokens': 8192})
+
+        self.assertEqual(metrics.snapshot()['counters']['model.truncated'], 2)
+
+    def test_prompt_has_one_item_count(self):
+        """Test that the latest templates leave item counts to the response mode."""
+        from prompts import registry, RESPONSE_MODES
+        for name in ('earnings_call', 'investor_day'):
+            prefix, body = registry.get(name).render(mode=RESPONSE_MODES['brief'], text="Transcript")
+            self.assertNotIn('3-5', prefix)
+            self.assertIn('"good_news": at most 3 items', body)
+
+
+class TestPackedAnalysis(unittest.TestCase):
+    """Test cases for packing several short transcripts into one model call."""
+
+    def test_pack_documents(self):
+        """Test grouping by token budget and document count, in order."""
+        from prompts import pack_documents
+        documents = [('a', 'x' * 400), ('b', 'x' * 400), ('c', 'x' * 4000), ('d', 'x' * 40), ('e', 'x' * 40)]
+        groups = pack_documents(documents, max_tokens=300, max_documents=2)
+        self.assertEqual([[doc_id for doc_id, _ in group] for group in groups], [['a', 'b'], ['c'], ['d', 'e']])
+
+    def test_render_batch_keeps_static_prefix(self):
+        """Test that the packed prompt's prefix does not depend on the documents."""
+        from prompts import registry
+        template = registry.get()
+        first = template.render_batch([('1', 'First call'), ('2', 'Second call')])
+        second = template.render_batch([('3', 'Third call')])
+        self.assertEqual(first[0], second[0])
+        self.assertTrue(first[0].startswith(template.instructions))
+        self.assertIn("=== Document 2 ===\nSecond call", first[1])
+
+    def test_packed_results_are_split(self):
+        """Test that one call analyzes a pack and each result is tagged and keyed by id."""
+        import app
+        from providers import FakeProvider
+        provider = FakeProvider()
+        documents = [(n, f"Short pre-announcement number {n}.") for n in range(5)]
+        with patch('app.model_provider', provider):
+            results = app.analyze_texts_with_ai(documents)
+        self.assertEqual(len(provider.calls), 1)
+        self.assertEqual(sorted(results), ['0', '1', '2', '3', '4'])
+        self.assertEqual(results['3']['prompt_version'], 'earnings_call@2')
+        self.assertNotIn('document_id', results['3'])
+
+    def test_missing_and_invalid_entries_fall_back(self):
+        """Test that documents left out of the answer get calls of their own."""
+        import app
+        from providers import FakeProvider
+        analysis = json.loads(VALID_RESPONSE)
+
+        def respond(parts):
+            if "=== Document" not in parts[1]:
+                return VALID_RESPONSE
+            # "b" is missing, "c" lacks required fields, an unknown id is ignored
+            return "Here you go: " + json.dumps([
+                dict(analysis, document_id='a'),
+                {'document_id': 'c', 'sentiment': 'Positive'},
+                dict(analysis, document_id='zzz'),
+            ])
+
+        provider = FakeProvider(responses=respond)
+        with patch('app.model_provider', provider):
+            results = app.analyze_texts_with_ai([('a', 'Call A.'), ('b', 'Call B.'), ('c', 'Call C.')])
+        self.assertEqual(len(provider.calls), 3)
+        self.assertEqual({doc_id: result['sentiment'] for doc_id, result in results.items()},
+                         {'a': 'Positive', 'b': 'Positive', 'c': 'Positive'})
+        self.assertIn("Call B.", provider.calls[1][1])
+
+    def test_unparseable_pack_falls_back_to_single_calls(self):
+        """Test that an answer that is not a JSON array sends every document on its own."""
+        import app
+        from providers import FakeProvider
+        provider = FakeProvider(responses=lambda parts: "Sorry" if "=== Document" in parts[1] else VALID_RESPONSE)
+        with patch('app.model_provider', provider):
+            results = app.analyze_texts_with_ai([('a', 'Call A.'), ('b', 'Call B.')])
+        self.assertEqual(len(provider.calls), 3)
+        self.assertEqual(set(results), {'a', 'b'})
+
+    def test_unavailable_model_propagates(self):
+        """Test that an unavailable model is raised rather than recorded per document."""
+        import app
+        from providers import FakeProvider, ModelUnavailableError
+        provider = FakeProvider(responses=[ModelUnavailableError("AI service is at capacity")])
+        with patch('app.model_provider', provider):
+            with self.assertRaises(ModelUnavailableError):
+                app.analyze_texts_with_ai([('a', 'Call A.'), ('b', 'Call B.')])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
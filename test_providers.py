@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Automated tests for model providers and hedged requests.
+"""
+
+import unittest
+import os
+import sys
+import json
+import time
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PARTS = ["Static instructions", "Transcript text"]
+
+
+def make_hedged(provider, samples=3, **overrides):
+    """Build a hedged provider that is already warmed up with fast samples."""
+    from providers import HedgedProvider
+    options = dict(percentile=90, max_hedge_ratio=0.5, min_samples=3, min_delay=0.05)
+    options.update(overrides)
+    hedged = HedgedProvider(provider, **options)
+    for _ in range(samples):
+        hedged._latencies.append(0.01)
+        hedged._history.append(False)
+    return hedged
+
+
+class TestFakeProvider(unittest.TestCase):
+    """Test cases for the fake provider."""
+
+    def test_default_response_is_valid_analysis(self):
+        """Test that the default fake response has the analysis schema."""
+        from providers import FakeProvider
+        result = json.loads(FakeProvider().generate(None, PARTS))
+        for field in ['sentiment', 'good_news', 'bad_news', 'key_promises', 'verdict']:
+            self.assertIn(field, result)
+
+    def test_scripted_responses_and_errors(self):
+        """Test that scripted responses are cycled and exceptions raised."""
+        from providers import FakeProvider
+        provider = FakeProvider(responses=["first", RuntimeError("quota exceeded")])
+        self.assertEqual(provider.generate(None, PARTS), "first")
+        with self.assertRaises(RuntimeError):
+            provider.generate(None, PARTS)
+        self.assertEqual(len(provider.calls), 2)
+
+    def test_unknown_provider_name(self):
+        """Test that an unknown provider name is rejected."""
+        from providers import create_provider
+        with self.assertRaises(ValueError):
+            create_provider('carrier-pigeon')
+
+    @patch.dict(os.environ, {'HEDGE_MAX_RATIO': '0'})
+    def test_hedging_can_be_disabled(self):
+        """Test that HEDGE_MAX_RATIO=0 guards the bare provider."""
+        from providers import create_provider, FakeProvider
+        self.assertIsInstance(create_provider('fake').provider, FakeProvider)
+
+
+class TestHedgedProvider(unittest.TestCase):
+    """Test cases for hedged requests."""
+
+    def test_no_hedging_without_samples(self):
+        """Test that calls run inline until enough latencies are known."""
+        from providers import FakeProvider, HedgedProvider
+        provider = FakeProvider(responses=["ok"])
+        hedged = HedgedProvider(provider, min_samples=5)
+        self.assertIsNone(hedged.hedge_delay())
+        self.assertEqual(hedged.generate(None, PARTS), "ok")
+        self.assertEqual(len(provider.calls), 1)
+
+    def test_slow_call_is_hedged(self):
+        """Test that a slow first call is raced by a second request."""
+        from providers import FakeProvider
+        provider = FakeProvider(
+            responses=["slow", "fast"],
+            delay=lambda call_index: 1.0 if call_index == 0 else 0
+        )
+        hedged = make_hedged(provider)
+
+        start = time.monotonic()
+        result = hedged.generate(None, PARTS)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(result, "fast")
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(hedged.stats()['recent_hedges'], 1)
+
+    def test_fast_call_is_not_hedged(self):
+        """Test that calls finishing before the deadline are not duplicated."""
+        from providers import FakeProvider
+        provider = FakeProvider(responses=["ok"])
+        hedged = make_hedged(provider)
+        self.assertEqual(hedged.generate(None, PARTS), "ok")
+        self.assertEqual(len(provider.calls), 1)
+
+    def test_hedge_rate_is_capped(self):
+        """Test that the share of hedged requests never exceeds the cap."""
+        from providers import FakeProvider
+        provider = FakeProvider(responses=["ok"], delay=0.15)
+        hedged = make_hedged(provider, samples=100, max_hedge_ratio=0.2)
+        hedged._history.clear()
+        hedged._history.extend([False] * 10)
+
+        for _ in range(5):
+            hedged.generate(None, PARTS)
+
+        stats = hedged.stats()
+        self.assertEqual(stats['recent_requests'], 15)
+        self.assertLessEqual(stats['recent_hedges'], 0.2 * stats['recent_requests'])
+        self.assertLess(len(provider.calls), 10)
+
+    def test_failed_call_falls_back_to_hedge(self):
+        """Test that the hedged request wins when the original fails late."""
+        from providers import FakeProvider
+        provider = FakeProvider(
+            responses=[RuntimeError("upstream reset"), "recovered"],
+            delay=lambda call_index: 0.2 if call_index == 0 else 0.3
+        )
+        hedged = make_hedged(provider)
+        self.assertEqual(hedged.generate(None, PARTS), "recovered")
+
+    def test_secondary_provider_used_for_hedge(self):
+        """Test that hedges can go to a different provider."""
+        from providers import FakeProvider
+        primary = FakeProvider(responses=["primary"], delay=1.0)
+        secondary = FakeProvider(responses=["secondary"])
+        hedged = make_hedged(primary, secondary=secondary)
+        hedged.secondary = secondary
+        self.assertEqual(hedged.generate(None, PARTS), "secondary")
+
+    def test_hedge_needs_a_free_slot(self):
+        """Test that no hedge is sent when the in-flight limit is reached."""
+        from providers import FakeProvider, GuardedProvider
+        provider = FakeProvider(responses=["slow"], delay=0.3)
+        hedged = make_hedged(provider)
+        hedged.slots = GuardedProvider(hedged, max_in_flight=1)
+
+        self.assertEqual(hedged.slots.generate(None, PARTS), "slow")
+        self.assertEqual(len(provider.calls), 1)
+        self.assertEqual(hedged.stats()['recent_hedges'], 0)
+
+    def test_hedge_holds_slot_until_both_calls_finish(self):
+        """Test that an abandoned slow call still counts against the in-flight limit."""
+        from providers import FakeProvider, GuardedProvider
+        provider = FakeProvider(
+            responses=["slow", "fast"],
+            delay=lambda call_index: 0.5 if call_index == 0 else 0
+        )
+        hedged = make_hedged(provider)
+        guarded = GuardedProvider(hedged, max_in_flight=2)
+        hedged.slots = guarded
+
+        self.assertEqual(guarded.generate(None, PARTS), "fast")
+        # The losing call is still running and keeps its slot
+        self.assertEqual(guarded.stats()['in_flight'], 1)
+        time.sleep(0.6)
+        self.assertEqual(guarded.stats()['in_flight'], 0)
+
+    def test_create_provider_links_hedge_to_guard(self):
+        """Test that the configured hedge draws on the guard's slots."""
+        from providers import create_provider
+        with patch.dict(os.environ, {'HEDGE_MAX_RATIO': '0.1'}):
+            guarded = create_provider('fake')
+        self.assertIs(guarded.provider.slots, guarded)
+
+
+class TestProviderIntegration(unittest.TestCase):
+    """Test cases for analysis through a pluggable provider."""
+
+    def test_analysis_uses_configured_provider(self):
+        """Test that analyze_text_with_ai goes through the provider interface."""
+        from app import analyze_text_with_ai
+        from providers import FakeProvider
+        provider = FakeProvider()
+
+        with patch('app.model_provider', provider):
+            result = analyze_text_with_ai("Transcript text")
+
+        self.assertEqual(result['sentiment'], "Neutral")
+        self.assertIn("Transcript text", provider.calls[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Automated tests for the bulk re-analysis command.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, Mock
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSCRIPT = "Revenue grew 18% year-over-year to $2.1 billion, exceeding our guidance. " * 3
+
+
+class ReanalyzeTestCase(unittest.TestCase):
+    """Gives each test an output directory and the fake model provider."""
+
+    def setUp(self):
+        import app
+        from providers import FakeProvider, GuardedProvider
+        self.root = tempfile.mkdtemp(prefix='quickbrief-reanalyze-')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.fake = FakeProvider()
+        patcher = patch.object(app, 'model_provider', GuardedProvider(self.fake, max_in_flight=4))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_corpus(self, count):
+        path = os.path.join(self.root, 'corpus.jsonl')
+        with open(path, 'w', encoding='utf-8') as handle:
+            for index in range(count):
+                handle.write(json.dumps({'id': f"doc-{index}", 'text': f"Call {index}. {TRANSCRIPT}"}) + '\n')
+        return path
+
+    def results(self):
+        output = os.path.join(self.root, 'out')
+        [name] = os.listdir(output)
+        with open(os.path.join(output, name), encoding='utf-8') as handle:
+            return name, [json.loads(line) for line in handle]
+
+    def main(self, *args):
+        from reanalyze import main
+        with patch('sys.stderr'):
+            return main(['--output', os.path.join(self.root, 'out'), '--report-every', '0.5'] + list(args))
+
+
+class TestBulkReanalysis(ReanalyzeTestCase):
+    """Test cases for streaming, checkpointing and versioned output."""
+
+    def test_large_corpus_is_streamed(self):
+        """Test that 10k documents are analyzed while only a bounded number is in flight."""
+        import reanalyze
+        corpus = self.write_corpus(10_000)
+        outstanding = {'now': 0, 'max': 0}
+        lock = threading.Lock()
+        original = reanalyze.jsonl_documents
+
+        def counted(path):
+            for doc_id, load in original(path):
+                with lock:
+                    outstanding['now'] += 1
+                    outstanding['max'] = max(outstanding['max'], outstanding['now'])
+
+                def tracked_load(load=load):
+                    with lock:
+                        outstanding['now'] -= 1
+                    return load()
+                yield doc_id, tracked_load
+
+        with patch.object(reanalyze, 'jsonl_documents', counted):
+            self.assertEqual(self.main('--input', corpus, '--workers', '8'), 0)
+
+        name, records = self.results()
+        self.assertEqual(name, 'earnings_call@2-detailed-full-fake.jsonl')
+        self.assertEqual(len(records), 10_000)
+        self.assertEqual(len({record['id'] for record in records}), 10_000)
+        self.assertTrue(all(record['version'] == 'earnings_call@2-detailed-full-fake' for record in records))
+        self.assertGreater(records[0]['tokens']['input'], 0)
+        # Short documents are packed 8 to a call
+        self.assertEqual(len(self.fake.calls), 10_000 // 8)
+        # Workers are capped by the provider's in-flight limit (4), two batches each
+        self.assertLessEqual(outstanding['max'], 4 * 2 * 8 + 8)
+
+    def test_resume_after_crash(self):
+        """Test that a rerun skips finished documents and redoes a torn last line."""
+        corpus = self.write_corpus(50)
+        self.assertEqual(self.main('--input', corpus), 0)
+        name, records = self.results()
+        path = os.path.join(self.root, 'out', name)
+        # Keep 20 results plus half of the 21st, as if the run crashed
+        with open(path, encoding='utf-8') as handle:
+            lines = handle.readlines()
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.writelines(lines[:20])
+            handle.write(lines[20][:15])
+
+        self.fake.calls.clear()
+        self.assertEqual(self.main('--input', corpus, '--pack', '1'), 0)
+
+        self.assertEqual(len(self.fake.calls), 30)
+        _, records = self.results()
+        self.assertEqual(sorted(record['id'] for record in records), sorted(f"doc-{n}" for n in range(50)))
+
+    def test_new_model_starts_new_file(self):
+        """Test that changing the model or input mode does not resume the old results."""
+        corpus = self.write_corpus(5)
+        self.fake.model_name = 'model-a'
+        self.assertEqual(self.main('--input', corpus), 0)
+        self.fake.model_name = 'model-b'
+        self.fake.calls.clear()
+        self.assertEqual(self.main('--input', corpus), 0)
+        self.assertEqual(self.main('--input', corpus, '--compact'), 0)
+
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root, 'out'))), [
+            'earnings_call@2-detailed-compact-fake-model-b.jsonl',
+            'earnings_call@2-detailed-full-fake-model-a.jsonl',
+            'earnings_call@2-detailed-full-fake-model-b.jsonl',
+        ])
+        # Nothing was skipped as already done under the old model
+        self.assertGreater(len(self.fake.calls), 0)
+
+    def test_tag_ignores_wrappers(self):
+        """Test that hedging and metering wrappers leave the tag unchanged."""
+        from reanalyze import run_tag, MeteredProvider
+        from providers import LocalProvider, HedgedProvider, GuardedProvider
+        from prompts import registry, RESPONSE_MODES
+        template, mode = registry.get(), RESPONSE_MODES['brief']
+        local = LocalProvider(model_name='llama3.1:8b')
+
+        plain = run_tag(template, mode, False, local)
+        wrapped = run_tag(template, mode, False, MeteredProvider(GuardedProvider(HedgedProvider(local))))
+
+        self.assertEqual(plain, wrapped)
+        self.assertEqual(plain, f"{template.id}-brief-full-local-llama3.1_8b")
+
+    def test_unavailable_model_is_retried(self):
+        """Test that calls turned away as unavailable are retried, and failures recorded."""
+        from reanalyze import run, ResultLog
+        from providers import ModelUnavailableError
+        attempts = {}
+
+        def analyze(texts):
+            [(doc_id, text)] = texts
+            attempts[text] = attempts.get(text, 0) + 1
+            if text == 'down' or attempts[text] == 1:
+                raise ModelUnavailableError("AI service is at capacity")
+            return {doc_id: {'verdict': text}}
+
+        log = ResultLog(os.path.join(self.root, 'results.jsonl'))
+        documents = [('a', lambda: 'up'), ('b', lambda: 'down')]
+        progress = run(documents, analyze, log, 'test@1', workers=2, retries=2, retry_delay=0,
+                       report=lambda line: None)
+        log.close()
+
+        self.assertEqual((progress.done, progress.failed), (1, 1))
+        self.assertEqual(attempts, {'up': 2, 'down': 3})
+        # Only the failed document is retried next time
+        self.assertEqual(ResultLog(log.path).done, {'a'})
+
+    def test_progress_line(self):
+        """Test the throughput, ETA and token report."""
+        from reanalyze import Progress
+        meter = Mock(input_tokens=1_250_000, output_tokens=4200)
+        progress = Progress(total=100, meter=meter)
+        progress.done, progress.skipped = 40, 10
+        line = progress.line()
+        self.assertIn("50/100 docs (50.0%)", line)
+        self.assertIn("10 already done", line)
+        self.assertIn("~1.2M tokens in / ~4.2k out", line)
+
+
+class TestArchiveReanalysis(ReanalyzeTestCase):
+    """Test cases for re-analyzing transcripts replayed from the page archive."""
+
+    @patch('requests.get')
+    def test_archive_entries_are_replayed(self, mock_get):
+        """Test that archived transcripts are analyzed without fetching, following pages stitched on."""
+        import app
+        from archive import PageArchive
+        archive_dir = os.path.join(self.root, 'archive')
+        archive = PageArchive(archive_dir, compression='gzip')
+        base = "https://transcripts.example.com/acme-q3-call"
+        first = (f'<html><body><p>Part 1: {TRANSCRIPT}</p>'
+                 f'<div class="pager">Page 1 of 2 <a rel="next" href="{base}?page=2">Next</a></div></body></html>')
+        archive.put(base, first.encode(), 'text/html')
+        archive.put(f"{base}?page=2", f"<html><body><p>Part 2: {TRANSCRIPT}</p></body></html>".encode(),
+                    'text/html', referrer=base)
+        archive.put("https://example.com/other-call", f"<html><body><p>{TRANSCRIPT}</p></body></html>".encode(),
+                    'text/html')
+
+        with patch.object(app, 'page_archive', app.page_archive):
+            self.assertEqual(self.main('--archive', archive_dir), 0)
+
+        mock_get.assert_not_called()
+        _, records = self.results()
+        self.assertEqual(sorted(record['id'] for record in records), sorted([base, "https://example.com/other-call"]))
+        prompts = [parts[1] for parts in self.fake.calls]
+        self.assertTrue(any("Part 1" in prompt and "Part 2" in prompt for prompt in prompts))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Automated tests for consistent-hash routing across nodes.
+"""
+
+import http.server
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch, Mock
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PAGE = (
+    "<html><body><h1>ACME Q3 2025 Earnings Call</h1><p>Revenue grew 18% year-over-year to $2.1 billion, "
+    "exceeding our guidance. Operating margin improved to 22% and we are raising our full-year outlook "
+    "for cloud revenue.</p></body></html>"
+).encode('utf-8')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestNormalizeUrl(unittest.TestCase):
+    """Test cases for URL normalization."""
+
+    def test_equivalent_urls_normalize_alike(self):
+        """Test that case, default ports, fragments and tracking params are ignored."""
+        from routing import normalize_url
+        expected = 'https://example.com/call?b=2&id=7'
+        for url in ('https://EXAMPLE.com:443/call/?id=7&b=2#qa',
+                    'HTTPS://example.com/call?utm_source=x&b=2&id=7',
+                    ' https://example.com/call?id=7&b=2&fbclid=abc '):
+            self.assertEqual(normalize_url(url), expected)
+        self.assertEqual(normalize_url('http://example.com:8080'), 'http://example.com:8080/')
+
+
+class TestNormalizedCacheKeys(unittest.TestCase):
+    """Test cases for caches keyed like routing keys URLs."""
+
+    TRANSCRIPT = "Revenue grew 18% year-over-year to $2.1 billion, exceeding our guidance. " * 3
+
+    def setUp(self):
+        import app
+        from singleflight import SingleFlight
+        self.client = app.app.test_client()
+        app.app.config['TESTING'] = True
+        app.transcript_store.clear()
+        patcher = patch.object(app, 'scrape_flight', SingleFlight())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_url_variants_share_stored_analysis(self, mock_scrape, mock_analyze):
+        """Test that a URL variant reuses the analysis stored for the canonical URL."""
+        mock_scrape.return_value = self.TRANSCRIPT
+        mock_analyze.return_value = {'sentiment': 'Positive'}
+
+        self.client.post('/analyze', json={'url': 'https://example.com/call?id=7'})
+        response = self.client.post('/analyze', json={'url': 'https://EXAMPLE.com/call/?id=7&utm_source=mail'})
+
+        self.assertEqual(response.status_code, 200)
+        mock_analyze.assert_called_once()
+
+    @patch('app.scrape_text_from_url')
+    def test_url_variants_share_cached_scrape(self, mock_scrape):
+        """Test that the scrape cache matches URL variants."""
+        import app
+        from cache import Cache, MemoryBackend
+        mock_scrape.return_value = self.TRANSCRIPT
+        with patch.object(app, 'SCRAPE_CACHE_SECONDS', 60), \
+                patch.object(app, 'scrape_cache', Cache(MemoryBackend(), ttl=60)):
+            app._scrape_shared('https://example.com/call#qa')
+            app._scrape_shared('https://example.com/call/?fbclid=abc')
+
+        self.assertEqual(mock_scrape.call_count, 1)
+
+
+class TestHashRing(unittest.TestCase):
+    """Test cases for the consistent-hash ring."""
+
+    NODES = ['http://127.0.0.1:5001', 'http://127.0.0.1:5002', 'http://127.0.0.1:5003']
+
+    def test_spread_and_stability(self):
+        """Test an even spread that does not depend on the node order."""
+        from routing import HashRing
+        ring = HashRing(self.NODES)
+        keys = [f'https://example.com/call/{index}' for index in range(3000)]
+        owners = [ring.owner(key) for key in keys]
+        for node in self.NODES:
+            self.assertGreater(owners.count(node), 700)
+        self.assertEqual(owners, [HashRing(reversed(self.NODES)).owner(key) for key in keys])
+
+    def test_down_node_moves_only_its_keys(self):
+        """Test health-aware rebalancing and recovery."""
+        from routing import HashRing
+        ring = HashRing(self.NODES)
+        keys = [f'https://example.com/call/{index}' for index in range(1000)]
+        before = {key: ring.owner(key) for key in keys}
+
+        ring.mark_down(self.NODES[0])
+        for key in keys:
+            if before[key] == self.NODES[0]:
+                self.assertIn(ring.owner(key), self.NODES[1:])
+            else:
+                self.assertEqual(ring.owner(key), before[key])
+
+        ring.mark_up(self.NODES[0])
+        self.assertEqual({key: ring.owner(key) for key in keys}, before)
+
+    def test_all_down(self):
+        """Test that a ring with no healthy nodes has no owner."""
+        from routing import HashRing
+        ring = HashRing(self.NODES[:1])
+        ring.mark_down(self.NODES[0])
+        self.assertIsNone(ring.owner('key'))
+
+
+class TestForwardFailures(unittest.TestCase):
+    """Test cases for what a failed forward does to the owner's health."""
+
+    NODES = ['http://127.0.0.1:5001', 'http://127.0.0.1:5002']
+
+    def setUp(self):
+        from routing import Router
+        self.router = Router(self.NODES[0], self.NODES, health_interval=0)
+
+    def forward(self, **post):
+        with patch('requests.post', **post):
+            return self.router.forward(self.NODES[1], '/analyze', {'url': 'https://example.com/call'}, timeout=5)
+
+    def test_unreachable_owner_is_marked_down(self):
+        """Test that a connection failure hands the request back to this node."""
+        import requests
+        for error in (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout):
+            self.router.ring.mark_up(self.NODES[1])
+            self.assertIsNone(self.forward(side_effect=error('refused')))
+            self.assertEqual(self.router.ring.healthy_nodes(), self.NODES[:1])
+
+    def test_slow_owner_is_not_marked_down(self):
+        """Test that a read timeout answers 504 without moving the owner's keys."""
+        import requests
+        status, body = self.forward(side_effect=requests.exceptions.ReadTimeout('read timed out'))
+
+        self.assertEqual(status, 504)
+        self.assertIn('error', body)
+        self.assertEqual(self.router.ring.healthy_nodes(), self.NODES)
+
+    def test_invalid_body_is_not_marked_down(self):
+        """Test that a non-JSON answer is a 502, not a dead owner."""
+        response = Mock(status_code=200)
+        response.json.side_effect = ValueError('Expecting value')
+        status, _ = self.forward(return_value=response)
+
+        self.assertEqual(status, 502)
+        self.assertEqual(self.router.ring.healthy_nodes(), self.NODES)
+
+
+class TestClusterForwarding(unittest.TestCase):
+    """Test cases with three local instances on different ports."""
+
+    @classmethod
+    def setUpClass(cls):
+        class PageHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.end_headers()
+                self.wfile.write(PAGE)
+
+            def log_message(self, *args):
+                pass
+
+        cls.page_server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+        threading.Thread(target=cls.page_server.serve_forever, daemon=True).start()
+
+        cls.nodes = [f'http://127.0.0.1:{free_port()}' for _ in range(3)]
+        cls.processes = {}
+        for node in cls.nodes:
+            env = dict(os.environ, CLUSTER_NODES=','.join(cls.nodes), CLUSTER_SELF=node,
+                       CLUSTER_HEALTH_INTERVAL='0', MODEL_PROVIDER='fake', HEDGE_MAX_RATIO='0',
+                       PARSE_WORKERS='0')
+            port = int(node.rsplit(':', 1)[1])
+            cls.processes[node] = subprocess.Popen(
+                [sys.executable, '-c', f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"],
+                cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        import requests
+        for node in cls.nodes:
+            for _ in range(100):
+                try:
+                    if requests.get(f'{node}/healthz', timeout=1).status_code == 200:
+                        break
+                except requests.exceptions.ConnectionError:
+                    time.sleep(0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        for process in cls.processes.values():
+            process.kill()
+            process.wait()
+        cls.page_server.shutdown()
+        cls.page_server.server_close()
+
+    def test_requests_are_served_by_the_owner(self):
+        """Test forwarding to the owner, then failover when it dies."""
+        import requests
+        from routing import HashRing, normalize_url
+        url = f'http://127.0.0.1:{self.page_server.server_address[1]}/acme-q3'
+        owner = HashRing(self.nodes).owner(normalize_url(url))
+
+        for node in self.nodes:
+            response = requests.post(f'{node}/analyze', json={'url': url}, timeout=30)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers['X-QuickBrief-Node'], owner)
+            self.assertIn('verdict', response.json())
+
+        # The owner goes away: the next node on the ring takes its keys
+        self.processes[owner].kill()
+        self.processes[owner].wait()
+        entry = next(node for node in self.nodes if node != owner)
+        response = requests.post(f'{entry}/analyze', json={'url': url}, timeout=30)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['X-QuickBrief-Node'], owner)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
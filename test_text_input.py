@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Automated tests for direct transcript text and file submission.
+"""
+
+import io
+import codecs
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSCRIPT = (
+    "Good morning and welcome to the Q3 earnings call. Revenue grew 18% year-over-year to "
+    "$2.1 billion, driven by strong demand. We are raising our full-year guidance. "
+    "Our café business in Zürich saw a 5% decline due to weaker tourism."
+)
+
+SAMPLE_RESULT = {
+    "sentiment": "Positive",
+    "good_news": ["Revenue grew 18%"],
+    "bad_news": ["Café business declined 5%"],
+    "key_promises": ["Raised guidance"],
+    "verdict": "Strong quarter."
+}
+
+
+class TestCharsetDetection(unittest.TestCase):
+    """Test cases for transcript byte decoding."""
+
+    def test_byte_order_marks(self):
+        """Test that BOMs win over every other signal."""
+        from encoding import decode_bytes
+        self.assertEqual(decode_bytes(codecs.BOM_UTF8 + TRANSCRIPT.encode('utf-8')), (TRANSCRIPT, 'utf-8-sig'))
+        self.assertEqual(decode_bytes(TRANSCRIPT.encode('utf-16')), (TRANSCRIPT, 'utf-16'))
+
+    def test_utf8_and_legacy_encodings(self):
+        """Test strict UTF-8 first, then detection of single-byte encodings."""
+        from encoding import decode_bytes
+        self.assertEqual(decode_bytes(TRANSCRIPT.encode('utf-8')), (TRANSCRIPT, 'utf-8'))
+        self.assertEqual(decode_bytes(TRANSCRIPT.encode('cp1252')), (TRANSCRIPT, 'cp1252'))
+        russian = "Выручка компании за третий квартал выросла на восемнадцать процентов."
+        self.assertEqual(decode_bytes(russian.encode('cp1251'))[0], russian)
+
+    def test_fallback_without_detector(self):
+        """Test that cp1252 is used when no detector is installed."""
+        import encoding
+        with patch.object(encoding, 'charset_normalizer', None):
+            self.assertEqual(encoding.decode_bytes(TRANSCRIPT.encode('cp1252')), (TRANSCRIPT, 'cp1252'))
+
+
+class TestDirectTextInput(unittest.TestCase):
+    """Test cases for /analyze with supplied text instead of a URL."""
+
+    def setUp(self):
+        """Set up test client."""
+        from app import app, transcript_store
+        self.client = app.test_client()
+        app.config['TESTING'] = True
+        transcript_store.clear()
+
+    @patch('app.analyze_text_with_ai')
+    @patch('app.scrape_text_from_url')
+    def test_text_field_skips_scraping(self, mock_scrape, mock_analyze):
+        """Test that JSON text goes straight to analysis and is cached by content."""
+        mock_analyze.return_value = SAMPLE_RESULT
+
+        for _ in range(2):
+            response = self.client.post('/analyze', json={'text': TRANSCRIPT.replace(' ', '\n  ', 3)})
+            self.assertEqual(response.status_code, 200)
+
+        mock_scrape.assert_not_called()
+        mock_analyze.assert_called_once()
+        self.assertEqual(mock_analyze.call_args[0][0], TRANSCRIPT)
+
+    @patch('app.analyze_text_with_ai')
+    def test_short_or_invalid_text(self, mock_analyze):
+        """Test validation of the text field."""
+        response = self.client.post('/analyze', json={'text': 'Too short.'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/analyze', json={'text': ['not', 'a', 'string']})
+        self.assertEqual(response.status_code, 400)
+        mock_analyze.assert_not_called()
+
+    @patch('app.analyze_text_with_ai')
+    def test_text_file_upload_is_decoded(self, mock_analyze):
+        """Test a cp1252 text file upload."""
+        mock_analyze.return_value = SAMPLE_RESULT
+
+        response = self.client.post('/analyze', data={
+            'file': (io.BytesIO(TRANSCRIPT.encode('cp1252')), 'vendor-feed.txt'),
+            'incremental': 'false'
+        }, content_type='multipart/form-data')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_analyze.call_args[0][0], TRANSCRIPT)
+
+    @patch('app.analyze_text_with_ai')
+    def test_oversized_upload_is_rejected(self, mock_analyze):
+        """Test that the request size limit returns 413."""
+        from app import app
+        original = app.config['MAX_CONTENT_LENGTH']
+        app.config['MAX_CONTENT_LENGTH'] = 1024
+        try:
+            response = self.client.post('/analyze', data={
+                'file': (io.BytesIO(b'x' * 4096), 'big.txt')
+            }, content_type='multipart/form-data')
+        finally:
+            app.config['MAX_CONTENT_LENGTH'] = original
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('limit', response.get_json()['error'])
+        mock_analyze.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Automated tests for the speaker-segmented transcript model.
+"""
+
+import pickle
+import unittest
+import os
+import sys
+from unittest.mock import patch, Mock
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+CALL = (
+    "ACME Q3 2025 Earnings Call Transcript. Prepared Remarks: Operator: Good day and welcome to the ACME call. "
+    "Jane Doe -- Chief Executive Officer Thanks, operator. Revenue grew 18% to $2.1 billion. "
+    "Total Revenue: was a record. John Roe: -- Chief Financial Officer Operating margin expanded to 22%. "
+    "Questions & Answers: Operator: Our first question comes from Vivek Arya. "
+    "Vivek Arya -- Bank of America -- Analyst Thanks. What about margins next year? "
+    "Jane Doe -- Chief Executive Officer We expect further expansion."
+)
+
+
+class TestTranscriptModel(unittest.TestCase):
+    """Test cases for segmentation and storage."""
+
+    def setUp(self):
+        from transcript import Transcript
+        self.transcript = Transcript.from_text(CALL)
+
+    def test_speaker_turns_and_sections(self):
+        """Test speakers, roles and the remarks/Q&A split."""
+        turns = [(s.speaker, s.role, s.section) for s in self.transcript.segments]
+        self.assertEqual(turns, [
+            (None, None, 'unknown'),
+            ('Operator', 'Operator', 'prepared_remarks'),
+            ('Jane Doe', 'Chief Executive Officer', 'prepared_remarks'),
+            ('John Roe', 'Chief Financial Officer', 'prepared_remarks'),
+            ('Operator', 'Operator', 'qa'),
+            ('Vivek Arya', 'Bank of America -- Analyst', 'qa'),
+            ('Jane Doe', 'Chief Executive Officer', 'qa'),
+        ])
+        self.assertEqual(self.transcript.segments[2].text,
+                         "Thanks, operator. Revenue grew 18% to $2.1 billion. Total Revenue: was a record.")
+        self.assertEqual(self.transcript.speakers, ['Operator', 'Jane Doe', 'John Roe', 'Vivek Arya'])
+
+    def test_first_analyst_opens_qa(self):
+        """Test the Q&A section starts with the first analyst without a heading."""
+        from transcript import Transcript
+        transcript = Transcript.from_text(
+            "Jane Doe: Revenue grew 18%. Sam Poe -- Morgan Stanley -- Analyst What about margins? "
+            "Jane Doe: They expanded.")
+        self.assertEqual([s.section for s in transcript.segments], ['prepared_remarks', 'qa', 'qa'])
+
+    def test_plain_text_is_one_segment(self):
+        """Test that text without speaker labels stays a single segment."""
+        from transcript import Transcript
+        transcript = Transcript.from_text("Revenue grew 18%. Key Highlights: margins expanded.")
+        self.assertEqual(len(transcript.segments), 1)
+        self.assertIsNone(transcript.segments[0].speaker)
+        self.assertEqual(transcript.speakers, [])
+
+    def test_compact_storage_and_str_compatibility(self):
+        """Test that offsets live in arrays and the object is still the text."""
+        from array import array
+        self.assertIsInstance(self.transcript, str)
+        self.assertEqual(self.transcript, CALL)
+        self.assertEqual(self.transcript.strip(), CALL)
+        self.assertIsInstance(self.transcript._starts, array)
+        self.assertFalse(hasattr(self.transcript, '__dict__'))
+        self.assertFalse(hasattr(self.transcript.segments[0], '__dict__'))
+        self.assertEqual(self.transcript._names.count('Jane Doe'), 1)
+
+    def test_pickle_round_trip(self):
+        """Test that segments survive pickling (caches, worker processes)."""
+        from transcript import Transcript
+        restored = pickle.loads(pickle.dumps(self.transcript))
+        self.assertIsInstance(restored, Transcript)
+        self.assertEqual(restored.render(), self.transcript.render())
+
+    def test_render_and_budget(self):
+        """Test the model-facing rendering and its character budget."""
+        rendered = self.transcript.render()
+        self.assertIn("[Prepared remarks]\nOperator: Good day", rendered)
+        self.assertIn("\nJane Doe (Chief Executive Officer): Thanks, operator.", rendered)
+        self.assertIn("[Questions and answers]\nOperator: Our first question", rendered)
+        self.assertEqual(len(self.transcript.render(max_chars=120)), 120)
+
+    def test_add_segment_validates_offsets(self):
+        """Test that segments must lie inside the text."""
+        from transcript import Transcript
+        with self.assertRaises(ValueError):
+            Transcript("short").add_segment(0, 10)
+
+
+class TestTranscriptPipeline(unittest.TestCase):
+    """Test cases for producing and consuming transcripts."""
+
+    @patch('requests.get')
+    def test_scraper_returns_transcript(self, mock_get):
+        """Test that the scraper returns a segmented Transcript."""
+        from app import scrape_text_from_url
+        from transcript import Transcript
+        mock_response = Mock()
+        mock_response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        mock_response.content = f"<html><body><p>{CALL}</p></body></html>".encode('utf-8')
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        result = scrape_text_from_url('https://example.com/acme-q3')
+
+        self.assertIsInstance(result, Transcript)
+        self.assertEqual(result, CALL)
+        self.assertIn('Vivek Arya', result.speakers)
+
+    def test_analysis_sends_speaker_turns(self):
+        """Test that analyze_text_with_ai renders Transcripts turn by turn."""
+        import app
+        from providers import FakeProvider
+        from transcript import Transcript
+        provider = FakeProvider()
+        with patch.object(app, 'model_provider', provider):
+            app.analyze_text_with_ai(Transcript.from_text(CALL))
+            app.analyze_text_with_ai(CALL)
+
+        structured, plain = provider.calls[0][1], provider.calls[1][1]
+        self.assertIn("Vivek Arya (Bank of America -- Analyst): Thanks.", structured)
+        self.assertIn(CALL, plain)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
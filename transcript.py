@@ -0,0 +1,253 @@
+"""
+Speaker-segmented transcript representation.
+
+A Transcript is the cleaned transcript text (it subclasses ``str``, so every
+existing string API keeps working) plus its speaker turns. Turns are stored
+as parallel arrays of offsets into that one shared string, with speaker and
+role names interned in small tables, instead of one string copy per segment.
+Segment objects are lightweight views created on access.
+"""
+
+import re
+from array import array
+
+# Section codes stored per segment
+SECTIONS = ('unknown', 'prepared_remarks', 'qa', 'participants')
+SECTION_CODES = {name: code for code, name in enumerate(SECTIONS)}
+
+SECTION_MARKERS = (
+    (re.compile(r'^(?:prepared remarks|presentation|opening remarks)$', re.IGNORECASE), 'prepared_remarks'),
+    (re.compile(r'^(?:questions? (?:and|&) answers?|question-and-answer session|q&a(?: session)?)$',
+                re.IGNORECASE), 'qa'),
+    (re.compile(r'^(?:call participants|participants)$', re.IGNORECASE), 'participants'),
+)
+
+SECTION_HEADINGS = {
+    'prepared_remarks': '[Prepared remarks]',
+    'qa': '[Questions and answers]',
+    'participants': '[Call participants]',
+}
+
+# Capitalized words that start labels like "Total Revenue:" rather than names
+NOT_NAME_WORDS = frozenset("""
+total revenue revenues net gross operating income margin sales guidance outlook key highlights
+note notes forward-looking statements disclaimer q1 q2 q3 q4 fy fiscal year quarter the our we
+""".split())
+
+ROLE = (r"[A-Z][^.:!?]{0,120}?\b(?:Officer|President|Chairman|Chairwoman|Chair|CEO|CFO|COO|CTO|Analyst|"
+        r"Relations|Director|Treasurer|Founder|Controller)")
+
+# A turn starts at the beginning of the text, after a sentence or after a
+# heading with "Name:", "Name: -- Role" or "Name -- Role"; section headings
+# have the same shape as a speaker label and are told apart afterwards.
+TURN = re.compile(
+    r"(?:^|(?<=[.!?:\"')\]])\s)"
+    r"(?P<speaker>[A-Z][\w.'&-]*(?: (?:[A-Z][\w.'&-]*|and|&|of)){0,3})"
+    rf"(?::(?: -- (?P<role>{ROLE}))?| -- (?P<bare_role>{ROLE}))(?=\s|$)"
+)
+
+
+class Segment:
+    """View of one speaker turn in a Transcript."""
+
+    __slots__ = ('_transcript', 'index')
+
+    def __init__(self, transcript, index):
+        self._transcript = transcript
+        self.index = index
+
+    @property
+    def start(self):
+        return self._transcript._starts[self.index]
+
+    @property
+    def end(self):
+        return self._transcript._ends[self.index]
+
+    @property
+    def speaker(self):
+        return self._transcript._names[self._transcript._speakers[self.index]]
+
+    @property
+    def role(self):
+        return self._transcript._names[self._transcript._roles[self.index]]
+
+    @property
+    def section(self):
+        return SECTIONS[self._transcript._sections[self.index]]
+
+    @property
+    def text(self):
+        """The turn's text (sliced from the shared string on access)."""
+        return str.__getitem__(self._transcript, slice(self.start, self.end))
+
+    def __repr__(self):
+        return f"Segment({self.speaker!r}, {self.role!r}, {self.section!r}, {self.start}:{self.end})"
+
+
+class Transcript(str):
+    """Cleaned transcript text with speaker, role and section segments."""
+
+    __slots__ = ('_starts', '_ends', '_speakers', '_roles', '_sections', '_names', '_name_ids')
+
+    def __new__(cls, text=''):
+        transcript = super().__new__(cls, text)
+        transcript._starts = array('I')
+        transcript._ends = array('I')
+        transcript._speakers = array('H')
+        transcript._roles = array('H')
+        transcript._sections = array('B')
+        # Interned speaker and role names; id 0 means "none"
+        transcript._names = [None]
+        transcript._name_ids = {None: 0}
+        return transcript
+
+    def _intern(self, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return name_id
+
+    def add_segment(self, start, end, speaker=None, role=None, section='unknown'):
+        """
+        Append a segment covering text[start:end].
+
+        Args:
+            start (int): Start offset into the text
+            end (int): End offset into the text
+            speaker (str): Speaker name, if known
+            role (str): Speaker role or title, if known
+            section (str): One of SECTIONS
+        """
+        if not 0 <= start <= end <= len(self):
+            raise ValueError(f"Segment {start}:{end} is outside the transcript")
+        self._starts.append(start)
+        self._ends.append(end)
+        self._speakers.append(self._intern(speaker))
+        self._roles.append(self._intern(role))
+        self._sections.append(SECTION_CODES[section])
+
+    @property
+    def segments(self):
+        """List of Segment views, in text order."""
+        return [Segment(self, index) for index in range(len(self._starts))]
+
+    @property
+    def speakers(self):
+        """Distinct speaker names in order of first appearance."""
+        return [name for name in dict.fromkeys(self._names[i] for i in self._speakers) if name]
+
+    def __reduce__(self):
+        return (_restore, (str(self), self._starts, self._ends, self._speakers, self._roles,
+                           self._sections, self._names))
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Segment cleaned transcript text into speaker turns.
+
+        Recognizes "Name:", "Name: -- Role" and "Name -- Role" turn labels
+        and "Prepared Remarks:" / "Questions & Answers:" style section
+        headings. Text with no recognizable turns becomes one segment.
+
+        Args:
+            text (str): Cleaned, space-joined transcript text
+
+        Returns:
+            Transcript: The text with its segments
+        """
+        if isinstance(text, cls):
+            return text
+        transcript = cls(text)
+        if not text:
+            return transcript
+
+        section = 'unknown'
+        speaker = role = None
+        start = 0
+        for match in TURN.finditer(text):
+            label = match.group('speaker')
+            marker = next((name for pattern, name in SECTION_MARKERS if pattern.match(label)), None)
+            role_text = match.group('role') or match.group('bare_role')
+            if marker is None and role_text is None and label != 'Operator' and not _looks_like_name(label):
+                continue
+
+            transcript._add_turn(start, match.start(), speaker, role, section)
+            start = match.end()
+            if marker is not None:
+                section = marker
+                speaker = role = None
+                continue
+            speaker, role = label, role_text
+            if label == 'Operator':
+                role = 'Operator'
+            elif section in ('unknown', 'prepared_remarks') and role and 'analyst' in role.lower():
+                # The first analyst to speak opens the Q&A
+                section = 'qa'
+            elif section == 'unknown':
+                section = 'prepared_remarks'
+        transcript._add_turn(start, len(text), speaker, role, section)
+        return transcript
+
+    def _add_turn(self, start, end, speaker, role, section):
+        # Trim the separating whitespace and skip empty turns
+        while start < end and self[start].isspace():
+            start += 1
+        while end > start and self[end - 1].isspace():
+            end -= 1
+        if end > start:
+            self.add_segment(start, end, speaker, role, section)
+
+    def render(self, max_chars=None):
+        """
+        Format the transcript one turn per line with section headings.
+
+        Args:
+            max_chars (int): Optional budget; output stops at a turn boundary
+                (the last turn is cut) once it is reached
+
+        Returns:
+            str: e.g. "[Prepared remarks]\\nJane Doe (CEO): ..."
+        """
+        lines = []
+        used = 0
+        section = None
+        for segment in self.segments:
+            if segment.section != section:
+                section = segment.section
+                heading = SECTION_HEADINGS.get(section)
+                if heading:
+                    lines.append(heading)
+                    used += len(heading) + 1
+            label = segment.speaker or ''
+            if segment.role and segment.role != segment.speaker:
+                label = f"{label} ({segment.role})"
+            line = f"{label}: {segment.text}" if label else segment.text
+            if max_chars is not None and used + len(line) > max_chars:
+                remaining = max_chars - used
+                if remaining > 0:
+                    lines.append(line[:remaining])
+                break
+            lines.append(line)
+            used += len(line) + 1
+        return '\n'.join(lines)
+
+
+def _looks_like_name(label):
+    """Plausible person name: 2-4 capitalized words, no sentence-style words."""
+    words = label.split()
+    return 2 <= len(words) <= 4 and all(word[0].isupper() for word in words) and \
+        not any(word.lower() in NOT_NAME_WORDS for word in words)
+
+
+def _restore(text, starts, ends, speakers, roles, sections, names):
+    transcript = Transcript(text)
+    transcript._starts = starts
+    transcript._ends = ends
+    transcript._speakers = speakers
+    transcript._roles = roles
+    transcript._sections = sections
+    transcript._names = names
+    transcript._name_ids = {name: index for index, name in enumerate(names)}
+    return transcript